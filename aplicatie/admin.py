@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Author, Publisher, Category, Book, Review, Order, CustomUser, Promotii, Vizualizari
+from . import orders, search
+from .models import Author, Publisher, Category, Book, Review, Order, CustomUser, Promotii, Vizualizari, TrimiterePromotie, JurnalPromotie, RaportZilnic, PunctControl, Newsletter, JurnalNewsletter, JobLock, JobRun
 
 #Am schimbat numele panoului de administrare
 admin.site.site_header = "Panoul Admin Bookstore"
@@ -158,6 +160,20 @@ class BookAdmin(admin.ModelAdmin):
     verbose_name = 'Carte'  # Titlu singular
     verbose_name_plural = 'Cărți'  # Titlu plural
 
+    def get_queryset(self, request):
+        # Autorul și editura din list_display vin prin JOIN, nu câte o interogare pe rând
+        return super().get_queryset(request).with_related()
+
+    def get_search_results(self, request, queryset, search_term):
+        # Căutarea din admin folosește indexul full-text în loc de LIKE '%...%' pe trei coloane
+        if search_term:
+            ids = search.search_ids(search_term, settings.SEARCH_MAX_RESULTS)
+            # Lista e mărginită la SEARCH_MAX_RESULTS: dacă limita a fost atinsă pot exista mai multe
+            # rezultate, iar adminul trebuie să le arate pe toate, deci revenim la căutarea implicită
+            if ids is not None and len(ids) < settings.SEARCH_MAX_RESULTS:
+                return queryset.filter(pk__in=ids), False
+        return super().get_search_results(request, queryset, search_term)
+
 @admin.register(Author)
 class AuthorAdmin(admin.ModelAdmin):
     # Câmpuri de căutare
@@ -197,13 +213,21 @@ class OrderAdmin(admin.ModelAdmin):
             'description': 'Detalii de bază despre comandă.',
         }),
         ('Date Suplimentare', {
-            'fields': ['status'],  # Excludem `order_date` din câmpurile editabile
+            'fields': ['status', 'checkout', 'expires_at'],  # Excludem `order_date` din câmpurile editabile
             'description': 'Status comandă.',
             'classes': ['collapse'],  # Opțional: permite colapsarea secțiunii
         }),
     ]
-    readonly_fields = ('order_date',)  # Adăugăm `order_date` ca câmp doar pentru citire
+    readonly_fields = ('order_date', 'checkout', 'expires_at')  # Adăugăm `order_date` ca câmp doar pentru citire
     list_display = ('id', 'book', 'quantity', 'order_date', 'status')  # Păstrăm `order_date` în listă pentru vizualizare
+    list_select_related = ['book']  # __str__ al cărții fără interogări suplimentare
+    actions = ['cancel_orders']
+
+    @admin.action(description='Anulează comenzile în așteptare (returnează stocul)')
+    def cancel_orders(self, request, queryset):
+        # Prin orders.release, ca stocul să revină o singură dată (nu prin editarea statusului)
+        released = orders.release(queryset)
+        self.message_user(request, f'{released} linii de comandă anulate, stocul a fost returnat.')
     #Am schimbat numele cu verbose_name
     verbose_name = 'Comandă'  # Titlu singular
     verbose_name_plural = 'Comenzi'  # Titlu plural
@@ -211,3 +235,54 @@ class OrderAdmin(admin.ModelAdmin):
 admin.site.register(CustomUser)  
 admin.site.register(Promotii)
 admin.site.register(Vizualizari)
+
+@admin.register(TrimiterePromotie)
+class TrimiterePromotieAdmin(admin.ModelAdmin):
+    list_display = ('id', 'promotion', 'status', 'total', 'sent', 'failed', 'created_at', 'finished_at')
+    list_select_related = ['promotion']
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(JurnalPromotie)
+class JurnalPromotieAdmin(admin.ModelAdmin):
+    list_display = ('trimitere', 'email', 'status', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('email',)
+
+
+@admin.register(RaportZilnic)
+class RaportZilnicAdmin(admin.ModelAdmin):
+    list_display = ('day', 'metric', 'key', 'value', 'computed_at')
+    list_filter = ('metric',)
+    date_hierarchy = 'day'
+
+
+@admin.register(PunctControl)
+class PunctControlAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'updated_at')
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(Newsletter)
+class NewsletterAdmin(admin.ModelAdmin):
+    list_display = ('issue', 'subject', 'status', 'sent', 'failed', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+
+@admin.register(JurnalNewsletter)
+class JurnalNewsletterAdmin(admin.ModelAdmin):
+    list_display = ('newsletter', 'email', 'status', 'attempts', 'updated_at')
+    list_filter = ('newsletter', 'status')
+    search_fields = ('email',)
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ('job', 'status', 'scheduled_for', 'started_at', 'duration', 'rows', 'owner')
+    list_filter = ('job', 'status')
+    date_hierarchy = 'started_at'
+
+
+@admin.register(JobLock)
+class JobLockAdmin(admin.ModelAdmin):
+    list_display = ('name', 'owner', 'locked_until', 'last_slot')
@@ -0,0 +1,52 @@
+import contextvars
+from contextlib import ExitStack, asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+# Baza de date din cod asincron (async_views.py și middleware-urile rulate sub ASGI):
+#  - ORM-ul async (aget, acount, async for) rulează pe firul sincron al cererii, deci wrapper-ele
+#    de interogări (numărare, profilare) se instalează pe conexiunea acelui fir;
+#  - run_parallel() rulează cod ORM sincron pe un fir din pool, cu conexiunea lui, ca interogările
+#    independente ale unei cereri (pagina, fațetele) să meargă în paralel; wrapper-ele cererii
+#    ajung și acolo prin sql_wrappers (variabilele de context se copiază în fir).
+
+sql_wrappers = contextvars.ContextVar('sql_wrappers', default=())
+
+
+def _install(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def _uninstall(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+@asynccontextmanager
+async def execute_wrapper(wrapper):
+    # Echivalentul async al connection.execute_wrapper()
+    token = sql_wrappers.set(sql_wrappers.get() + (wrapper,))
+    await sync_to_async(_install)(wrapper)
+    try:
+        yield
+    finally:
+        await sync_to_async(_uninstall)(wrapper)
+        sql_wrappers.reset(token)
+
+
+def _in_own_thread(func, *args):
+    try:
+        with ExitStack() as stack:
+            for wrapper in sql_wrappers.get():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return func(*args)
+    finally:
+        close_old_connections()  # conexiunea firului din pool respectă CONN_MAX_AGE, ca cea a cererii
+
+
+async def run_parallel(func, *args):
+    # func(*args) pe un fir separat (CATALOG_PARALLEL_QUERIES) sau, altfel, pe firul sincron al cererii
+    if settings.CATALOG_PARALLEL_QUERIES:
+        return await sync_to_async(_in_own_thread, thread_sensitive=False)(func, *args)
+    return await sync_to_async(func)(*args)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from . import async_db, catalog_cache, facets, view_events, views
+from .forms import BookFilterForm
+from .models import Author, Book, Category, Promotii, Publisher
+
+logger = logging.getLogger('django')
+
+# Versiunile async ale paginilor de catalog (index, lista de cărți, paginile detaliu), folosite
+# sub ASGI (CATALOG_ASYNC_VIEWS, vezi urls.py). Aceleași template-uri și aceleași chei de cache
+# ca view-urile din views.py; în plus, la lista de cărți pagina, fațetele și totalul se calculează
+# concurent (asyncio.gather). Template-urile pot interoga baza (widget-ul "Văzute recent",
+# dropdown-urile filtrelor), deci se randează prin sync_to_async.
+
+
+async def index(request):
+    logger.debug("Accesare pagina principală - DEBUG 1: Utilizatorul a accesat index-ul.")
+    messages.debug(request, "DEBUG: Verifică starea sesiunii utilizatorului la accesarea paginii principale.")
+    user = await request.auser()
+    return await sync_to_async(render)(request, 'aplicatie/index.html', {'user': user})
+
+
+async def book_list(request):
+    logger.info("Accesare lista de cărți - INFO 1: Utilizatorul a accesat lista de cărți.")
+    messages.info(request, "INFO: Filtrele sunt disponibile pentru a restrânge rezultatele listei de cărți.")
+
+    form = BookFilterForm(request.GET or None)
+    if not await sync_to_async(form.is_valid)():  # ModelChoiceField-urile validează în baza de date
+        logger.warning("Accesare lista de cărți - WARNING 1: Formularul de filtrare nu este valid.")
+        messages.warning(request, "WARNING: Ați trimis formularul de contact de prea multe ori. Vă rugăm să așteptați sau să contactați suportul.")
+
+    version = await catalog_cache.aget_version(catalog_cache.CATALOG)
+    data = await catalog_cache.aget_or_build(
+        'book_list',
+        [version, settings.BOOK_LIST_PAGINATION, catalog_cache.params_key(request.GET)],
+        lambda: _build_book_list(request, form),
+        timeout=settings.CATALOG_LIST_CACHE_TIMEOUT,
+    )
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        logger.debug("Cerere AJAX primită pentru listarea/filtrarea cărților (cu paginare).")
+        return JsonResponse({
+            'books_html': data['books_html'],
+            'filters_html': data['filters_html'],
+            'facets': data['facets'],
+            'next': data['next'],
+            'prev': data['prev'],
+            'total': data['total'],
+        }, status=200)
+
+    user = await request.auser()
+    return await sync_to_async(render)(
+        request,
+        'aplicatie/book_list.html',
+        {
+            'form': form,
+            'books_html': mark_safe(data['books_html']),
+            'filters_html': mark_safe(data['filters_html']),
+            'total': data['total'],
+            'facets': data['facets'],
+            'user': user,
+        }
+    )
+
+
+async def _build_book_list(request, form):
+    qs, filters, ranked_ids = await sync_to_async(views._filter_books)(form)  # căutarea poate interoga indexul
+    # Interogările independente rulează în paralel; fiecare ramură are conexiunea ei (async_db.run_parallel)
+    jobs = [_paginate_books(request, form, qs, ranked_ids), async_db.run_parallel(facets.compute_facets, filters)]
+    if form.is_valid() and form.cleaned_data.get('total'):
+        jobs.append(cached_count(qs, request.GET))
+    page_obj, book_facets, *total = await asyncio.gather(*jobs)
+    return await sync_to_async(views._book_list_data)(request, form, page_obj, book_facets, total[0] if total else None)
+
+
+async def _paginate_books(request, form, qs, ranked_ids):
+    if ranked_ids is None:
+        return await async_db.run_parallel(views._paginate_books, request, form, qs, None)
+    # Căutare: paginăm direct pe id-urile ordonate după relevanță, păstrând doar cele care trec de filtre
+    allowed = {pk async for pk in qs.values_list('pk', flat=True)}
+    page_obj = Paginator([pk for pk in ranked_ids if pk in allowed], settings.BOOK_LIST_PAGE_SIZE).get_page(request.GET.get('page'))
+    books = await qs.ain_bulk(page_obj.object_list)
+    page_obj.object_list = [books[pk] for pk in page_obj.object_list]
+    return page_obj
+
+
+async def cached_count(qs, params):
+    version = await catalog_cache.aget_version(catalog_cache.CATALOG)
+    return await catalog_cache.aget_or_build(
+        'book_list_count',
+        [version, catalog_cache.params_key(params, ignore=('cursor', 'page', 'total'))],
+        qs.acount,
+        timeout=settings.BOOK_LIST_COUNT_TIMEOUT,
+    )
+
+
+# Paginile detaliu: cardul cache-uit pe versiunea obiectului, ca în views._cached_card
+async def _cached_card(request, kind, pk, template, load):
+    async def build():
+        obj = await load()  # poate ridica Http404
+        return await sync_to_async(render_to_string)(template, {kind: obj}, request=request)
+    version = await catalog_cache.aget_version(kind, pk)
+    html = await catalog_cache.aget_or_build(f'{kind}_detail', [pk, version], build)
+    return mark_safe(html)
+
+
+async def _render_detail(request, card_html):
+    user = await request.auser()
+    return await sync_to_async(render)(request, 'aplicatie/catalog_detail.html', {'card_html': card_html, 'user': user})
+
+
+async def author_detail(request, pk):
+    card_html = await _cached_card(request, 'author', pk, 'aplicatie/author_detail_card.html',
+                                   lambda: aget_object_or_404(Author.objects.prefetch_related('books'), pk=pk))
+    return await _render_detail(request, card_html)
+
+
+async def publisher_detail(request, pk):
+    card_html = await _cached_card(request, 'publisher', pk, 'aplicatie/publisher_detail_card.html',
+                                   lambda: aget_object_or_404(Publisher.objects.prefetch_related('books'), pk=pk))
+    return await _render_detail(request, card_html)
+
+
+async def category_detail(request, pk):
+    card_html = await _cached_card(request, 'category', pk, 'aplicatie/category_detail_card.html',
+                                   lambda: aget_object_or_404(Category.objects.prefetch_related(
+                                       'books',
+                                       Prefetch('promotii', queryset=Promotii.objects.filter(date_expiry__gte=timezone.now()),
+                                                to_attr='promotii_active'),
+                                   ), pk=pk))
+    return await _render_detail(request, card_html)
+
+
+async def book_detail(request, pk):
+    card_html = await _cached_card(request, 'book', pk, 'aplicatie/book_detail_card.html',
+                                   lambda: aget_object_or_404(Book.objects.with_related(), pk=pk))
+    user = await request.auser()
+    return await sync_to_async(_render_book_detail)(request, user, pk, card_html)
+
+
+def _render_book_detail(request, user, pk, card_html):
+    # Pe firul sincron: cu VIZUALIZARI_BUFFER='sync' vizualizarea se scrie direct în bază
+    if user.is_authenticated:
+        view_events.record(user.pk, pk)
+    return render(request, 'aplicatie/book_detail.html', {'card_html': card_html, 'book_pk': pk, 'user': user})
@@ -0,0 +1,313 @@
+import json
+import math
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: fără RSS maxim în rezultate
+    resource = None
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from . import catalog_cache, view_events
+from .forms import BookFilterForm
+from .models import Author, Book, Category, CustomUser, Order, Publisher, Review, Vizualizari
+from .pagination import encode_cursor
+
+# Benchmark pentru paginile principale (comanda run_benchmark), prin clientul de test Django, deci
+# cu tot lanțul de middleware-uri dar fără server HTTP (debitul sub WSGI/ASGI e în bench_asgi):
+#  - fiecare scenariu trimite aceleași cereri la fiecare rulare (derivate din datele din bază, de
+#    preferat generate cu generate_data) și măsoară latența, interogările și memoria pe cerere;
+#  - totul rulează într-o tranzacție anulată la final: utilizatorii de test, înregistrările și
+#    promoțiile create nu rămân în bază, deci rulările pe aceleași date sunt comparabile;
+#  - implicit cache-ul de catalog e "rece" (versiunea paginii e incrementată înaintea fiecărei
+#    cereri, deci se măsoară drumul până la bază), cu warm=True paginile vin din cache;
+#  - rezultatele se scriu în BENCHMARK_DIR, câte un fișier JSON pe rulare, cu commit-ul curent,
+#    și se compară cu rularea anterioară (compare()).
+
+PASSWORD = 'Parola-benchmark-1'
+STAFF_USERNAME = 'benchmark_staff'
+READER_USERNAME = 'benchmark_cititor'
+WARMUP = 3  # cereri nemăsurate la începutul fiecărui scenariu (template-uri, conexiuni)
+PERCENTILES = (50, 95, 99)
+QUERY_TOLERANCE = 0.5  # interogări în plus (în medie) peste care scenariul e regresie
+# Pe durata rulării: trimiterile de promoții rămân în bază (fără fir de trimitere), vizualizările
+# rămân în buffer până la anulare, iar e-mailurile de confirmare nu pleacă nicăieri
+RUN_SETTINGS = {
+    'PROMOTII_DISPATCH': 'db',
+    'VIZUALIZARI_BUFFER': 'manual',
+    'EMAIL_BACKEND': 'django.core.mail.backends.dummy.EmailBackend',
+}
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+class Scenario:
+    def __init__(self, name, make, expect=200, user=None, fresh_client=False, invalidate=None, settings=None):
+        self.name = name
+        self.make = make  # n -> (metodă, cale, date, antete)
+        self.expect = expect  # statusul unui răspuns reușit
+        self.user = user  # utilizatorul autentificat al clientului
+        self.fresh_client = fresh_client  # client nou, fără cookie-uri, la fiecare cerere
+        self.invalidate = invalidate  # n -> golește cache-ul paginii înaintea cererii (modul rece)
+        self.settings = settings or {}
+
+
+def _cycle(requests):
+    return lambda n: requests[n % len(requests)]
+
+
+def _top(model):
+    # Obiectul cu cele mai multe cărți (cea mai grea pagină filtrată)
+    return model.objects.annotate(n=Count('books')).order_by('-n', 'pk').values_list('pk', flat=True).first()
+
+
+def _deep_cursor(ordering, fraction):
+    # Cursorul paginii de la `fraction` din listă, ca după atâtea clicuri pe "Următoarea"
+    ordering = BookFilterForm.ORDERINGS[ordering]
+    books = Book.objects.order_by(*ordering)
+    book = books[min(int(books.count() * fraction), books.count() - 1)]
+    return encode_cursor([Book._meta.get_field(name.lstrip('-')).value_to_string(book) for name in ordering], 'n')
+
+
+def _bench_users():
+    password = make_password(PASSWORD)
+    common = {'password': password, 'email_confirmat': True, 'favorite_genre': 'Roman'}
+    staff = CustomUser.objects.create(username=STAFF_USERNAME, email='benchmark_staff@example.com', is_staff=True, **common)
+    reader = CustomUser.objects.create(username=READER_USERNAME, email='benchmark_cititor@example.com', **common)
+    return staff, reader
+
+
+def build_scenarios(staff, reader):
+    book_ids = list(Book.objects.order_by('pk').values_list('pk', flat=True))
+    step = max(1, len(book_ids) // 50)
+    detail_ids = book_ids[::step][:50]
+    category, author, publisher = _top(Category), _top(Author), _top(Publisher)
+    word = (Book.objects.order_by('pk').values_list('title', flat=True).first() or 'carte').split()[0]
+    pages = math.ceil(len(book_ids) / settings.BOOK_LIST_PAGE_SIZE)
+    categories = list(Category.objects.order_by('pk').values_list('pk', flat=True)[:3])
+    expiry = (timezone.now() + timedelta(days=30)).date().isoformat()
+
+    def list_request(query, headers=None):
+        return 'get', f'/books/?{query}' if query else '/books/', None, headers or {}
+
+    def invalidate_list(n):
+        catalog_cache.bump(catalog_cache.CATALOG)
+
+    def book_request(n):
+        return 'get', f'/book/{detail_ids[n % len(detail_ids)]}/', None, {}
+
+    def invalidate_book(n):
+        catalog_cache.bump('book', detail_ids[n % len(detail_ids)])
+
+    def register_request(n):
+        return 'post', '/register/', {
+            'username': f'benchmark{n}', 'email': f'benchmark{n}@example.com', 'first_name': 'Ana', 'last_name': 'Popescu',
+            'password1': PASSWORD, 'password2': PASSWORD, 'favorite_genre': 'Roman', 'birth_date': '1990-05-17',
+            'phone_number': '0712345678', 'address': 'Str. Lungă 1, Brașov', 'reading_frequency': 'weekly',
+        }, {}
+
+    def promotion_request(n):
+        return 'post', '/promotii/', {
+            'name': f'Benchmark {n}', 'discount_percentage': '10', 'description': 'Promoție de test',
+            'date_expiry': expiry, 'categories': categories,
+        }, {}
+
+    return [
+        # Combinații de filtre pe prima pagină (HTML și AJAX, cu și fără total)
+        Scenario('book_list', _cycle([
+            list_request(''),
+            list_request('ordonare=pret'),
+            list_request(f'category={category}'),
+            list_request(f'author={author}'),
+            list_request(f'publisher={publisher}&min_price=20&max_price=60'),
+            list_request(f'q={word}'),
+            list_request(f'category={category}&ordonare=pret&total=on', AJAX),
+            list_request('total=on', AJAX),
+        ]), invalidate=invalidate_list),
+        # Pagini adânci: cursor (cost constant) și, pentru comparație, OFFSET clasic
+        Scenario('book_list_deep_cursor', _cycle([
+            list_request(f'cursor={_deep_cursor("noi", 0.5)}'),
+            list_request(f'cursor={_deep_cursor("noi", 0.95)}'),
+            list_request(f'ordonare=pret&cursor={_deep_cursor("pret", 0.95)}'),
+        ]), invalidate=invalidate_list),
+        Scenario('book_list_deep_offset', _cycle([
+            list_request(f'page={max(1, pages // 2)}'),
+            list_request(f'page={pages}'),
+        ]), invalidate=invalidate_list, settings={'BOOK_LIST_PAGINATION': 'offset'}),
+        Scenario('book_detail', book_request, invalidate=invalidate_book),
+        Scenario('book_detail_logged_in', book_request, user=reader, invalidate=invalidate_book),
+        Scenario('register', register_request, expect=302, fresh_client=True),
+        Scenario('login', lambda n: ('post', '/login/', {'username': READER_USERNAME, 'password': PASSWORD}, {}),
+                 expect=302, fresh_client=True),
+        Scenario('promotii', lambda n: ('get', '/promotii/', None, {}), user=staff),
+        Scenario('promotii_create', promotion_request, expect=302, user=staff),
+    ]
+
+
+def _percentile(values, q):
+    return values[int(q / 100 * (len(values) - 1))] if values else 0.0
+
+
+def measure(scenario, requests, warm=False, trace_memory=False):
+    # -> {'requests', 'errors', 'p50_ms', ..., 'queries_mean', 'queries_max', 'max_rss_mb', 'alloc_peak_kb'}
+    latencies, queries, errors = [], [], 0
+    executed = [0]
+
+    def count(execute, sql, params, many, context):
+        executed[0] += 1
+        return execute(sql, params, many, context)
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+        allocated = tracemalloc.get_traced_memory()[0]
+    client = None
+    with override_settings(**scenario.settings):
+        for n in range(WARMUP + requests):
+            if client is None or scenario.fresh_client:
+                client = Client(HTTP_HOST='localhost')
+                if scenario.user is not None:
+                    client.force_login(scenario.user)
+            method, path, data, headers = scenario.make(n)
+            if scenario.invalidate and not warm:
+                scenario.invalidate(n)
+            executed[0] = 0
+            started = time.perf_counter()
+            with connection.execute_wrapper(count):
+                response = getattr(client, method)(path, data, **headers)
+            elapsed = time.perf_counter() - started
+            if n < WARMUP:
+                continue
+            latencies.append(elapsed)
+            queries.append(executed[0])
+            errors += response.status_code != scenario.expect
+    latencies.sort()
+    result = {'requests': requests, 'errors': errors}
+    result.update({f'p{q}_ms': _percentile(latencies, q) * 1000 for q in PERCENTILES})
+    result.update({
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        'queries_mean': sum(queries) / len(queries) if queries else 0.0,
+        'queries_max': max(queries, default=0),
+        # RSS maxim al procesului (KB pe Linux); crește monoton, deci arată scenariul care îl împinge
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None,
+        'alloc_peak_kb': (tracemalloc.get_traced_memory()[1] - allocated) / 1024 if trace_memory else None,
+    })
+    return result
+
+
+def git_commit():
+    # -> (hash scurt, modificări necomise) sau (None, None) în afara unui depozit git
+    try:
+        head = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                              capture_output=True, text=True, timeout=10)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+    if head.returncode:
+        return None, None
+    return head.stdout.strip(), bool(status.stdout.strip())
+
+
+def dataset():
+    return {
+        'books': Book.objects.count(),
+        'users': CustomUser.objects.count(),
+        'orders': Order.objects.count(),
+        'reviews': Review.objects.count(),
+        'views': Vizualizari.objects.count(),
+    }
+
+
+def run(requests=50, warm=False, trace_memory=False, only=None, progress=None):
+    # -> rezultatul complet (de salvat cu save()); only: numele scenariilor de rulat
+    commit, dirty = git_commit()
+    result = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'cache': settings.BOOKSTORE_CACHE,
+        'options': {'requests': requests, 'warm': warm, 'pagination': settings.BOOK_LIST_PAGINATION},
+        'dataset': dataset(),
+        'scenarios': {},
+    }
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with override_settings(**RUN_SETTINGS), transaction.atomic():
+            for scenario in build_scenarios(*_bench_users()):
+                if only and scenario.name not in only:
+                    continue
+                result['scenarios'][scenario.name] = measure(scenario, requests, warm, trace_memory)
+                if progress:
+                    progress(scenario.name, result['scenarios'][scenario.name])
+            view_events.buffer.flush()  # vizualizările din buffer se anulează odată cu restul
+            transaction.set_rollback(True)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result
+
+
+# --- rezultate ---
+
+def save(result, directory=None):
+    directory = Path(directory or settings.BENCHMARK_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    path = directory / f"{stamp}-{result['commit'] or 'fara-git'}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def latest(directory=None, exclude=None):
+    # Cea mai recentă rulare salvată (numele încep cu data), alta decât `exclude`
+    directory = Path(directory or settings.BENCHMARK_DIR)
+    paths = sorted(path for path in directory.glob('*.json') if path != exclude) if directory.is_dir() else []
+    return paths[-1] if paths else None
+
+
+def differences(current, baseline):
+    # Ce face două rulări necomparabile direct (alte date, alt cache, alte opțiuni)
+    keys = ('database', 'cache', 'dataset')
+    changed = [key for key in keys if current.get(key) != baseline.get(key)]
+    options, baseline_options = current['options'], baseline.get('options', {})
+    return changed + [key for key in ('warm', 'pagination') if options.get(key) != baseline_options.get(key)]
+
+
+def compare(current, baseline, threshold=None):
+    # -> [{'scenario', 'p95_ms', 'baseline_p95_ms', 'change', 'queries_mean', 'baseline_queries_mean', 'regression'}]
+    threshold = settings.BENCHMARK_REGRESSION_THRESHOLD if threshold is None else threshold
+    rows = []
+    for name, now in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        change = now['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0.0
+        rows.append({
+            'scenario': name,
+            'p95_ms': now['p95_ms'],
+            'baseline_p95_ms': before['p95_ms'],
+            'change': change,
+            'queries_mean': now['queries_mean'],
+            'baseline_queries_mean': before['queries_mean'],
+            'regression': change > threshold or now['queries_mean'] > before['queries_mean'] + QUERY_TOLERANCE,
+        })
+    return rows
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from . import metrics
+
+# Cache pentru paginile de catalog (listă + detalii). Se cache-uiesc doar fragmentele
+# care nu depind de utilizator (tabelul de cărți, cardul cărții etc.); bara de navigare,
+# mesajele și widget-ul "Văzute recent" se randează în continuare la fiecare cerere.
+#
+# Invalidarea se face prin versiuni: fiecare obiect are o versiune în cache
+# (ex. 'ver:book:12'), iar lista are o "generație" a întregului catalog. Cheile
+# fragmentelor conțin versiunea, deci semnalele (signals.py) doar schimbă
+# versiunea, iar intrările vechi expiră singure.
+#
+# Versiunile stau în cache-ul CATALOG_VERSION_CACHE_ALIAS, partajat între procese
+# (și cu fragmentele în locmem): o scriere făcută într-un worker invalidează
+# fragmentele din toți. O versiune nouă e timpul curent în ns, scris cu set, nu incr:
+# pe cache-ul pe disc incr e citire + scriere, deci două schimbări simultane ar putea
+# ajunge la aceeași valoare; două momente diferite dau versiuni diferite.
+
+CATALOG = 'catalog'
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _count(region, outcome):
+    with _stats_lock:
+        region_stats = _stats.setdefault(region, {'hits': 0, 'misses': 0})
+        region_stats[outcome] += 1
+    metrics.CACHE_REQUESTS.inc(region=region, result='hit' if outcome == 'hits' else 'miss')
+
+
+def stats():
+    with _stats_lock:
+        result = {region: dict(values) for region, values in _stats.items()}
+    for values in result.values():
+        total = values['hits'] + values['misses']
+        values['hit_ratio'] = values['hits'] / total if total else 0.0
+    return result
+
+
+def _version_key(kind, pk=None):
+    return f'ver:{kind}' if pk is None else f'ver:{kind}:{pk}'
+
+
+def _versions():
+    return caches[settings.CATALOG_VERSION_CACHE_ALIAS]
+
+
+def get_version(kind, pk=None):
+    key = _version_key(kind, pk)
+    versions = _versions()
+    version = versions.get(key)
+    if version is None:
+        # Pornim de la timp (ns), nu de la 0: dacă cheia e evacuată din cache,
+        # noua versiune nu poate coincide cu una veche, deci nu reînviem fragmente expirate
+        versions.add(key, time.time_ns(), None)
+        version = versions.get(key, 0)
+    return version
+
+
+def bump(kind, *pks):
+    keys = [_version_key(kind)] if not pks else [_version_key(kind, pk) for pk in pks if pk is not None]
+    if keys:
+        _versions().set_many(dict.fromkeys(keys, time.time_ns()), None)
+
+
+def bump_many(kind, pks):
+    # Pentru scrierile în masă (catalog_io): versiuni noi pentru multe obiecte cu un singur set_many
+    version = time.time_ns()
+    _versions().set_many({_version_key(kind, pk): version for pk in pks if pk is not None}, None)
+
+
+def params_key(params, ignore=()):
+    # Cheie stabilă pentru o combinație de parametri GET (ordinea nu contează)
+    items = sorted((k, v) for k, v in params.lists() if k not in ignore)
+    return hashlib.md5(json.dumps(items).encode()).hexdigest()
+
+
+def _page_key(region, key_parts):
+    return f'pagina:{region}:' + ':'.join(str(part) for part in key_parts)
+
+
+def get_or_build(region, key_parts, build, timeout=None):
+    # build() -> valoare serializabilă (HTML, dict etc.) calculată doar la miss
+    key = _page_key(region, key_parts)
+    value = cache.get(key)
+    if value is not None:
+        _count(region, 'hits')
+        return value
+    _count(region, 'misses')
+    value = build()
+    cache.set(key, value, timeout or settings.CATALOG_CACHE_TIMEOUT)
+    return value
+
+
+# Variantele async (view-urile din async_views.py): aceleași chei, deci fragmentele sunt
+# comune cu view-urile sincrone
+
+async def aget_version(kind, pk=None):
+    key = _version_key(kind, pk)
+    versions = _versions()
+    version = await versions.aget(key)
+    if version is None:
+        await versions.aadd(key, time.time_ns(), None)
+        version = await versions.aget(key, 0)
+    return version
+
+
+async def aget_or_build(region, key_parts, build, timeout=None):
+    # build() -> corutină, așteptată doar la miss
+    key = _page_key(region, key_parts)
+    value = await cache.aget(key)
+    if value is not None:
+        _count(region, 'hits')
+        return value
+    _count(region, 'misses')
+    value = await build()
+    await cache.aset(key, value, timeout or settings.CATALOG_CACHE_TIMEOUT)
+    return value
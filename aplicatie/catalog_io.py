@@ -0,0 +1,263 @@
+import csv
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from . import catalog_cache, search
+from .models import Author, Book, Category, Publisher
+
+logger = logging.getLogger('django')
+
+# Import/export în masă pentru catalog (cărți cu autor, editură și categorii), CSV sau JSON lines:
+#  - rândurile se citesc în flux și se scriu în bucăți de CATALOG_IMPORT_CHUNK_SIZE, fiecare bucată
+#    într-o tranzacție (bulk_create pentru cărțile noi, bulk_update pentru cele cu `id` existent);
+#  - autorii, editurile și categoriile se găsesc după nume în dicționare nume -> id încărcate o dată,
+#    iar numele noi se creează tot în masă; legăturile cu categoriile merg direct în tabelul M2M;
+#  - bulk_create/bulk_update nu trimit semnale, deci indexul de căutare și versiunile din
+#    catalog_cache se actualizează aici, pentru fiecare bucată scrisă;
+#  - exportul citește totul într-o singură tranzacție doar pentru citire (REPEATABLE READ READ ONLY pe
+#    PostgreSQL, BEGIN DEFERRED pe SQLite), deci un instantaneu consistent chiar dacă în timpul lui se
+#    modifică date, tot pe bucăți după cheia primară. Pe SQLite nu se folosește transaction.atomic():
+#    cu transaction_mode IMMEDIATE ar ține lock-ul de scriere cât timp clientul descarcă exportul.
+
+FIELDS = ('id', 'title', 'description', 'price', 'publication_date', 'stock', 'author', 'publisher', 'categories')
+BOOK_FIELDS = ('title', 'description', 'price', 'publication_date', 'stock')
+UPDATE_FIELDS = BOOK_FIELDS + ('author', 'publisher')
+CATEGORY_SEPARATOR = '|'  # în CSV categoriile sunt într-o singură coloană
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+MAX_ERRORS = 100  # câte erori de rând se păstrează în rezultat
+
+
+def detect_format(name):
+    return 'csv' if str(name).lower().endswith('.csv') else 'jsonl'
+
+
+# --- import ---
+
+def read_rows(stream, fmt):
+    # -> (număr de linie, dict sau None pentru o linie JSON invalidă)
+    if fmt == 'csv':
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            yield line, row
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+def _clean(model, name, value):
+    field = model._meta.get_field(name)
+    if value in ('', None):
+        value = field.get_default() if field.has_default() else None
+    return field.clean(value, None)
+
+
+def parse_row(raw):
+    # -> dict curățat cu validarea câmpurilor modelului; ValueError pentru rândurile invalide
+    if raw is None:
+        raise ValueError("JSON invalid")
+    try:
+        row = {name: _clean(Book, name, raw.get(name)) for name in BOOK_FIELDS}
+        if row['stock'] < 0:  # constrângerea book_stock_nonnegative ar opri toată bucata
+            raise ValueError("Stocul nu poate fi negativ.")
+        row['author'] = _clean(Author, 'name', (raw.get('author') or '').strip())
+        row['publisher'] = _clean(Publisher, 'name', (raw.get('publisher') or '').strip())
+        categories = raw.get('categories')
+        if isinstance(categories, str):
+            categories = categories.split(CATEGORY_SEPARATOR)
+        if categories is not None:  # lipsa coloanei păstrează categoriile existente; lista goală le șterge
+            categories = [str(name).strip() for name in categories]
+            categories = list(dict.fromkeys(_clean(Category, 'name', name) for name in categories if name))
+        row['categories'] = categories
+        row['id'] = int(raw['id']) if str(raw.get('id') or '').strip() else None
+    except ValidationError as e:
+        raise ValueError('; '.join(e.messages))
+    return row
+
+
+class NameMap:
+    # nume -> id pentru Author/Publisher/Category; la nume duplicate în bază câștigă cel mai vechi
+    def __init__(self, model):
+        self.model = model
+        self.ids = {}
+        for pk, name in model.objects.order_by('-pk').values_list('pk', 'name').iterator(chunk_size=10000):
+            self.ids[name] = pk
+
+    def resolve(self, names):
+        missing = sorted(set(names) - self.ids.keys())
+        if missing:
+            # bulk_create întoarce cheile primare (RETURNING) pe PostgreSQL și SQLite >= 3.35
+            for obj in self.model.objects.bulk_create([self.model(name=name) for name in missing]):
+                self.ids[obj.name] = obj.pk
+        return self.ids
+
+
+class CatalogImporter:
+    def __init__(self, chunk_size=None, progress=None):
+        self.chunk_size = chunk_size or settings.CATALOG_IMPORT_CHUNK_SIZE
+        self.progress = progress
+        self.authors = NameMap(Author)
+        self.publishers = NameMap(Publisher)
+        self.categories = NameMap(Category)
+        self.explicit_ids = False
+        self.result = {'created': 0, 'updated': 0, 'skipped': 0, 'chunks': 0, 'errors': []}
+
+    def run(self, rows):
+        # rows: (număr de linie, dict) din read_rows; -> result
+        started = time.perf_counter()
+        chunk = {}
+        for line, raw in rows:
+            try:
+                row = parse_row(raw)
+            except ValueError as e:
+                self.result['skipped'] += 1
+                if len(self.result['errors']) < MAX_ERRORS:
+                    self.result['errors'].append({'line': line, 'error': str(e)})
+                continue
+            # Același id de două ori în bucată: rămâne ultimul rând
+            chunk[row['id'] if row['id'] is not None else ('linie', line)] = row
+            if len(chunk) >= self.chunk_size:
+                self.write(list(chunk.values()))
+                chunk = {}
+        if chunk:
+            self.write(list(chunk.values()))
+        if self.explicit_ids:
+            # Cărțile noi cu id dat (ex. dintr-un export) nu avansează secvența pe PostgreSQL
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Book]):
+                    cursor.execute(sql)
+        self.result['seconds'] = time.perf_counter() - started
+        self.result['rows_per_second'] = (self.result['created'] + self.result['updated']) / (self.result['seconds'] or 1)
+        return self.result
+
+    def write(self, rows):
+        through = Book.categories.through
+        quote = connection.ops.quote_name
+        with transaction.atomic():
+            authors = self.authors.resolve(row['author'] for row in rows)
+            publishers = self.publishers.resolve(row['publisher'] for row in rows)
+            categories = self.categories.resolve(name for row in rows for name in row['categories'] or ())
+            given = [row['id'] for row in rows if row['id'] is not None]
+            # id -> (autorul, editura) de dinainte, ca paginile lor să fie invalidate și ele
+            existing = {pk: (author_id, publisher_id) for pk, author_id, publisher_id in
+                        Book.objects.filter(pk__in=given).values_list('pk', 'author_id', 'publisher_id')} if given else {}
+
+            new, changed = [], []  # (carte, categoriile din rând sau None)
+            for row in rows:
+                book = Book(pk=row['id'], author_id=authors[row['author']], publisher_id=publishers[row['publisher']],
+                            **{name: row[name] for name in BOOK_FIELDS})
+                (changed if row['id'] in existing else new).append((book, row['categories']))
+            self.explicit_ids = self.explicit_ids or any(book.pk is not None for book, _ in new)
+            Book.objects.bulk_create([book for book, _ in new])  # completează pk-urile
+            Book.objects.bulk_update([book for book, _ in changed], UPDATE_FIELDS, batch_size=1000)
+
+            links = new + changed
+            old_categories = set()
+            if changed:
+                previous = through.objects.filter(book_id__in=[book.pk for book, _ in changed])
+                old_categories = set(previous.values_list('category_id', flat=True))
+                previous.filter(book_id__in=[book.pk for book, names in changed if names is not None]).delete()
+            new_categories = {categories[name] for _, names in links for name in names or ()}
+            # Perechi de întregi direct în tabelul M2M, fără câte un obiect model pe legătură
+            # (numele sunt unice pe rând, iar legăturile înlocuite s-au șters mai sus)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f'INSERT INTO {quote(through._meta.db_table)} ({quote("book_id")}, {quote("category_id")}) VALUES (%s, %s)',
+                    [(book.pk, categories[name]) for book, names in links for name in names or ()],
+                )
+            search.index_books([book.pk for book, _ in links])
+
+        # După commit: paginile catalogului afectate primesc versiuni noi
+        catalog_cache.bump(catalog_cache.CATALOG)
+        catalog_cache.bump_many('book', existing)
+        catalog_cache.bump_many('author', {book.author_id for book, _ in links} | {ids[0] for ids in existing.values()})
+        catalog_cache.bump_many('publisher', {book.publisher_id for book, _ in links} | {ids[1] for ids in existing.values()})
+        catalog_cache.bump_many('category', old_categories | new_categories)
+
+        self.result['created'] += len(new)
+        self.result['updated'] += len(changed)
+        self.result['chunks'] += 1
+        if self.progress:
+            self.progress(self.result)
+
+
+def import_catalog(stream, fmt, chunk_size=None, progress=None):
+    # -> {'created', 'updated', 'skipped', 'chunks', 'errors', 'seconds', 'rows_per_second'}
+    result = CatalogImporter(chunk_size, progress).run(read_rows(stream, fmt))
+    logger.info(f"Import catalog: {result['created']} cărți noi, {result['updated']} actualizate, "
+                f"{result['skipped']} rânduri sărite în {result['seconds']:.1f} s")
+    return result
+
+
+# --- export ---
+
+@contextmanager
+def _read_snapshot():
+    # Tranzacție doar pentru citire; în WAL o tranzacție DEFERRED care doar citește nu blochează scriitorii
+    if connection.vendor == 'sqlite' and connection.get_autocommit():
+        with connection.cursor() as cursor:
+            cursor.execute('BEGIN DEFERRED')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('ROLLBACK')  # nu s-a scris nimic
+        return
+    with transaction.atomic():  # în interiorul unei tranzacții existente: savepoint, același instantaneu
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        yield
+
+
+def export_rows(chunk_size=None):
+    # Dicționare cu FIELDS, în ordinea cheii primare, dintr-un singur instantaneu al bazei
+    chunk_size = chunk_size or settings.CATALOG_EXPORT_CHUNK_SIZE
+    through = Book.categories.through
+    with _read_snapshot():
+        last_pk = 0
+        while True:
+            books = list(
+                Book.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', *BOOK_FIELDS, 'author__name', 'publisher__name')[:chunk_size]
+            )
+            if not books:
+                return
+            last_pk = books[-1][0]
+            names = {}
+            for book_id, name in (through.objects.filter(book_id__gte=books[0][0], book_id__lte=last_pk)
+                                  .order_by('book_id', 'category__name').values_list('book_id', 'category__name')):
+                names.setdefault(book_id, []).append(name)
+            for values in books:
+                yield {**dict(zip(FIELDS, values)), 'categories': names.get(values[0], [])}
+
+
+class _Echo:
+    # "Fișier" pentru csv.writer care întoarce rândul în loc să-l scrie (pentru răspunsuri în flux)
+    def write(self, value):
+        return value
+
+
+def export_lines(fmt, chunk_size=None):
+    # Liniile exportului (CSV cu antet sau JSON lines), generate pe măsură ce se citesc cărțile
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(FIELDS)
+        for row in export_rows(chunk_size):
+            row['categories'] = CATEGORY_SEPARATOR.join(row['categories'])
+            yield writer.writerow([row[name] if row[name] is not None else '' for name in FIELDS])
+        return
+    for row in export_rows(chunk_size):
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
@@ -0,0 +1,220 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+
+# Mesajele din formularul de contact, într-un jurnal append-only (mesaje.jsonl) plus un index SQLite:
+#  - fiecare mesaj e o linie JSON scrisă cu un singur os.write pe un descriptor O_APPEND,
+#    deci scrierile concurente (fire sau procese) nu se amestecă și nu se suprascriu;
+#  - fsync-ul se face în grup: la CONTACT_STORE_FSYNC_EVERY mesaje sau după CONTACT_STORE_FSYNC_INTERVAL
+#    secunde, nu la fiecare mesaj (se pot pierde cel mult atâtea mesaje la o cădere de curent);
+#  - indexul (index.sqlite3) păstrează doar câmpurile de căutare și poziția liniei în jurnal,
+#    iar paginarea (keyset pe id) citește din jurnal doar liniile paginii cerute;
+#  - indexul se poate reconstrui oricând din jurnal (rebuild_index).
+
+LOG_NAME = 'mesaje.jsonl'
+INDEX_NAME = 'index.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mesaje (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    received_at TEXT NOT NULL,
+    tip_mesaj TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    subiect TEXT NOT NULL DEFAULT '',
+    source TEXT UNIQUE,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mesaje_tip_idx ON mesaje (tip_mesaj, id);
+CREATE INDEX IF NOT EXISTS mesaje_email_idx ON mesaje (email, id);
+CREATE INDEX IF NOT EXISTS mesaje_received_idx ON mesaje (received_at, id);
+"""
+
+
+def _now_iso():
+    return datetime.now(dt_timezone.utc).isoformat(timespec='milliseconds')
+
+
+class MessageStore:
+    def __init__(self, directory, fsync_every=None, fsync_interval=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / LOG_NAME
+        self.index_path = self.directory / INDEX_NAME
+        self.fsync_every = fsync_every or settings.CONTACT_STORE_FSYNC_EVERY
+        self.fsync_interval = settings.CONTACT_STORE_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+        self._fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._timer = None
+        self._local = threading.local()
+        with self._index() as db:
+            db.executescript(SCHEMA)
+
+    def _index(self):
+        # O conexiune SQLite pe fir (obiectele sqlite3 nu se partajează între fire)
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.index_path, timeout=20)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.row_factory = sqlite3.Row
+        return db
+
+    # --- scriere ---
+
+    def append(self, data, received_at=None, source=None):
+        # -> id-ul mesajului; `source` (ex. numele fișierului importat) face importul idempotent
+        received_at = received_at or _now_iso()
+        record = {'received_at': received_at, **data}
+        if source is not None:
+            record['source'] = source
+        line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            db = self._index()
+            if source is not None and db.execute('SELECT 1 FROM mesaje WHERE source = ?', (source,)).fetchone():
+                return None
+            os.write(self._fd, line)
+            end = os.lseek(self._fd, 0, os.SEEK_CUR)  # poziția descriptorului nostru, după scrierea O_APPEND
+            self._pending += 1
+            if self._pending >= self.fsync_every:
+                self._sync()
+            elif self._timer is None and self.fsync_interval:
+                self._timer = threading.Timer(self.fsync_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            with db:
+                cursor = db.execute(
+                    'INSERT OR IGNORE INTO mesaje (received_at, tip_mesaj, email, subiect, source, offset, length) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (received_at, *self._fields(record), source, end - len(line), len(line)),
+                )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    @staticmethod
+    def _fields(record):
+        return str(record.get('tip_mesaj') or ''), str(record.get('email') or '').lower(), str(record.get('subiect') or '')
+
+    def _sync(self):
+        # Apelat cu self._lock luat
+        if self._pending:
+            os.fsync(self._fd)
+            self._pending = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self):
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            os.close(self._fd)
+            self._fd = None
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    # --- citire ---
+
+    def _read(self, rows):
+        records = []
+        with open(self.log_path, 'rb') as f:
+            for row in rows:
+                f.seek(row['offset'])
+                try:
+                    record = json.loads(f.read(row['length']))
+                except ValueError:
+                    continue  # linie pierdută la o cădere înainte de fsync
+                records.append({'id': row['id'], **record})
+        return records
+
+    def get(self, message_id):
+        row = self._index().execute('SELECT * FROM mesaje WHERE id = ?', (message_id,)).fetchone()
+        return self._read([row])[0] if row else None
+
+    def query(self, tip_mesaj=None, email=None, since=None, until=None, before=None, limit=50):
+        # Cele mai noi mesaje întâi; `before` e cursorul (id-ul ultimului mesaj din pagina anterioară)
+        # -> (mesaje, cursorul paginii următoare sau None)
+        where, params = [], []
+        for clause, value in (('tip_mesaj = ?', tip_mesaj), ('email = ?', email and email.lower()),
+                              ('received_at >= ?', since), ('received_at < ?', until), ('id < ?', before)):
+            if value:
+                where.append(clause)
+                params.append(value)
+        sql = 'SELECT * FROM mesaje'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        rows = self._index().execute(sql, (*params, limit + 1)).fetchall()
+        next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+        return self._read(rows[:limit]), next_cursor
+
+    def count(self):
+        return self._index().execute('SELECT COUNT(*) FROM mesaje').fetchone()[0]
+
+    def rebuild_index(self):
+        # Reface indexul din jurnal (ex. după pierderea fișierului index.sqlite3)
+        self.flush()
+        entries = []
+        offset = 0
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    offset += len(line)
+                    continue
+                entries.append((record.get('received_at') or '', *self._fields(record), record.get('source'), offset, len(line)))
+                offset += len(line)
+        with self._index() as db:
+            db.execute('DELETE FROM mesaje')
+            db.executemany(
+                'INSERT OR IGNORE INTO mesaje (received_at, tip_mesaj, email, subiect, source, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                entries,
+            )
+        return len(entries)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None or _store.directory != Path(settings.CONTACT_STORE_DIR):
+            _store = MessageStore(settings.CONTACT_STORE_DIR)
+        return _store
+
+
+@atexit.register
+def _flush_on_exit():
+    if _store is not None and _store._fd is not None:
+        _store.flush()
+
+
+def import_json_files(store, paths):
+    # Importă fișierele vechi mesaje/mesaj_<unix_ts>.json, în ordine cronologică; -> (importate, sărite)
+    imported = skipped = 0
+    for path in sorted(paths, key=lambda p: (p.stat().st_mtime, p.name)):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        stamp = path.stem.rpartition('_')[2]
+        moment = int(stamp) if stamp.isdigit() else int(path.stat().st_mtime)
+        received_at = datetime.fromtimestamp(moment, dt_timezone.utc).isoformat(timespec='milliseconds')
+        if store.append(data, received_at=received_at, source=path.name) is None:
+            skipped += 1
+        else:
+            imported += 1
+    store.flush()
+    return imported, skipped
@@ -1,94 +1,63 @@
 from django.core.management.base import BaseCommand
-from aplicatie.models import CustomUser, Book, Order, Review
+from aplicatie import metrics, newsletter, orders, purge, reports
 from django.contrib.sessions.models import Session
 from django.utils import timezone
-from datetime import timedelta
 import os
 import logging
-from django.core.mail import send_mass_mail
 from django.conf import settings
 
 logger = logging.getLogger('django')
 
+# Job-urile programate (SCHEDULED_JOBS în settings, rulate de comanda run_scheduler).
+# Fiecare întoarce numărul de rânduri afectate (sau None), salvat în istoricul JobRun.
+
+@metrics.timed(metrics.CRON_DURATION, job='clean_unconfirmed_users')
+def clean_unconfirmed_users():
+    #sterge utilizatorii care sunt inregistrați dar nu au e-mail confirmat, la fiecare 60 de minute.
+    # În loturi scurte, reluabil (vezi purge.py); limita de vârstă e UNCONFIRMED_USER_MAX_AGE
+    return purge.purge_unconfirmed_users()['rows']
+
+
+@metrics.timed(metrics.CRON_DURATION, job='send_newsletter')
+def send_newsletter():
+    #Trimite un newsletter către toți utilizatorii mai vechi de 2 minute, în fiecare joi la 18:00.
+    # Un număr pe săptămână; o rulare repetată trimite doar adresele rămase (vezi newsletter.py)
+    return newsletter.send_newsletter().sent
+
+
+@metrics.timed(metrics.CRON_DURATION, job='clear_sessions')
+def clear_sessions():
+    #Șterge sesiunile expirate, la fiecare 60 de minute.
+    # Un singur DELETE pe indexul expire_date; cookie-urile semnate expiră singure
+    if settings.SESSION_ENGINE.endswith('signed_cookies'):
+        return 0
+    return Session.objects.filter(expire_date__lt=timezone.now()).delete()[0]
+
+
+@metrics.timed(metrics.CRON_DURATION, job='generate_activity_report')
+def generate_activity_report():
+    #Actualizează rollup-urile zilnice (doar zilele noi) și scrie raportul săptămânal, în fiecare duminică la 23:59.
+    days = reports.rollup_pending(include_today=True)
+    paths = reports.write_report('weekly', timezone.localdate())
+    logger.info(f"Raport de activitate generat ({days} zile agregate) și salvat în {', '.join(map(str, paths))}")
+    return days
+
+
+@metrics.timed(metrics.CRON_DURATION, job='release_expired_orders')
+def release_expired_orders():
+    #Returnează în stoc rezervările comenzilor neconfirmate a căror valabilitate a expirat, în fiecare minut.
+    return orders.release_expired()
+
+
 class Command(BaseCommand):
     help = 'Scheduled tasks for the bookstore application'
 
+    # Pentru rulare manuală din shell (vezi comenzishell.txt)
     def clean_unconfirmed_users(self):
-        #sterge utilizatorii care sunt inregistrați dar nu au e-mail confirmat, la fiecare 60 de minute.
-        two_minutes_ago = timezone.now() - timedelta(minutes=2)  # doar 2 minute pentru testare
-        unconfirmed_users = CustomUser.objects.filter(email_confirmat=False, date_joined__lte=two_minutes_ago)
-        count = unconfirmed_users.count()
-        unconfirmed_users.delete()
-        logger.info(f"Șterse {count} utilizatori fără e-mail confirmat.")
+        return clean_unconfirmed_users()
 
     def send_newsletter(self):
-        #Trimite un newsletter către toți utilizatorii mai vechi de 2 minute, în fiecare joi la 18:00.
-        two_minutes_ago = timezone.now() - timedelta(minutes=2)  # folosim 2 minute pentru testare
-        users = CustomUser.objects.filter(date_joined__lte=two_minutes_ago)
-        
-        messages = []
-        newsletter_subject = 'Newsletter Bookstore - Oferte speciale!'
-        newsletter_message = """
-        Bună,
-
-        Vă invităm să descoperiți ultimele noastre oferte și cărți noi pe Bookstore!
-        Accesați site-ul nostru la http://127.0.0.1:8000 pentru mai multe detalii.
-
-        Cu respect,
-        Echipa Bookstore
-        """
-        
-        for user in users:
-            messages.append((
-                newsletter_subject,
-                newsletter_message,
-                'no-reply@bookstore.example.com',
-                [user.email],
-            ))
-        
-        if messages:
-            send_mass_mail(messages, fail_silently=True)
-            logger.info(f"Newsletter trimis către {len(messages)} utilizatori.")
-        else:
-            logger.warning("Nu există utilizatori eligibili pentru newsletter.")
+        return send_newsletter()
 
     def generate_activity_report(self):
-        #Generează un raport zilnic cu numărul de utilizatori noi și acțiunile/erorile importante, salvat în fiecare duminică la 23:59.
-        from datetime import date
-        
-        today = date.today()
-        start_of_day = timezone.make_aware(timezone.datetime.combine(today, timezone.datetime.min.time()))
-        end_of_day = timezone.make_aware(timezone.datetime.combine(today, timezone.datetime.max.time()))
-        
-        # Număr de utilizatori noi (înregistrați astăzi)
-        new_users_count = CustomUser.objects.filter(date_joined__range=(start_of_day, end_of_day)).count()
-        
-        # Acțiuni importante (ex. cărți create, comenzi plasate, recenzii adăugate)
-        books_created = Book.objects.filter(created_at__range=(start_of_day, end_of_day)).count()
-        orders_placed = Order.objects.filter(created_at__range=(start_of_day, end_of_day)).count()
-        reviews_added = Review.objects.filter(created_at__range=(start_of_day, end_of_day)).count()
-        
-        # Accesează fișierele de log folosind configurația din settings.LOGGING
-        error_logs = settings.LOGGING['handlers']['error_file']['filename']
-        critical_logs = settings.LOGGING['handlers']['critical_file']['filename']
-        
-        report_content = f"""
-Raport de Activitate - {today}
-
-1. Număr de utilizatori noi: {new_users_count}
-2. Acțiuni importante:
-   - Cărți create: {books_created}
-   - Comenzi plasate: {orders_placed}
-   - Recenzii adăugate: {reviews_added}
-3. Erori și probleme:
-   - Verificați fișierul de erori: {error_logs}
-   - Verificați fișierul de erori critice: {critical_logs}
-
-Generat automat de Bookstore.
-        """
-        
-        report_path = settings.REPORTS_DIR / f'report_{today}.txt'
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report_content)
-        
-        logger.info(f"Raport de activitate generat și salvat în {report_path}")
\ No newline at end of file
+        return generate_activity_report()
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q
+
+from .models import Book
+
+# Fațete pentru filtrul de cărți: câte rezultate ar da fiecare opțiune din formular.
+# Fiecare fațetă ignoră propriul filtru (altfel, după ce alegi un autor, ceilalți ar
+# apărea toți cu 0), dar le respectă pe celelalte. În total 4 interogări grupate.
+
+# (cheie, etichetă, preț minim inclusiv, preț maxim exclusiv)
+PRICE_BUCKETS = [
+    ('sub_30', 'Sub 30 lei', None, 30),
+    ('30_60', '30 - 60 lei', 30, 60),
+    ('60_100', '60 - 100 lei', 60, 100),
+    ('peste_100', 'Peste 100 lei', 100, None),
+]
+
+PRICE_FILTERS = ('min_price', 'max_price')
+
+
+def _base(filters, *exclude):
+    return Book.objects.filter(*[q for name, q in filters.items() if name not in exclude])
+
+
+def _grouped(queryset, field):
+    rows = queryset.order_by().values(field).annotate(n=Count('pk', distinct=True))
+    return {row[field]: row['n'] for row in rows if row[field] is not None}
+
+
+def _price_q(low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+def compute_facets(filters):
+    # filters: dict nume_câmp -> Q, vezi BookFilterForm.get_filters()
+    facets = {
+        'author': _grouped(_base(filters, 'author'), 'author'),
+        'publisher': _grouped(_base(filters, 'publisher'), 'publisher'),
+        'category': _grouped(_base(filters, 'category'), 'categories'),
+    }
+
+    # Prețul și stocul dintr-un singur aggregate: fiecare numărătoare aplică filtrul celeilalte fațete
+    price_q = Q(*[filters[name] for name in PRICE_FILTERS if name in filters])
+    stock_q = filters.get('stock', Q())
+    aggregates = {
+        f'price_{key}': Count('pk', filter=_price_q(low, high) & stock_q)
+        for key, label, low, high in PRICE_BUCKETS
+    }
+    aggregates['stock_disponibil'] = Count('pk', filter=Q(stock__gt=0) & price_q)
+    aggregates['stock_epuizat'] = Count('pk', filter=Q(stock=0) & price_q)
+    counts = _base(filters, 'stock', *PRICE_FILTERS).aggregate(**aggregates)
+
+    # 'max' e inclusiv, ca în formular (price__lte): 30 lei exclusiv => 29.99
+    facets['price'] = [
+        {
+            'key': key, 'label': label, 'min': low,
+            'max': Decimal(high) - Decimal('0.01') if high is not None else None,
+            'count': counts[f'price_{key}'],
+        }
+        for key, label, low, high in PRICE_BUCKETS
+    ]
+    facets['stock'] = {
+        'disponibil': counts['stock_disponibil'],
+        'epuizat': counts['stock_epuizat'],
+    }
+    return facets
@@ -1,6 +1,7 @@
 from django import forms
 from .models import Author, Publisher, Category, Book, CustomUser, Promotii
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 import re
 from datetime import date, datetime
 import os
@@ -9,6 +10,17 @@ from decimal import Decimal
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 
 class BookFilterForm(forms.Form):
+    # Ordonări stabile pentru paginarea pe cursor (ultima coloană e mereu cheia primară)
+    ORDERINGS = {
+        'noi': ('-created_at', '-id'),
+        'pret': ('price', 'id'),
+    }
+
+    q = forms.CharField(
+        label='Căutare',
+        required=False,
+        widget=forms.TextInput(attrs={'placeholder': 'Titlu, descriere, autor sau editură'})
+    )
     title = forms.CharField(label='Titlu', required=False)
     author = forms.ModelChoiceField(
         label='Autor',
@@ -50,6 +62,55 @@ class BookFilterForm(forms.Form):
         required=False,
         min_value=0
     )
+    ordonare = forms.ChoiceField(
+        label='Ordonare',
+        choices=[('noi', 'Cele mai noi'), ('pret', 'Preț crescător')],
+        required=False
+    )
+    total = forms.BooleanField(
+        label='Afișează numărul total de rezultate',
+        required=False
+    )
+
+    # Filtre ca Q-uri pe câmp, ca fațetele să poată exclude filtrul propriu (vezi facets.py)
+    def get_filters(self):
+        cd = self.cleaned_data
+        filters = {}
+        if cd.get('title'):
+            filters['title'] = Q(title__icontains=cd['title'])
+        if cd.get('author'):
+            filters['author'] = Q(author=cd['author'])
+        if cd.get('publisher'):
+            filters['publisher'] = Q(publisher=cd['publisher'])
+        if cd.get('category'):
+            filters['category'] = Q(categories=cd['category'])
+        if cd.get('min_price') is not None:
+            filters['min_price'] = Q(price__gte=cd['min_price'])
+        if cd.get('max_price') is not None:
+            filters['max_price'] = Q(price__lte=cd['max_price'])
+        if cd.get('publication_date'):
+            filters['publication_date'] = Q(publication_date=cd['publication_date'])
+        if cd.get('stock') is not None:
+            filters['stock'] = Q(stock=cd['stock'])
+        return filters
+
+    def apply_facets(self, facets):
+        # Arată numărul de cărți lângă fiecare opțiune și ascunde opțiunile fără rezultate
+        for name in ('author', 'publisher', 'category'):
+            field = self.fields[name]
+            counts = facets[name]
+            visible = [pk for pk, n in counts.items() if n]
+            selected = self.data.get(name) if self.is_bound else None
+            if selected and str(selected).isdigit():
+                visible.append(int(selected))  # opțiunea aleasă rămâne vizibilă
+            field.queryset = field.queryset.filter(pk__in=visible)
+            field.label_from_instance = lambda obj, counts=counts: f"{obj} ({counts.get(obj.pk, 0)})"
+
+    def get_ordering(self):
+        # Ordonarea aleasă sau cea implicită (și pentru formular nevalid/gol)
+        ordonare = self.cleaned_data.get('ordonare') if self.is_bound and self.is_valid() else None
+        return self.ORDERINGS.get(ordonare or 'noi')
+
     #Cum funcționează:
     # După ce fiecare câmp a fost validat individual, Django apelează clean().
     # În clean(), ai acces la toate datele deja validate în self.cleaned_data.
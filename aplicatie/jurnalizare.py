@@ -0,0 +1,174 @@
+import atexit
+import contextvars
+import copy
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler, WatchedFileHandler
+
+# Jurnalizare fără blocarea cererii: logger-ul 'django' are un singur handler (QueueLogHandler)
+# care doar pune înregistrarea într-o coadă. Un fir QueueListener o formatează și o scrie
+# în fișierele pe niveluri (debug.log primește tot, info.log de la INFO în sus etc.),
+# cu rotire după dimensiune sau timp și, opțional, arhivare gzip a fișierelor rotite.
+#
+# Rotirea în proces ('size'/'time') e sigură doar cu un singur proces care scrie fișierele: cu mai
+# mulți workeri fiecare ar roti, comprima și șterge aceleași fișiere după propriul calendar.
+# Cu rotation='external' fiecare proces doar adaugă la fișier (WatchedFileHandler, care îl redeschide
+# când a fost mutat), iar rotirea o face logrotate, de exemplu:
+#     /cale/logs/*.log /cale/logs/app.jsonl { daily  rotate 10  compress  delaycompress  missingok }
+# Fișierele rotite (app.jsonl.1, app.jsonl.2.gz ...) sunt citite în continuare de log_query.
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def file_handler(filename, level, rotation='size', max_bytes=10 * 1024 * 1024, backup_count=5, compress=False):
+    if rotation == 'external':
+        handler = WatchedFileHandler(filename, encoding='utf-8', delay=True)
+        handler.setLevel(level)
+        return handler  # compresia o face tot rotirea externă
+    if rotation == 'time':
+        handler = TimedRotatingFileHandler(filename, when='midnight', backupCount=backup_count, encoding='utf-8', delay=True)
+    else:
+        handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+    if compress:
+        handler.namer = lambda name: name + '.gz'
+        handler.rotator = _gzip_rotator
+    handler.setLevel(level)
+    return handler
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # la oprire așteptăm loc în coadă, nu renunțăm
+
+
+class QueueLogHandler(QueueHandler):
+    def __init__(self, files, rotation='size', max_bytes=10 * 1024 * 1024, backup_count=5,
+                 compress=False, queue_size=10000, full_timeout=0.1):
+        # files: {nivel: cale}, fiecare fișier primește înregistrările de la nivelul lui în sus
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self.full_timeout = full_timeout  # cât așteaptă un WARNING+ loc în coada plină
+        self.targets = [
+            file_handler(path, level, rotation, max_bytes, backup_count, compress)
+            for level, path in files.items()
+        ]
+        self.listener = _Listener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        # Formatarea se face în firul listener-ului, de către fișiere, nu pe firul cererii
+        for target in self.targets:
+            target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Mesajul se calculează acum (argumentele pot fi modificate după return), restul mai târziu
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self.dropped += 1  # discul nu ține pasul: mai bine pierdem un rând decât să blocăm cererea
+                return
+            # Avertismentele și erorile nu se pierd: așteptăm puțin loc, apoi le scriem chiar pe firul cererii
+            try:
+                self.queue.put(record, timeout=self.full_timeout)
+            except queue.Full:
+                for target in self.targets:
+                    if record.levelno >= target.level:
+                        target.handle(record)
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()  # golește coada înainte de oprire
+            self.listener = None
+            for target in self.targets:
+                target.close()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    # Limitează rândurile DEBUG/INFO repetitive: cel mult `burst` rânduri pe secundă pentru
+    # același loc din cod; rândurile omise sunt numărate și menționate la următorul rând scris.
+    def __init__(self, burst=5, interval=1.0, max_level=logging.INFO):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_level = max_level if isinstance(max_level, int) else logging.getLevelName(max_level)
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            started, count, skipped = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.interval:
+                started, count = now, 0
+            if count >= self.burst:
+                self._windows[key] = (started, count, skipped + 1)
+                return False
+            self._windows[key] = (started, count + 1, 0)
+        if skipped:
+            record.msg = f"{record.msg} (+{skipped} rânduri similare omise)"
+        return True
+
+
+# Contextul cererii curente (setat de middleware.RequestLogMiddleware), atașat fiecărui rând
+request_context = contextvars.ContextVar('request_context', default=None)
+
+# Câmpurile structurate ale unui rând JSON, pe lângă ts/level/logger/module/msg
+CONTEXT_FIELDS = ('request_id', 'view', 'user_id', 'method', 'path', 'status', 'latency_ms', 'db_queries')
+
+
+class RequestContextFilter(logging.Filter):
+    # Rulează pe firul cererii (înainte de coadă), deci vede contextul cererii curente
+    def filter(self, record):
+        context = request_context.get()
+        if context is not None:
+            for field, value in context.items():
+                if not hasattr(record, field):
+                    setattr(record, field, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    # Un obiect JSON pe linie (JSON lines), citit de comanda query_logs
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'msg': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
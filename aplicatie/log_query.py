@@ -0,0 +1,99 @@
+import glob
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+# Interogări peste jurnalul JSON lines (settings.JSON_LOG_FILE și fișierele lui rotite, inclusiv .gz).
+# Totul e un lanț de generatoare: fișier -> linii -> obiecte -> filtre -> agregare, deci memoria
+# rămâne constantă indiferent de dimensiunea jurnalelor. Liniile sunt pre-filtrate ca text
+# înainte de json.loads, care e partea scumpă.
+
+ERROR_MARKERS = ('"level": "ERROR"', '"level": "CRITICAL"')
+
+
+def log_files(pattern=None, modified_since=None):
+    # Fișierul curent și cele rotite, de la cel mai vechi la cel mai nou. Un fișier modificat ultima
+    # dată înainte de modified_since are doar rânduri mai vechi, deci nu mai e deschis deloc
+    pattern = pattern or f'{settings.JSON_LOG_FILE}*'
+    paths = sorted(glob.glob(str(pattern)), key=os.path.getmtime)
+    if modified_since is not None:
+        paths = [path for path in paths if os.path.getmtime(path) >= modified_since.timestamp()]
+    return paths
+
+
+def read_lines(paths):
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            yield from f
+
+
+def parse(lines, markers=None):
+    # markers: rândul trebuie să conțină textual măcar unul dintre ele (filtru ieftin)
+    for line in lines:
+        if markers and not any(marker in line for marker in markers):
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue  # rând trunchiat (de ex. la rotire)
+
+
+def since(records, start):
+    # 'ts' e ISO 8601 în UTC, deci comparația de șiruri respectă ordinea în timp
+    start = start.astimezone(dt_timezone.utc).isoformat(timespec='milliseconds')
+    return (record for record in records if record.get('ts', '') >= start)
+
+
+def parse_since(value):
+    # 'today' (de la miezul nopții, ora locală), '24h', '7d' sau o dată ISO
+    now = timezone.localtime()
+    if value == 'today':
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if value[-1:] in ('h', 'd') and value[:-1].isdigit():
+        unit = 'hours' if value[-1] == 'h' else 'days'
+        return now - timedelta(**{unit: int(value[:-1])})
+    start = datetime.fromisoformat(value)
+    return timezone.make_aware(start) if timezone.is_naive(start) else start
+
+
+def records(start=None, markers=None, pattern=None):
+    stream = parse(read_lines(log_files(pattern, modified_since=start)), markers)
+    return since(stream, start) if start is not None else stream
+
+
+def slowest_views(stream, limit=20):
+    # -> [(view, cereri, medie ms, max ms, medie interogări)] după latența medie
+    stats = {}
+    for record in stream:
+        latency = record.get('latency_ms')
+        if latency is None:
+            continue
+        row = stats.setdefault(record.get('view') or '-', [0, 0.0, 0.0, 0])
+        row[0] += 1
+        row[1] += latency
+        row[2] = max(row[2], latency)
+        row[3] += record.get('db_queries') or 0
+    rows = [(view, n, total / n, peak, queries / n) for view, (n, total, peak, queries) in stats.items()]
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:limit]
+
+
+def errors_per_view_hour(stream):
+    # -> Counter {(view, 'YYYY-MM-DDTHH' UTC): număr de erori}
+    counts = Counter()
+    for record in stream:
+        if record.get('level') in ('ERROR', 'CRITICAL'):
+            counts[(record.get('view') or '-', record.get('ts', '')[:13])] += 1
+    return counts
+
+
+def errors_per_view(stream):
+    counts = Counter()
+    for (view, hour), n in errors_per_view_hour(stream).items():
+        counts[view] += n
+    return counts
@@ -0,0 +1,200 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicatie.models import Book
+
+# Debitul aplicației sub WSGI și sub ASGI, fără server extern: fiecare mod rulează într-un proces
+# separat (urls.py alege view-urile de catalog la import, după CATALOG_ASYNC_VIEWS), iar cererile
+# se trimit direct handler-ului Django:
+#  - wsgi: view-urile sincrone, câte un fir pe cerere în curs (ca un server WSGI cu fire);
+#  - asgi: view-urile async, toate cererile pe o singură buclă de evenimente (ca uvicorn/daphne);
+#  - asgi-sync: view-urile sincrone sub ASGI (costul mutării fiecărui view pe un fir).
+MODES = {'wsgi': '0', 'asgi': '1', 'asgi-sync': '0'}
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def default_requests():
+    # [(cale, query string, antete)]: pagina principală, lista (HTML și AJAX cu total), detalii
+    requests = [('/', '', {}), ('/books/', '', {}), ('/books/', 'total=on', AJAX)]
+    book = Book.objects.order_by('pk').values_list('pk', 'author_id').first()
+    if book:
+        requests += [(f'/book/{book[0]}/', '', {}), (f'/author/{book[1]}/', '', {})]
+    return requests
+
+
+def _request(requests, n, miss):
+    path, query, headers = requests[n % len(requests)]
+    if miss and path.startswith('/books/'):
+        # Parametru necunoscut formularului: altă cheie de cache, deci lista se construiește din nou
+        query = f'{query}&_bench={n}' if query else f'_bench={n}'
+    return path, query, headers
+
+
+def _call_wsgi(handler, path, query, headers):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': '127.0.0.1', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        **{'HTTP_' + name.upper().replace('-', '_'): value for name, value in headers.items()},
+    }
+    status = []
+    body = handler(environ, lambda line, response_headers, exc_info=None: status.append(line))
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()  # semnalul request_finished: închide conexiunea la bază, ca un server WSGI
+    return int(status[0].split()[0])
+
+
+async def _call_asgi(application, path, query, headers):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'localhost')] + [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+    received = False
+    status = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Future()  # clientul nu se deconectează; handler-ul anulează așteptarea la final
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def _run_wsgi(requests, concurrency, duration, miss):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        latencies, errors, n = [], 0, index
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if _call_wsgi(handler, *_request(requests, n, miss)) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            n += concurrency
+        return latencies, errors
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(client, range(concurrency)))
+
+
+def _run_asgi(requests, concurrency, duration, miss):
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+
+    async def client(index, deadline):
+        latencies, errors, n = [], 0, index
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if await _call_asgi(application, *_request(requests, n, miss)) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            n += concurrency
+        return latencies, errors
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        return await asyncio.gather(*(client(i, deadline) for i in range(concurrency)))
+
+    return asyncio.run(run())
+
+
+def measure(mode, requests, concurrency, duration, miss=False):
+    # -> {'concurrency', 'requests', 'rps', 'p50_ms', 'p95_ms', 'errors'}
+    run = _run_wsgi if mode == 'wsgi' else _run_asgi
+    started = time.perf_counter()
+    clients = run(requests, concurrency, duration, miss)
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for client_latencies, _ in clients for latency in client_latencies)
+    count = len(latencies)
+    return {
+        'concurrency': concurrency,
+        'requests': count,
+        'rps': count / elapsed if elapsed else 0.0,
+        'p50_ms': latencies[int(0.50 * (count - 1))] * 1000 if count else 0.0,
+        'p95_ms': latencies[int(0.95 * (count - 1))] * 1000 if count else 0.0,
+        'errors': sum(errors for _, errors in clients),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compară debitul (cereri/s) și latențele aplicației sub WSGI și ASGI, la mai multe niveluri de concurență'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default='wsgi,asgi', help=f"Moduri separate prin virgulă: {', '.join(MODES)}")
+        parser.add_argument('--concurrency', default='1,8,32', help='Cereri simultane, ex. 1,8,32')
+        parser.add_argument('--duration', type=float, default=5.0, help='Secunde pe nivel de concurență')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Cale de testat, ex. /books/?q=python (repetabil; implicit un amestec din catalog)')
+        parser.add_argument('--ajax', action='store_true', help='Trimite căile date cu --path ca cereri AJAX')
+        parser.add_argument('--miss', action='store_true', help='Lista de cărți fără cache (altă cheie la fiecare cerere)')
+        parser.add_argument('--worker', choices=MODES, help='Intern: rulează un singur mod în procesul curent (JSON)')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        except ValueError:
+            raise CommandError('--concurrency așteaptă numere separate prin virgulă')
+        if options['worker']:
+            return self.worker(options['worker'], levels, options)
+
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Moduri necunoscute: {', '.join(sorted(unknown))}")
+        self.stdout.write(f"{'mod':<10} {'concurență':>10} {'cereri':>8} {'cereri/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'erori':>6}")
+        for mode in modes:
+            for result in self.spawn(mode, options):
+                self.stdout.write(
+                    f"{mode:<10} {result['concurrency']:>10} {result['requests']:>8} {result['rps']:>10.1f}"
+                    f" {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['errors']:>6}"
+                )
+
+    def spawn(self, mode, options):
+        # Un proces nou pe mod: view-urile de catalog se aleg la importul urls.py
+        command = [sys.executable, '-m', 'django', 'bench_asgi', '--worker', mode,
+                   '--concurrency', options['concurrency'], '--duration', str(options['duration'])]
+        for path in options['paths'] or ():
+            command += ['--path', path]
+        command += ['--ajax'] * options['ajax'] + ['--miss'] * options['miss']
+        env = {**os.environ, 'CATALOG_ASYNC_VIEWS': MODES[mode]}
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'bookstore.settings')
+        finished = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if finished.returncode:
+            raise CommandError(f"Modul {mode} a eșuat:\n{finished.stderr}")
+        return json.loads(finished.stdout.strip().splitlines()[-1])
+
+    def worker(self, mode, levels, options):
+        if options['paths']:
+            headers = AJAX if options['ajax'] else {}
+            requests = [(*path.partition('?')[::2], headers) for path in options['paths']]
+        else:
+            requests = default_requests()
+        measure(mode, requests, 1, 0.5, options['miss'])  # încălzire: cache, template-uri, conexiuni
+        results = [measure(mode, requests, level, options['duration'], options['miss']) for level in levels]
+        self.stdout.write(json.dumps(results))
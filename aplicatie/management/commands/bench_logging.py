@@ -0,0 +1,66 @@
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from aplicatie.jurnalizare import QueueLogHandler, SamplingFilter
+
+FORMAT = logging.Formatter('{levelname} {asctime} {module} {message}', style='{', datefmt='%Y-%m-%d %H:%M:%S')
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+def _sync_handlers(directory):
+    # Configurația veche: câte un FileHandler sincron pe nivel
+    handlers = []
+    for level in LEVELS:
+        handler = logging.FileHandler(directory / f'{level.lower()}.log', encoding='utf-8')
+        handler.setLevel(level)
+        handler.setFormatter(FORMAT)
+        handlers.append(handler)
+    return handlers
+
+
+def _queue_handler(directory, sampling):
+    handler = QueueLogHandler({level: directory / f'{level.lower()}.log' for level in LEVELS})
+    handler.setFormatter(FORMAT)
+    if sampling:
+        handler.addFilter(SamplingFilter())
+    return [handler]
+
+
+class Command(BaseCommand):
+    help = 'Măsoară costul jurnalizării pe firul cererii: FileHandler-e sincrone vs. coadă (+ eșantionare)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=20000, help='Câte rânduri INFO se scriu în fiecare variantă')
+
+    def measure(self, handlers, records):
+        logger = logging.Logger('bench_logging', logging.DEBUG)
+        for handler in handlers:
+            logger.addHandler(handler)
+        started = time.perf_counter()
+        for i in range(records):
+            logger.info("Accesare lista de cărți - utilizatorul %s a accesat lista de cărți.", i)
+        elapsed = time.perf_counter() - started
+        for handler in handlers:
+            handler.close()  # pentru coadă: așteaptă scrierea a tot ce a rămas
+        return elapsed, sum(getattr(handler, 'dropped', 0) for handler in handlers)
+
+    def handle(self, *args, **options):
+        records = options['records']
+        variants = [
+            ('FileHandler sincron x5', _sync_handlers),
+            ('QueueHandler', lambda d: _queue_handler(d, sampling=False)),
+            ('QueueHandler + eșantionare', lambda d: _queue_handler(d, sampling=True)),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, build in variants:
+                directory = Path(tmp) / name.replace(' ', '_')
+                directory.mkdir()
+                elapsed, dropped = self.measure(build(directory), records)
+                self.stdout.write(
+                    f"{name:<30} {elapsed / records * 1e6:8.1f} µs/rând pe firul cererii"
+                    f" ({dropped} rânduri pierdute la coadă plină)"
+                )
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from aplicatie.models import Book, Order, Review, CustomUser, Vizualizari, Promotii, TrimiterePromotie
+
+
+def canonical_queries():
+    # Interogările "de bază" ale aplicației, cu valori oarecare: contează doar planul
+    now = timezone.now()
+    day_start, day_end = now - timedelta(days=1), now
+    newest = ('-created_at', '-id')
+    return [
+        ('book_list: autor', Book.objects.filter(author_id=1).order_by(*newest)[:11]),
+        ('book_list: editură', Book.objects.filter(publisher_id=1).order_by(*newest)[:11]),
+        ('book_list: interval de preț', Book.objects.filter(price__gte=10, price__lte=50).order_by('price', 'id')[:11]),
+        ('book_list: data publicării', Book.objects.filter(publication_date=now.date())),
+        ('book_list: stoc', Book.objects.filter(stock=0)),
+        ('book_list: pagina următoare (cursor)', Book.objects.filter(created_at__lt=now).order_by(*newest)[:11]),
+        ('raport: cărți create', Book.objects.filter(created_at__range=(day_start, day_end)).values('pk')),
+        ('raport: comenzi', Order.objects.filter(created_at__range=(day_start, day_end)).values('pk')),
+        ('raport: recenzii', Review.objects.filter(created_at__range=(day_start, day_end)).values('pk')),
+        ('raport: utilizatori noi', CustomUser.objects.filter(date_joined__range=(day_start, day_end)).values('pk')),
+        ('clean_unconfirmed_users', CustomUser.objects.filter(email_confirmat=False, date_joined__lte=day_start).values('pk')),
+        ('confirm_email', CustomUser.objects.filter(cod='cod-de-confirmare')),
+        ('văzute recent', Vizualizari.objects.filter(user_id__in=[1, 2]).order_by('user_id', '-date_viewed').values_list('user_id', 'book_id')),
+        ('promoții active', Promotii.objects.filter(date_expiry__gte=now)),
+        ('trimiteri în așteptare', TrimiterePromotie.objects.filter(status='PENDING').order_by('pk').values_list('pk', flat=True)),
+    ]
+
+
+def full_scans(plan, vendor):
+    # Liniile din plan care citesc un tabel întreg, fără index
+    if vendor == 'sqlite':
+        return [line.strip() for line in plan.splitlines()
+                if 'SCAN ' in line and 'USING' not in line and 'CONSTANT ROW' not in line]
+    if vendor == 'postgresql':
+        return [line.strip() for line in plan.splitlines() if 'Seq Scan' in line]
+    return []
+
+
+class Command(BaseCommand):
+    help = 'Rulează EXPLAIN pe interogările de bază ale aplicației și eșuează dacă vreuna face full scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Afișează planul complet pentru fiecare interogare')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"Verificarea planurilor nu e implementată pentru {vendor}.")
+
+        regressions = []
+        with transaction.atomic():
+            if vendor == 'postgresql':
+                # Pe tabele mici Postgres preferă oricum Seq Scan; vrem să vedem dacă un index *poate* fi folosit
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in canonical_queries():
+                plan = queryset.explain()
+                scans = full_scans(plan, vendor)
+                if options['verbose_plans']:
+                    self.stdout.write(f"--- {name}\n{plan}")
+                if scans:
+                    regressions.append(name)
+                    self.stdout.write(self.style.ERROR(f"FULL SCAN  {name}: {'; '.join(scans)}"))
+                else:
+                    self.stdout.write(f"ok         {name}")
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} interogări fac full scan: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS("Toate interogările folosesc indexuri."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from aplicatie import catalog_io
+
+
+class Command(BaseCommand):
+    help = 'Exportă catalogul (un instantaneu consistent) în CSV sau JSON lines, reimportabil cu import_catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Fișierul de scris (implicit '-' pentru stdout)")
+        parser.add_argument('--format', choices=catalog_io.FORMATS, help='Implicit după extensie (.csv, altfel JSON lines)')
+        parser.add_argument('--chunk-size', type=int, help='Cărți citite deodată (implicit CATALOG_EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or catalog_io.detect_format(path)
+        lines = catalog_io.export_lines(fmt, chunk_size=options['chunk_size'])
+        if path == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        count = -1 if fmt == 'csv' else 0  # fără antet
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        self.stderr.write(self.style.SUCCESS(f"{count} cărți exportate în {path}"))
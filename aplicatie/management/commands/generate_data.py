@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicatie import synthetic
+from aplicatie.models import Book
+
+
+class Command(BaseCommand):
+    help = ('Generează date sintetice deterministe (catalog, utilizatori, comenzi, recenzii, vizualizări) '
+            'la scara dată, pentru teste de încărcare')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10000, help='Numărul de cărți; celelalte volume pornesc de la el')
+        for name in ('authors', 'publishers', 'categories', 'users', 'orders', 'reviews'):
+            parser.add_argument(f'--{name}', type=int, help=f'Suprascrie numărul implicit de {name}')
+        parser.add_argument('--seed', type=int, default=0, help='Aceeași sămânță => aceleași date (pe o bază goală)')
+        parser.add_argument('--chunk-size', type=int, help='Rânduri pe tranzacție (implicit CATALOG_IMPORT_CHUNK_SIZE)')
+        parser.add_argument('--force', action='store_true', help='Adaugă datele și dacă baza are deja cărți')
+
+    def handle(self, *args, **options):
+        if Book.objects.exists() and not options['force']:
+            raise CommandError('Baza de date are deja cărți; folosiți o bază goală (ex. SQLITE_PATH) sau --force.')
+        counts = synthetic.plan(options['books'], **{
+            name: options[name] for name in ('authors', 'publishers', 'categories', 'users', 'orders', 'reviews')
+        })
+        if min(counts.values()) < 1:
+            raise CommandError('Volumele trebuie să fie pozitive.')
+
+        def progress(name, done, total):
+            self.stdout.write(f"{name}: {done}" + (f"/{total}" if total else ''))
+
+        result = synthetic.generate(
+            counts, seed=options['seed'], chunk_size=options['chunk_size'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        summary = ', '.join(f'{result[name]} {name}' for name in result if name not in ('seconds', 'rows_per_second'))
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary} în {result['seconds']:.1f} s ({result['rows_per_second']:.0f} rânduri/s). "
+            f"Parola utilizatorilor: {synthetic.PASSWORD} (staff: {synthetic.STAFF_USERNAME})"
+        ))
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicatie import catalog_io
+
+
+class Command(BaseCommand):
+    help = 'Importă în masă cărți (cu autori, edituri și categorii) dintr-un fișier CSV sau JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fișierul de importat ('-' pentru stdin)")
+        parser.add_argument('--format', choices=catalog_io.FORMATS, help='Implicit după extensie (.csv, altfel JSON lines)')
+        parser.add_argument('--chunk-size', type=int, help='Rânduri pe tranzacție (implicit CATALOG_IMPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or catalog_io.detect_format(path)
+
+        def progress(result):
+            self.stdout.write(f"bucata {result['chunks']}: {result['created']} noi, {result['updated']} actualizate")
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(f"Nu pot deschide {path}: {e}")
+        with stream:
+            result = catalog_io.import_catalog(
+                stream, fmt, chunk_size=options['chunk_size'],
+                progress=progress if options['verbosity'] > 1 else None,
+            )
+        for error in result['errors']:
+            self.stderr.write(f"linia {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} cărți noi, {result['updated']} actualizate, {result['skipped']} rânduri sărite "
+            f"în {result['seconds']:.2f} s ({result['rows_per_second']:.0f} rânduri/s)"
+        ))
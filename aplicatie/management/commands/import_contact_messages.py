@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from aplicatie import contact_store
+
+
+class Command(BaseCommand):
+    help = 'Importă fișierele vechi mesaje/mesaj_*.json în jurnalul de mesaje (idempotent)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Șterge fișierele după import')
+        parser.add_argument('--rebuild-index', action='store_true', help='Reface indexul SQLite din jurnal')
+
+    def handle(self, *args, **options):
+        store = contact_store.get_store()
+        if options['rebuild_index']:
+            self.stdout.write(f"Index refăcut: {store.rebuild_index()} mesaje.")
+
+        paths = sorted(settings.CONTACT_STORE_DIR.glob('mesaj_*.json'))
+        imported, skipped = contact_store.import_json_files(store, paths)
+        if options['delete']:
+            for path in paths:
+                path.unlink()
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported} mesaje importate, {skipped} deja existente; {store.count()} mesaje în total."
+        ))
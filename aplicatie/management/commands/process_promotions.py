@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from aplicatie import promotions
+
+
+class Command(BaseCommand):
+    help = 'Rulează trimiterile de promoții aflate în așteptare (worker pentru PROMOTII_DISPATCH="db")'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Rulează continuu, verificând periodic coada')
+        parser.add_argument('--interval', type=float, default=5.0, help='Secunde între verificări în modul --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            count = promotions.run_pending()
+            if count:
+                self.stdout.write(f"Rulate {count} trimiteri de promoții.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
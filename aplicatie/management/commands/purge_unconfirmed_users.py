@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from aplicatie import purge
+
+
+class Command(BaseCommand):
+    help = 'Șterge în loturi utilizatorii cu e-mail neconfirmat (reluabil de la ultimul punct de control)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Utilizatori pe lot (implicit PURGE_BATCH_SIZE)')
+        parser.add_argument('--sleep', type=float, help='Pauza dintre loturi, în secunde (implicit PURGE_SLEEP)')
+        parser.add_argument('--max-batches', type=int, help='Oprește după atâtea loturi (se reia la următoarea rulare)')
+        parser.add_argument('--restart', action='store_true', help='Ignoră punctul de control salvat')
+
+    def handle(self, *args, **options):
+        def progress(stats, last_pk):
+            self.stdout.write(f"lot {stats['batches']}: {stats['users']} utilizatori, {stats['rows']} rânduri (pk <= {last_pk})")
+
+        stats = purge.purge_unconfirmed_users(
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            max_batches=options['max_batches'],
+            restart=options['restart'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        status = 'terminat' if stats['finished'] else 'oprit (se va relua de la punctul de control)'
+        self.stdout.write(self.style.SUCCESS(
+            f"{status}: {stats['users']} utilizatori, {stats['rows']} rânduri în {stats['seconds']:.2f} s "
+            f"({stats['rows_per_second']:.0f} rânduri/s)"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicatie import log_query
+
+
+class Command(BaseCommand):
+    help = 'Interogări rapide peste jurnalul JSON lines (inclusiv fișierele rotite .gz)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('report', choices=['slowest', 'errors'],
+                            help="'slowest' = view-urile cele mai lente, 'errors' = erori pe view și oră")
+        parser.add_argument('--since', default='today', help="'today', '24h', '7d' sau o dată ISO")
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--files', help='Tipar glob pentru fișiere (implicit settings.JSON_LOG_FILE*)')
+
+    def handle(self, *args, **options):
+        try:
+            start = log_query.parse_since(options['since'])
+        except ValueError:
+            raise CommandError(f"--since invalid: {options['since']}")
+
+        if options['report'] == 'slowest':
+            stream = log_query.records(start, markers=('"latency_ms"',), pattern=options['files'])
+            self.stdout.write(f"{'view':<40} {'cereri':>8} {'medie ms':>10} {'max ms':>10} {'interogări':>11}")
+            for view, count, avg, peak, queries in log_query.slowest_views(stream, options['limit']):
+                self.stdout.write(f"{view:<40} {count:>8} {avg:>10.1f} {peak:>10.1f} {queries:>11.1f}")
+        else:
+            stream = log_query.records(start, markers=log_query.ERROR_MARKERS, pattern=options['files'])
+            counts = log_query.errors_per_view_hour(stream)
+            self.stdout.write(f"{'ora (UTC)':<15} {'view':<40} {'erori':>6}")
+            for (view, hour), n in sorted(counts.items(), key=lambda item: (item[0][1], item[1]), reverse=True)[:options['limit']]:
+                self.stdout.write(f"{hour:<15} {view:<40} {n:>6}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from aplicatie import search
+
+
+class Command(BaseCommand):
+    help = 'Reconstruiește indexul de căutare full-text pentru cărți'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Câte cărți se indexează pe lot')
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        if backend is None:
+            self.stderr.write("Baza de date curentă nu are backend de căutare full-text.")
+            return
+        backend.drop_index()
+        backend.create_index()
+        count = search.index_books(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexate {count} cărți."))
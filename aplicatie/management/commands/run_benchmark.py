@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicatie import benchmark
+from aplicatie.models import Book
+
+
+class Command(BaseCommand):
+    help = ('Măsoară latența (p50/p95/p99), interogările și memoria pe cerere pentru lista de cărți, detalii, '
+            'înregistrare/login și promoții; salvează rezultatul și îl compară cu rularea anterioară')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Cereri măsurate pe scenariu')
+        parser.add_argument('--scenario', action='append', dest='scenarios', help='Doar scenariile date (repetabil)')
+        parser.add_argument('--warm', action='store_true', help='Paginile de catalog din cache (implicit: cache rece)')
+        parser.add_argument('--tracemalloc', action='store_true', help='Vârful alocărilor Python pe scenariu (mai lent)')
+        parser.add_argument('--baseline', help='Rularea de referință (implicit cea mai recentă din BENCHMARK_DIR)')
+        parser.add_argument('--threshold', type=float, help='Creșterea relativă a p95 considerată regresie (ex. 0.2)')
+        parser.add_argument('--no-save', action='store_true', help='Nu salvează rezultatul în BENCHMARK_DIR')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Cod de ieșire nenul la regresii')
+
+    def handle(self, *args, **options):
+        if not Book.objects.exists():
+            raise CommandError('Catalogul e gol; generați date cu: python manage.py generate_data')
+        if options['requests'] < 1:
+            raise CommandError('--requests trebuie să fie pozitiv.')
+
+        def progress(name, result):
+            self.stdout.write(f"{name}: p95 {result['p95_ms']:.1f} ms")
+
+        result = benchmark.run(
+            requests=options['requests'], warm=options['warm'], trace_memory=options['tracemalloc'],
+            only=options['scenarios'], progress=progress if options['verbosity'] > 1 else None,
+        )
+        if not result['scenarios']:
+            raise CommandError('Niciun scenariu cu numele date.')
+
+        self.stdout.write(f"{'scenariu':<24} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'interog.':>8} {'erori':>6} {'RSS MB':>8} {'alloc KB':>9}")
+        for name, row in result['scenarios'].items():
+            rss = f"{row['max_rss_mb']:.0f}" if row['max_rss_mb'] is not None else '-'
+            alloc = f"{row['alloc_peak_kb']:.0f}" if row['alloc_peak_kb'] is not None else '-'
+            self.stdout.write(
+                f"{name:<24} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+                f" {row['queries_mean']:>8.1f} {row['errors']:>6} {rss:>8} {alloc:>9}"
+            )
+
+        saved = None if options['no_save'] else benchmark.save(result)
+        baseline_path = options['baseline'] or benchmark.latest(exclude=saved)
+        regressions = []
+        if baseline_path:
+            try:
+                baseline = benchmark.load(baseline_path)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Nu pot citi rularea de referință {baseline_path}: {e}")
+            self.stdout.write(f"\nFață de {baseline_path} (commit {baseline.get('commit') or '?'}):")
+            changed = benchmark.differences(result, baseline)
+            if changed:
+                self.stdout.write(self.style.WARNING(f"Atenție, diferă: {', '.join(changed)}"))
+            for row in benchmark.compare(result, baseline, options['threshold']):
+                marker = '  REGRESIE' if row['regression'] else ''
+                self.stdout.write(
+                    f"{row['scenario']:<24} p95 {row['baseline_p95_ms']:.1f} -> {row['p95_ms']:.1f} ms ({row['change']:+.0%}), "
+                    f"interogări {row['baseline_queries_mean']:.1f} -> {row['queries_mean']:.1f}{marker}"
+                )
+                if row['regression']:
+                    regressions.append(row['scenario'])
+        if saved:
+            self.stdout.write(self.style.SUCCESS(f"Rezultat salvat în {saved}"))
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Regresii: {', '.join(regressions)}")
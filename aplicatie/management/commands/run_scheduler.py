@@ -0,0 +1,38 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from aplicatie import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Rulează job-urile programate (SCHEDULED_JOBS) într-un singur proces de lungă durată'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--run', metavar='JOB', help='Rulează acum job-ul dat (cu blocare și istoric) și iese')
+        parser.add_argument('--list', action='store_true', help='Afișează job-urile, următoarea și ultima rulare')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for job, next_run, last in scheduler.status():
+                last_text = f"{last.status} la {timezone.localtime(last.started_at):%Y-%m-%d %H:%M} ({last.duration or 0:.2f} s)" if last else '-'
+                self.stdout.write(f"{job.name:<28} {job.schedule.expression:<14} următoarea: {next_run:%Y-%m-%d %H:%M}  ultima: {last_text}")
+            return
+
+        if options['run']:
+            jobs = {job.name: job for job in scheduler.load_jobs()}
+            if options['run'] not in jobs:
+                raise CommandError(f"Job necunoscut: {options['run']} (disponibile: {', '.join(jobs)})")
+            run = scheduler.run_job(jobs[options['run']])
+            if run is None:
+                raise CommandError(f"Job-ul {options['run']} a fost deja preluat de alt proces.")
+            self.stdout.write(f"{run.job}: {run.status} în {run.duration or 0:.2f} s, rânduri: {run.rows}")
+            if run.error:
+                self.stderr.write(run.error)
+            return
+
+        worker = scheduler.Scheduler()
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        worker.run_forever()
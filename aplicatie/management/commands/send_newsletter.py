@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from aplicatie import newsletter
+
+
+class Command(BaseCommand):
+    help = 'Trimite newsletter-ul (reluabil: adresele deja trimise pentru același număr sunt sărite)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issue', help='Numărul newsletter-ului (implicit săptămâna curentă, ex. 2026-W42)')
+        parser.add_argument('--subject', default=newsletter.SUBJECT)
+        parser.add_argument('--batch-size', type=int, help='E-mailuri pe lot (implicit NEWSLETTER_BATCH_SIZE)')
+        parser.add_argument('--retries', type=int, help='Încercări pe lot (implicit NEWSLETTER_RETRIES)')
+
+    def handle(self, *args, **options):
+        result = newsletter.send_newsletter(
+            issue=options['issue'],
+            subject=options['subject'],
+            batch_size=options['batch_size'],
+            retries=options['retries'],
+        )
+        style = self.style.SUCCESS if result.status == 'DONE' and not result.failed else self.style.WARNING
+        self.stdout.write(style(
+            f"{result.issue}: {result.get_status_display()}, {result.sent} trimise, {result.failed} eșuate"
+        ))
@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+
+from aplicatie import orders
+from aplicatie.models import Author, Book, Order, Publisher
+
+# Test de stres pentru orders.py: mulți cumpărători simultani (fire cu conexiuni proprii) pe câteva
+# titluri "hot" cu stoc mic. La final se verifică invariantul pentru fiecare carte:
+#     stoc inițial == stoc rămas + cantitățile din comenzile PENDING/SHIPPED
+# (nicio actualizare pierdută, nicio vânzare peste stoc, stocul anulărilor returnat exact o dată).
+
+
+def run_buyers(book_ids, checkouts, buyers, max_lines=2, max_quantity=2, cancel=0.1, seed=0):
+    # -> {'placed', 'rejected', 'canceled', 'errors', 'latencies'}
+    lock = threading.Lock()
+    counters = {'placed': 0, 'rejected': 0, 'canceled': 0, 'errors': 0}
+    latencies = []
+    remaining = iter(range(checkouts))
+
+    def buyer(index):
+        rng = random.Random(seed * 1000 + index)
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                lines = [(book_id, rng.randint(1, max_quantity))
+                         for book_id in rng.sample(book_ids, rng.randint(1, min(max_lines, len(book_ids))))]
+                outcome = 'placed'
+                started = time.perf_counter()
+                try:
+                    placed = orders.place_order(lines)
+                    if rng.random() < cancel:
+                        orders.cancel_order(placed[0].checkout)
+                        outcome = 'canceled'
+                except orders.OutOfStock:
+                    outcome = 'rejected'
+                except DatabaseError:  # ex. "database is locked" peste timeout-ul SQLite
+                    outcome = 'errors'
+                elapsed = time.perf_counter() - started
+                with lock:
+                    counters[outcome] += 1
+                    latencies.append(elapsed)
+        finally:
+            connection.close()  # conexiunea firului
+
+    with ThreadPoolExecutor(buyers) as pool:
+        list(pool.map(buyer, range(buyers)))
+    return dict(counters, latencies=sorted(latencies))
+
+
+def check_stock(initial):
+    # {book_id: stoc inițial} -> {book_id: (stoc, rezervat)} pentru cărțile care încalcă invariantul
+    reserved = dict(Order.objects.filter(book_id__in=initial, status__in=(orders.PENDING, orders.SHIPPED))
+                    .values('book_id').annotate(total=Sum('quantity')).values_list('book_id', 'total'))
+    broken = {}
+    for book_id, stock in Book.objects.filter(pk__in=initial).values_list('pk', 'stock'):
+        if stock < 0 or stock + reserved.get(book_id, 0) != initial[book_id]:
+            broken[book_id] = (stock, reserved.get(book_id, 0))
+    return broken
+
+
+class Command(BaseCommand):
+    help = 'Test de stres: comenzi simultane pe câteva titluri cu stoc limitat, apoi verifică stocul'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=3, help='Titluri "hot" create pentru test')
+        parser.add_argument('--stock', type=int, default=500, help='Stocul inițial al fiecărui titlu')
+        parser.add_argument('--checkouts', type=int, default=2000, help='Comenzi încercate în total')
+        parser.add_argument('--buyers', type=int, default=32, help='Cumpărători simultani (fire)')
+        parser.add_argument('--max-lines', type=int, default=2, help='Linii (titluri diferite) pe comandă')
+        parser.add_argument('--max-quantity', type=int, default=2, help='Exemplare pe linie')
+        parser.add_argument('--cancel', type=float, default=0.1, help='Fracțiunea comenzilor anulate imediat')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep', action='store_true', help='Păstrează cărțile și comenzile de test')
+
+    def handle(self, *args, **options):
+        if options['books'] < 1 or options['buyers'] < 1:
+            raise CommandError('--books și --buyers trebuie să fie pozitive.')
+        author, _ = Author.objects.get_or_create(name='Autor test de stres')
+        publisher, _ = Publisher.objects.get_or_create(name='Editura test de stres')
+        books = [Book.objects.create(title=f'Titlu hot {i}', price=Decimal('10.00'), stock=options['stock'],
+                                     author=author, publisher=publisher) for i in range(options['books'])]
+        initial = {book.pk: options['stock'] for book in books}
+        try:
+            started = time.perf_counter()
+            result = run_buyers(list(initial), options['checkouts'], options['buyers'], options['max_lines'],
+                                options['max_quantity'], options['cancel'], options['seed'])
+            elapsed = time.perf_counter() - started
+            broken = check_stock(initial)
+        finally:
+            if not options['keep']:
+                Book.objects.filter(pk__in=initial).delete()  # cu comenzile lor (CASCADE)
+
+        latencies = result['latencies']
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else 0.0
+        self.stdout.write(
+            f"{len(latencies)} comenzi în {elapsed:.1f} s ({len(latencies) / (elapsed or 1):.0f}/s), p95 {p95:.1f} ms: "
+            f"{result['placed']} plasate, {result['canceled']} anulate, {result['rejected']} fără stoc, {result['errors']} erori"
+        )
+        for book_id, (stock, reserved) in broken.items():
+            self.stderr.write(f"cartea {book_id}: stoc {stock} + rezervat {reserved} != {initial[book_id]}")
+        if broken:
+            raise CommandError('Stoc inconsistent după testul de stres.')
+        self.stdout.write(self.style.SUCCESS('Stoc consistent pentru toate titlurile.'))
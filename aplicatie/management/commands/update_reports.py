@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from aplicatie import reports
+
+
+class Command(BaseCommand):
+    help = 'Actualizează rollup-urile zilnice (doar zilele noi) și scrie raportul de activitate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Recalculează (backfill) de la această dată (YYYY-MM-DD)')
+        parser.add_argument('--include-today', action='store_true', help='Include și ziua curentă (parțială)')
+        parser.add_argument('--period', choices=['daily', 'weekly', 'monthly'], help='Scrie raportul pentru perioada dată')
+        parser.add_argument('--date', help='O zi din perioada raportului (implicit azi)')
+        parser.add_argument('--format', action='append', choices=['txt', 'csv', 'json'], help='Implicit toate')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        end = today + timedelta(days=1) if options['include_today'] else today
+        try:
+            if options['since']:
+                days = reports.rollup(date.fromisoformat(options['since']), end)
+            else:
+                days = reports.rollup_pending(include_today=options['include_today'])
+            day = date.fromisoformat(options['date']) if options['date'] else today
+        except ValueError as e:
+            raise CommandError(f"Dată invalidă: {e}")
+        self.stdout.write(f"Zile agregate: {days}")
+
+        if options['period']:
+            for path in reports.write_report(options['period'], day, options['format'] or ('txt', 'csv', 'json')):
+                self.stdout.write(self.style.SUCCESS(f"Raport scris: {path}"))
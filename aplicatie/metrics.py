@@ -0,0 +1,322 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+
+# Metrici în formatul text Prometheus, expuse la /metrics.
+# Pe calea fierbinte nu se ia niciun lock: fiecare fir are propriul dicționar de valori
+# (threading.local), iar la colectare se adună dicționarele tuturor firelor.
+# METRICS_MODE = 'process': fiecare proces își raportează doar propriile valori;
+# METRICS_MODE = 'file': fiecare proces își scrie periodic totalurile în METRICS_DIR/<pid>-<pornire>.json
+# (pornirea în ns: un pid refolosit nu suprascrie fișierul unui proces oprit), iar /metrics adună toate
+# fișierele, deci orice worker răspunde cu aceeași imagine globală. Fișierele proceselor oprite sunt
+# adunate în retained.json și șterse, sub un flock pe director, deci contoarele nu scad niciodată.
+# Gaugele (Gauge) nu au valori pe fir: se citesc din funcția lor la fiecare colectare; în modul 'file'
+# valorile proceselor în viață se adună, iar cele ale proceselor oprite nu trec în retained.json.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+_thread_values = []  # (fir, dicționarul lui): {(metrică, etichete, sufix): valoare}
+_retired = {}  # valorile firelor terminate (de ex. runserver pornește un fir pe cerere)
+_registration_lock = threading.Lock()
+_metrics = {}
+
+
+def _values():
+    values = getattr(_local, 'values', None)
+    if values is None:
+        values = _local.values = {}
+        with _registration_lock:  # o singură dată pe fir
+            _thread_values.append((threading.current_thread(), values))
+    return values
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+    def inc(self, amount=1, **labels):
+        key = (self.name, tuple(str(labels[l]) for l in self.labelnames), '')
+        values = _values()
+        values[key] = values.get(key, 0) + amount
+        _maybe_flush()
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        _metrics[name] = self
+
+    def observe(self, value, **labels):
+        label_values = tuple(str(labels[l]) for l in self.labelnames)
+        values = _values()
+        # Contoare necumulative pe găleți; cumularea (le="...") se face la expunere
+        index = bisect_left(self.buckets, value)
+        bucket = str(self.buckets[index]) if index < len(self.buckets) else '+Inf'
+        for suffix, amount in ((f'bucket:{bucket}', 1), ('count', 1), ('sum', value)):
+            key = (self.name, label_values, suffix)
+            values[key] = values.get(key, 0) + amount
+        _maybe_flush()
+
+    def time(self, **labels):
+        histogram = self
+
+        class _Timer:
+            def __enter__(self):
+                self.started = time.perf_counter()
+
+            def __exit__(self, *exc):
+                histogram.observe(time.perf_counter() - self.started, **labels)
+
+        return _Timer()
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, function=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = ()
+        self.function = function
+        _metrics[name] = self
+
+    def set_function(self, function):
+        self.function = function
+
+    def value(self):
+        return self.function() if self.function is not None else None
+
+
+def timed(histogram, **labels):
+    # Decorator: durata funcției în histogramă
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _snapshot_local():
+    with _registration_lock:
+        for entry in [entry for entry in _thread_values if not entry[0].is_alive()]:
+            _thread_values.remove(entry)
+            for key, value in entry[1].items():
+                _retired[key] = _retired.get(key, 0) + value
+        totals = dict(_retired)
+        live = [values for thread, values in _thread_values]
+    for values in live:
+        while True:
+            try:
+                items = list(values.items())
+                break
+            except RuntimeError:  # dicționarul firului s-a modificat în timpul copierii
+                continue
+        for key, value in items:
+            totals[key] = totals.get(key, 0) + value
+    for metric in list(_metrics.values()):
+        if metric.kind == 'gauge':
+            value = metric.value()
+            if value is not None:
+                totals[(metric.name, (), '')] = value
+    return totals
+
+
+# --- agregare între procese (METRICS_MODE = 'file') ---
+
+_last_flush = [time.monotonic()]
+_process_ids = {}  # pid -> identificatorul pornirii (după fork copilul are alt pid, deci alt identificator)
+RETAINED = 'retained.json'
+
+
+def _metrics_dir():
+    return Path(settings.METRICS_DIR)
+
+
+def _process_id():
+    pid = os.getpid()
+    if pid not in _process_ids:
+        _process_ids[pid] = f'{pid}-{time.time_ns()}'
+    return _process_ids[pid]
+
+
+def _rows(totals):
+    return [[name, list(labels), suffix, value] for (name, labels, suffix), value in totals.items()]
+
+
+def _add(totals, rows):
+    for name, labels, suffix, value in rows:
+        key = (name, tuple(labels), suffix)
+        totals[key] = totals.get(key, 0) + value
+
+
+def _write(path, data):
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    tmp.write_text(json.dumps(data), encoding='utf-8')
+    os.replace(tmp, path)  # atomic: cititorii nu văd fișiere pe jumătate scrise
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # există, dar al altui utilizator
+    return True
+
+
+@contextmanager
+def _locked(directory):
+    with open(directory / 'lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def flush():
+    if settings.METRICS_MODE != 'file':
+        return
+    directory = _metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    _write(directory / f'{_process_id()}.json', _rows(_snapshot_local()))
+    _last_flush[0] = time.monotonic()
+
+
+def _maybe_flush():
+    if settings.METRICS_MODE == 'file' and time.monotonic() - _last_flush[0] >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def _is_gauge(name):
+    metric = _metrics.get(name)
+    return metric is not None and metric.kind == 'gauge'
+
+
+def _collect_files(directory):
+    # Totalurile tuturor proceselor; fișierele proceselor oprite trec în retained.json
+    try:
+        retained = json.loads((directory / RETAINED).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        retained = {'merged': [], 'values': []}
+    kept = {}
+    _add(kept, retained['values'])
+    totals = dict(kept)
+    stopped = []
+    for path in directory.glob('*.json'):
+        if path.name == RETAINED:
+            continue
+        if path.stem in retained['merged']:
+            path.unlink(missing_ok=True)  # adunat deja, ștergerea fusese întreruptă
+            continue
+        try:
+            pid = int(path.stem.split('-')[0])
+            rows = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        _add(totals, rows)
+        if not _is_running(pid):
+            _add(kept, [row for row in rows if not _is_gauge(row[0])])
+            stopped.append(path)
+    if stopped:
+        # Întâi retained.json (cu lista fișierelor adunate), apoi ștergerea: o întrerupere între ele nu dublează nimic
+        _write(directory / RETAINED, {'merged': [path.stem for path in stopped], 'values': _rows(kept)})
+        for path in stopped:
+            path.unlink(missing_ok=True)
+    return totals
+
+
+def collect():
+    # {(metrică, etichete, sufix): valoare} pentru toate firele (și toate procesele în modul 'file')
+    if settings.METRICS_MODE != 'file':
+        return _snapshot_local()
+    flush()
+    directory = _metrics_dir()
+    with _locked(directory):
+        return _collect_files(directory)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        pass
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render():
+    # Formatul text de expunere Prometheus (version=0.0.4)
+    totals = collect()
+    by_metric = {}
+    for (name, labels, suffix), value in totals.items():
+        by_metric.setdefault(name, {}).setdefault(labels, {})[suffix] = value
+
+    lines = []
+    for name, metric in sorted(_metrics.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, series in sorted(by_metric.get(name, {}).items()):
+            if metric.kind in ('counter', 'gauge'):
+                lines.append(f'{name}{_labels(metric.labelnames, labels)} {series[""]}')
+                continue
+            cumulative = 0
+            for bound in (*metric.buckets, '+Inf'):
+                cumulative += series.get(f'bucket:{bound}', 0)
+                lines.append(f'{name}_bucket{_labels(metric.labelnames, labels, [("le", str(bound))])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(metric.labelnames, labels)} {series.get("sum", 0)}')
+            lines.append(f'{name}_count{_labels(metric.labelnames, labels)} {series.get("count", 0)}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- metricile aplicației ---
+
+REQUEST_LATENCY = Histogram('bookstore_request_duration_seconds', 'Durata cererilor HTTP, pe nume de rută', ['view'])
+REQUESTS = Counter('bookstore_requests_total', 'Cereri HTTP, pe nume de rută și status', ['view', 'status'])
+ORDERS_CREATED = Counter('bookstore_orders_created_total', 'Comenzi create, pe status', ['status'])
+ORDERS_REJECTED = Counter('bookstore_orders_out_of_stock_total', 'Comenzi respinse pentru stoc insuficient')
+ORDERS_RELEASED = Counter('bookstore_orders_released_total', 'Linii de comandă cu stocul returnat, pe motiv', ['reason'])
+EMAILS = Counter('bookstore_emails_total', 'E-mailuri trimise/eșuate, pe flux', ['flow', 'result'])
+VIEW_WRITES = Counter('bookstore_vizualizari_writes_total', 'Rânduri Vizualizari scrise (upsert)')
+VIEW_BUFFER_DEPTH = Gauge('bookstore_vizualizari_buffer_depth', 'Vizualizări din buffer încă nescrise în baza de date')
+VIEW_FLUSH_DURATION = Histogram(
+    'bookstore_vizualizari_flush_duration_seconds', 'Durata scrierii unui lot de vizualizări din buffer', ['result'],
+)
+VIEW_DROPPED = Counter('bookstore_vizualizari_dropped_total', 'Vizualizări pierdute (buffer plin sau lot eșuat repetat)')
+CACHE_REQUESTS = Counter('bookstore_cache_requests_total', 'Accesări ale cache-ului de catalog', ['region', 'result'])
+CRON_DURATION = Histogram(
+    'bookstore_cron_duration_seconds', 'Durata job-urilor programate', ['job'],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+JOB_RUNS = Counter('bookstore_job_runs_total', 'Rulări ale job-urilor programate, pe status', ['job', 'status'])
@@ -0,0 +1,194 @@
+import logging
+import os
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.db import connection
+from django.http import FileResponse, HttpResponseNotModified
+
+from . import async_db, metrics, profiling, static_storage
+from .jurnalizare import request_context
+
+access_logger = logging.getLogger('aplicatie.acces')
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class _HybridMiddleware:
+    # Sincron sub WSGI, async sub ASGI (ca MiddlewareMixin din Django): un middleware doar sincron
+    # ar muta tot restul lanțului, inclusiv view-urile async, pe un fir separat
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+
+class StaticAssetMiddleware(_HybridMiddleware):
+    # Servește STATIC_ROOT direct din aplicație (STATIC_SERVE), înaintea restului lanțului:
+    # fișierele cu hash sunt imutabile, celelalte se revalidează prin ETag; varianta .br/.gz
+    # scrisă la collectstatic se alege după Accept-Encoding.
+    def handle(self, request):
+        response = self.serve(request)
+        return self.get_response(request) if response is None else response
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        return await self.get_response(request) if response is None else response
+
+    def serve(self, request):
+        # -> răspunsul pentru un fișier static sau None (cererea merge mai departe)
+        if not settings.STATIC_SERVE or request.method not in ('GET', 'HEAD'):
+            return None
+        found = static_storage.resolve(request.path)
+        if found is None:
+            return None
+        relative, full_path = found
+
+        path, encoding = static_storage.choose_encoding(full_path, request.headers.get('Accept-Encoding', ''))
+        tag = static_storage.etag(os.stat(full_path), encoding)
+        if relative in static_storage.hashed_names():
+            cache_control = f'public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            cache_control = f'public, max-age={settings.STATIC_MAX_AGE}'
+        if tag in [t.strip() for t in request.headers.get('If-None-Match', '').split(',')]:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=static_storage.content_type(relative))
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = tag
+        response['Cache-Control'] = cache_control
+        response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+class RequestLogMiddleware(_HybridMiddleware):
+    # Un rând JSON de acces pe cerere (view, latență, număr de interogări, utilizator);
+    # rândurile aplicației scrise în timpul cererii primesc același request_id.
+    def handle(self, request):
+        context = self.start(request)
+        token = request_context.set(context)
+        counter = _QueryCounter()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                response = self.get_response(request)
+        finally:
+            request_context.reset(token)
+        session = getattr(request, 'session', None)
+        user_id = session.get(SESSION_KEY) if session is not None else None
+        return self.finish(request, response, context, counter, started, user_id)
+
+    async def __acall__(self, request):
+        context = self.start(request)
+        token = request_context.set(context)
+        counter = _QueryCounter()
+        started = time.perf_counter()
+        try:
+            async with async_db.execute_wrapper(counter):
+                response = await self.get_response(request)
+        finally:
+            request_context.reset(token)
+        session = getattr(request, 'session', None)
+        user_id = await session.aget(SESSION_KEY) if session is not None else None
+        return self.finish(request, response, context, counter, started, user_id)
+
+    def start(self, request):
+        request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        request.request_id = request_id
+        return {'request_id': request_id, 'method': request.method, 'path': request.path}
+
+    def finish(self, request, response, context, counter, started, user_id):
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else '(fără rută)'
+        metrics.REQUEST_LATENCY.observe(latency_ms / 1000, view=view_name)
+        metrics.REQUESTS.inc(view=view_name, status=response.status_code)
+
+        access_logger.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                **context,
+                'view': match.view_name if match else None,
+                'user_id': user_id,
+                'status': response.status_code,
+                'latency_ms': latency_ms,
+                'db_queries': counter.count,
+            },
+        )
+        response['X-Request-ID'] = context['request_id']
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        context = request_context.get()
+        if context is not None:
+            context['view'] = request.resolver_match.view_name if request.resolver_match else None
+            session = getattr(request, 'session', None)
+            context['user_id'] = session.get(SESSION_KEY) if session is not None else None
+        return None
+
+
+class ProfilingMiddleware(_HybridMiddleware):
+    # Latență, timp și număr de interogări SQL, timp de randare și dimensiunea răspunsului,
+    # agregate pe view în profiling.registry; interogările repetate de peste
+    # PROFILING_N_PLUS_ONE ori în aceeași cerere sunt marcate ca posibil N+1.
+    def handle(self, request):
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+        measurements = {'template_seconds': 0.0, 'template_depth': 0}
+        token = profiling.current.set(measurements)
+        recorder = profiling.SqlRecorder()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            profiling.current.reset(token)
+        self.record(request, response, measurements, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return await self.get_response(request)
+        measurements = {'template_seconds': 0.0, 'template_depth': 0}
+        token = profiling.current.set(measurements)
+        recorder = profiling.SqlRecorder()
+        started = time.perf_counter()
+        try:
+            async with async_db.execute_wrapper(recorder):
+                response = await self.get_response(request)
+        finally:
+            profiling.current.reset(token)
+        self.record(request, response, measurements, recorder, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, measurements, recorder, latency):
+        match = getattr(request, 'resolver_match', None)
+        sample = {
+            'latency_ms': latency * 1000,
+            'db_ms': recorder.seconds * 1000,
+            'db_queries': recorder.count,
+            'template_ms': measurements['template_seconds'] * 1000,
+            'size': 0 if response.streaming else len(response.content),
+        }
+        repeated = {sql: n for sql, n in recorder.repeats.items() if n > settings.PROFILING_N_PLUS_ONE}
+        profiling.registry.record(match.view_name if match else '(fără rută)', sample, repeated)
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from aplicatie import search
+
+
+def create_search_index(apps, schema_editor):
+    backend = search.get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    backend.create_index()
+    Book = apps.get_model('aplicatie', 'Book')
+    rows = list(search.book_rows(Book.objects.using(schema_editor.connection.alias).order_by('pk')))
+    if rows:
+        backend.index(rows)
+
+
+def drop_search_index(apps, schema_editor):
+    backend = search.get_backend(schema_editor.connection)
+    if backend is not None:
+        backend.drop_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0003_book_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0004_book_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrimiterePromotie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'În așteptare'), ('RUNNING', 'În curs'), ('DONE', 'Finalizată'), ('FAILED', 'Eșuată')], default='PENDING', max_length=10, verbose_name='Status')),
+                ('total', models.IntegerField(default=0, verbose_name='Destinatari')),
+                ('sent', models.IntegerField(default=0, verbose_name='Trimise')),
+                ('failed', models.IntegerField(default=0, verbose_name='Eșuate')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Eroare')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data creării')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Pornită la')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizată la')),
+                ('promotion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trimiteri', to='aplicatie.promotii', verbose_name='Promoție')),
+            ],
+            options={
+                'verbose_name': 'Trimitere promoție',
+                'verbose_name_plural': 'Trimiteri promoții',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Limita istorică din Vizualizari.save() (cel mult 5 vizualizări pe utilizator)
+MAX_VIZUALIZARI = 5
+
+
+def assign_slots(apps, schema_editor):
+    # Păstrează cele mai recente vizualizări ale fiecărui utilizator, câte una pe slot
+    Vizualizari = apps.get_model('aplicatie', 'Vizualizari')
+    seen = {}
+    extra = []
+    for pk, user_id in Vizualizari.objects.order_by('user_id', '-date_viewed', '-pk').values_list('pk', 'user_id'):
+        slot = seen.get(user_id, 0)
+        seen[user_id] = slot + 1
+        if slot < MAX_VIZUALIZARI:
+            Vizualizari.objects.filter(pk=pk).update(slot=slot)
+        else:
+            extra.append(pk)
+    Vizualizari.objects.filter(pk__in=extra).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0005_trimiterepromotie'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vizualizari',
+            name='slot',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Slot'),
+        ),
+        migrations.AlterField(
+            model_name='vizualizari',
+            name='date_viewed',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data vizualizării'),
+        ),
+        migrations.RunPython(assign_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vizualizari',
+            constraint=models.UniqueConstraint(fields=('user', 'slot'), name='vizualizari_user_slot_uniq'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0006_vizualizari_slot'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'created_at', 'id'], name='book_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publisher', 'created_at', 'id'], name='book_publisher_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_date'], name='book_publication_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['stock'], name='book_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('email_confirmat', False)), fields=['date_joined'], name='user_unconfirmed_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('cod__isnull', False)), fields=['cod'], name='user_cod_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promotii',
+            index=models.Index(fields=['date_expiry'], name='promotii_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='review_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trimiterepromotie',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['id'], name='trimitere_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vizualizari',
+            index=models.Index(fields=['user', '-date_viewed'], name='vizualizari_user_date_idx'),
+        ),
+    ]
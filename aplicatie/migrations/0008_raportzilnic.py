@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0007_filter_report_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RaportZilnic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Ziua')),
+                ('metric', models.CharField(choices=[('utilizatori_noi', 'Utilizatori noi'), ('carti_create', 'Cărți create'), ('comenzi', 'Comenzi'), ('recenzii', 'Recenzii'), ('vizualizari', 'Vizualizări'), ('erori', 'Erori')], max_length=30, verbose_name='Metrică')),
+                ('key', models.CharField(blank=True, default='', max_length=200, verbose_name='Cheie')),
+                ('value', models.PositiveIntegerField(default=0, verbose_name='Valoare')),
+                ('computed_at', models.DateTimeField(auto_now=True, verbose_name='Calculat la')),
+            ],
+            options={
+                'verbose_name': 'Raport zilnic',
+                'verbose_name_plural': 'Rapoarte zilnice',
+                'constraints': [models.UniqueConstraint(fields=('day', 'metric', 'key'), name='raport_zilnic_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0008_raportzilnic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PunctControl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Nume')),
+                ('value', models.JSONField(default=dict, verbose_name='Valoare')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizat la')),
+            ],
+            options={
+                'verbose_name': 'Punct de control',
+                'verbose_name_plural': 'Puncte de control',
+            },
+        ),
+    ]
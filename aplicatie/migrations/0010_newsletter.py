@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0009_punctcontrol'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Newsletter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue', models.CharField(max_length=50, unique=True, verbose_name='Număr')),
+                ('subject', models.CharField(max_length=200, verbose_name='Subiect')),
+                ('status', models.CharField(choices=[('RUNNING', 'În curs'), ('DONE', 'Finalizat'), ('FAILED', 'Eșuat')], default='RUNNING', max_length=10, verbose_name='Status')),
+                ('sent', models.IntegerField(default=0, verbose_name='Trimise')),
+                ('failed', models.IntegerField(default=0, verbose_name='Eșuate')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data creării')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizat la')),
+            ],
+            options={
+                'verbose_name': 'Newsletter',
+                'verbose_name_plural': 'Newslettere',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JurnalNewsletter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='E-mail')),
+                ('status', models.CharField(choices=[('SENT', 'Trimis'), ('FAILED', 'Eșuat')], max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=1, verbose_name='Încercări')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Eroare')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizat la')),
+                ('newsletter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jurnal', to='aplicatie.newsletter', verbose_name='Newsletter')),
+            ],
+            options={
+                'verbose_name': 'Jurnal newsletter',
+                'verbose_name_plural': 'Jurnal newslettere',
+                'constraints': [models.UniqueConstraint(fields=('newsletter', 'email'), name='jurnal_newsletter_uniq')],
+            },
+        ),
+    ]
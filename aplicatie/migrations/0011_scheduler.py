@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0010_newsletter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Job')),
+                ('owner', models.CharField(blank=True, default='', max_length=200, verbose_name='Deținut de')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Blocat până la')),
+                ('last_slot', models.DateTimeField(blank=True, null=True, verbose_name='Ultimul slot preluat')),
+            ],
+            options={
+                'verbose_name': 'Blocare job',
+                'verbose_name_plural': 'Blocări job-uri',
+            },
+        ),
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=100, verbose_name='Job')),
+                ('status', models.CharField(choices=[('RUNNING', 'În curs'), ('OK', 'Reușită'), ('FAILED', 'Eșuată'), ('TIMEOUT', 'Depășire timp'), ('SKIPPED', 'Sărită (rulare anterioară în curs)')], default='RUNNING', max_length=10, verbose_name='Status')),
+                ('scheduled_for', models.DateTimeField(verbose_name='Programată pentru')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Pornită la')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizată la')),
+                ('duration', models.FloatField(blank=True, null=True, verbose_name='Durată (s)')),
+                ('rows', models.IntegerField(blank=True, null=True, verbose_name='Rânduri afectate')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Eroare')),
+                ('owner', models.CharField(blank=True, default='', max_length=200, verbose_name='Proces')),
+            ],
+            options={
+                'verbose_name': 'Rulare job',
+                'verbose_name_plural': 'Rulări job-uri',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['job', '-started_at'], name='jobrun_job_started_idx')],
+            },
+        ),
+    ]
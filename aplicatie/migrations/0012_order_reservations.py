@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0011_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='checkout',
+            field=models.UUIDField(blank=True, null=True, verbose_name='Cod comandă'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Rezervare valabilă până la'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('checkout__isnull', False)), fields=['checkout'], name='order_checkout_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['expires_at'], name='order_pending_expiry_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.CheckConstraint(condition=models.Q(('stock__gte', 0)), name='book_stock_nonnegative'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0012_order_reservations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trimiterepromotie',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'În așteptare'), ('RUNNING', 'În curs'), ('DONE', 'Finalizată'), ('PARTIAL', 'Parțial trimisă'), ('FAILED', 'Eșuată')], default='PENDING', max_length=10, verbose_name='Status'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicatie', '0013_trimiterepromotie_partial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JurnalPromotie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='E-mail')),
+                ('status', models.CharField(choices=[('SENT', 'Trimis'), ('FAILED', 'Eșuat')], max_length=10, verbose_name='Status')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Eroare')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizat la')),
+                ('trimitere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jurnal', to='aplicatie.trimiterepromotie', verbose_name='Trimitere')),
+            ],
+            options={
+                'verbose_name': 'Jurnal promoție',
+                'verbose_name_plural': 'Jurnal promoții',
+                'constraints': [models.UniqueConstraint(fields=('trimitere', 'email'), name='jurnal_promotie_uniq')],
+            },
+        ),
+    ]
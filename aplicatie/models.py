@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 import uuid  # Pentru generarea codului aleatoriu
 
 # Model pentru Autor
@@ -44,6 +45,27 @@ class Category(models.Model):
         verbose_name_plural = "Categorii"
 
 
+# QuerySet pentru catalog: încarcă relațiile dintr-o singură trecere (fără N+1)
+class BookQuerySet(models.QuerySet):
+    # Coloanele afișate efectiv în lista de cărți (book_list_partial.html)
+    LIST_FIELDS = (
+        'title', 'price', 'publication_date', 'stock', 'created_at',
+        'author__name', 'publisher__name',
+    )
+
+    def with_related(self):
+        # JOIN pentru autor/editură + o singură interogare suplimentară pentru categorii
+        return self.select_related('author', 'publisher').prefetch_related('categories')
+
+    def for_list(self):
+        # Varianta pentru listare: doar coloanele randate în tabel
+        return self.with_related().only(*self.LIST_FIELDS)
+
+    def in_categories(self, categories):
+        # Cărțile din oricare dintre categoriile date, fără duplicate
+        return self.filter(categories__in=categories).distinct()
+
+
 # Model pentru Carte
 class Book(models.Model):
     title = models.CharField(max_length=200, verbose_name="Titlu")  # CharField
@@ -59,12 +81,28 @@ class Book(models.Model):
     publisher = models.ForeignKey(Publisher, on_delete=models.CASCADE, related_name='books', verbose_name="Editura")  # One-to-Many
     categories = models.ManyToManyField(Category, related_name='books', verbose_name="Categorii")  # Many-to-Many
 
+    objects = BookQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
     class Meta:
         verbose_name = "Carte"
         verbose_name_plural = "Cărți"
+        indexes = [
+            # Cheile pentru paginarea pe cursor (vezi BookFilterForm.ORDERINGS)
+            models.Index(fields=['created_at', 'id'], name='book_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='book_price_id_idx'),
+            # Filtrele din BookFilterForm, combinate cu ordonarea implicită (cele mai noi)
+            models.Index(fields=['author', 'created_at', 'id'], name='book_author_created_idx'),
+            models.Index(fields=['publisher', 'created_at', 'id'], name='book_publisher_created_idx'),
+            models.Index(fields=['publication_date'], name='book_publication_date_idx'),
+            models.Index(fields=['stock'], name='book_stock_idx'),
+        ]
+        constraints = [
+            # Ultima plasă de siguranță împotriva vânzării peste stoc (rezervările sunt condiționate, vezi orders.py)
+            models.CheckConstraint(condition=models.Q(stock__gte=0), name='book_stock_nonnegative'),
+        ]
 
 
 # Model pentru Recenzie
@@ -81,6 +119,9 @@ class Review(models.Model):
     class Meta:
         verbose_name = "Recenzie"
         verbose_name_plural = "Recenzii"
+        indexes = [
+            models.Index(fields=['created_at'], name='review_created_idx'),  # raportul de activitate
+        ]
 
 
 # Model pentru Comandă
@@ -95,6 +136,10 @@ class Order(models.Model):
     order_date = models.DateTimeField(auto_now_add=True, verbose_name="Data Comenzii")  # DateTimeField
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', verbose_name="Status")  # CharField cu choices
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data Creării")  # Adăugat pentru raport
+    # Comenzile plasate prin orders.place_order: liniile aceleiași comenzi au același `checkout`, iar
+    # stocul rezervat de o comandă PENDING se eliberează după `expires_at` (vezi orders.release_expired)
+    checkout = models.UUIDField(blank=True, null=True, verbose_name="Cod comandă")
+    expires_at = models.DateTimeField(blank=True, null=True, verbose_name="Rezervare valabilă până la")
 
     def __str__(self):
         return f"Comandă #{self.id} pentru {self.book.title}"
@@ -102,6 +147,12 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Comandă"
         verbose_name_plural = "Comenzi"
+        indexes = [
+            models.Index(fields=['created_at'], name='order_created_idx'),  # raportul de activitate
+            models.Index(fields=['checkout'], name='order_checkout_idx', condition=models.Q(checkout__isnull=False)),
+            # Parțial: sweeper-ul caută doar rezervările în așteptare, în ordinea expirării
+            models.Index(fields=['expires_at'], name='order_pending_expiry_idx', condition=models.Q(status='PENDING')),
+        ]
 
 
 # Model personalizat pentru utilizatori
@@ -130,28 +181,36 @@ class CustomUser(AbstractUser):
     class Meta:
         verbose_name = "Utilizator"
         verbose_name_plural = "Utilizatori"
+        indexes = [
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),  # raportul de activitate
+            # Parțiale: clean_unconfirmed_users caută doar neconfirmații, confirm_email doar codurile active
+            models.Index(fields=['date_joined'], name='user_unconfirmed_joined_idx', condition=models.Q(email_confirmat=False)),
+            models.Index(fields=['cod'], name='user_cod_idx', condition=models.Q(cod__isnull=False)),
+        ]
 
 
 # Model pentru Vizualizări
+# Ultimele VIZUALIZARI_MAX cărți văzute de fiecare utilizator, ca un buffer circular:
+# fiecare utilizator are sloturi fixe (0..N-1), iar o vizualizare nouă suprascrie
+# slotul cel mai vechi printr-un singur upsert (vezi recent_views.py).
 class Vizualizari(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, verbose_name="Utilizator")
     book = models.ForeignKey(Book, on_delete=models.CASCADE, verbose_name="Produs")
-    date_viewed = models.DateTimeField(auto_now_add=True, verbose_name="Data vizualizării")
+    slot = models.PositiveSmallIntegerField(default=0, verbose_name="Slot")
+    date_viewed = models.DateTimeField(default=timezone.now, verbose_name="Data vizualizării")  # setată explicit la upsert
 
     class Meta:
         verbose_name = "Vizualizare"
         verbose_name_plural = "Vizualizări"
         ordering = ['-date_viewed']  # Ordonează după data descrescător pentru a obține cele mai recente vizualizări
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'slot'], name='vizualizari_user_slot_uniq'),
+        ]
+        indexes = [
+            # recent_views.recent_book_ids: WHERE user_id IN (...) ORDER BY user_id, date_viewed DESC
+            models.Index(fields=['user', '-date_viewed'], name='vizualizari_user_date_idx'),
+        ]
 
-    def save(self, *args, **kwargs):
-        # Verifică dacă există mai mult de 5 vizualizări pentru același utilizator
-        user_visualizations = Vizualizari.objects.filter(user=self.user).order_by('date_viewed')
-        if user_visualizations.count() >= 5:
-            # Șterge cea mai veche vizualizare
-            oldest_visualization = user_visualizations.first()
-            oldest_visualization.delete()
-        super().save(*args, **kwargs)  #obj.save(false), false intra in args
-#super, metoda de la parinte care nu e override
 
 # Model pentru Promoții
 class Promotii(models.Model):
@@ -165,6 +224,203 @@ class Promotii(models.Model):
     class Meta:
         verbose_name = "Promoție"
         verbose_name_plural = "Promoții"
+        indexes = [
+            models.Index(fields=['date_expiry'], name='promotii_expiry_idx'),  # promoțiile active
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+# Model pentru trimiterea e-mailurilor unei promoții (rulată în fundal)
+class TrimiterePromotie(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'În așteptare'),
+        ('RUNNING', 'În curs'),
+        ('DONE', 'Finalizată'),
+        ('PARTIAL', 'Parțial trimisă'),  # o parte din loturi au eșuat
+        ('FAILED', 'Eșuată'),
+    ]
+    promotion = models.ForeignKey(Promotii, on_delete=models.CASCADE, related_name='trimiteri', verbose_name="Promoție")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', verbose_name="Status")
+    total = models.IntegerField(default=0, verbose_name="Destinatari")
+    sent = models.IntegerField(default=0, verbose_name="Trimise")
+    failed = models.IntegerField(default=0, verbose_name="Eșuate")
+    error = models.TextField(blank=True, null=True, verbose_name="Eroare")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data creării")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Pornită la")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Finalizată la")
+
+    class Meta:
+        verbose_name = "Trimitere promoție"
+        verbose_name_plural = "Trimiteri promoții"
+        ordering = ['-created_at']
+        indexes = [
+            # promotions.run_pending: doar job-urile în așteptare, în ordinea creării
+            models.Index(fields=['id'], name='trimitere_pending_idx', condition=models.Q(status='PENDING')),
+        ]
+
+    def __str__(self):
+        return f"Trimitere #{self.id} pentru {self.promotion.name}"
+
+
+# Rezultatul fiecărui destinatar al unei trimiteri de promoție
+class JurnalPromotie(models.Model):
+    STATUS_CHOICES = [
+        ('SENT', 'Trimis'),
+        ('FAILED', 'Eșuat'),
+    ]
+    trimitere = models.ForeignKey(TrimiterePromotie, on_delete=models.CASCADE, related_name='jurnal', verbose_name="Trimitere")
+    email = models.EmailField(verbose_name="E-mail")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, verbose_name="Status")
+    error = models.TextField(blank=True, default='', verbose_name="Eroare")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
+
+    class Meta:
+        verbose_name = "Jurnal promoție"
+        verbose_name_plural = "Jurnal promoții"
+        constraints = [
+            models.UniqueConstraint(fields=['trimitere', 'email'], name='jurnal_promotie_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Trimitere #{self.trimitere_id} -> {self.email}: {self.status}"
+
+
+# Model pentru rapoartele de activitate: valori agregate pe zi (rollup), din care se
+# calculează rapoartele săptămânale/lunare fără a rescana tabelele mari (vezi reports.py)
+class RaportZilnic(models.Model):
+    METRIC_CHOICES = [
+        ('utilizatori_noi', 'Utilizatori noi'),
+        ('carti_create', 'Cărți create'),
+        ('comenzi', 'Comenzi'),  # cheie = status
+        ('recenzii', 'Recenzii'),
+        ('vizualizari', 'Vizualizări'),  # cheie = id carte
+        ('erori', 'Erori'),  # cheie = view
+    ]
+    day = models.DateField(verbose_name="Ziua")
+    metric = models.CharField(max_length=30, choices=METRIC_CHOICES, verbose_name="Metrică")
+    key = models.CharField(max_length=200, blank=True, default='', verbose_name="Cheie")
+    value = models.PositiveIntegerField(default=0, verbose_name="Valoare")
+    computed_at = models.DateTimeField(auto_now=True, verbose_name="Calculat la")
+
+    class Meta:
+        verbose_name = "Raport zilnic"
+        verbose_name_plural = "Rapoarte zilnice"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'metric', 'key'], name='raport_zilnic_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.metric} {self.key}: {self.value}"
+
+
+# Punct de control pentru job-urile care procesează în loturi și pot fi reluate
+# (ex. purge.purge_unconfirmed_users): ultima cheie procesată și parametrii rulării
+class PunctControl(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Nume")
+    value = models.JSONField(default=dict, verbose_name="Valoare")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
+
+    class Meta:
+        verbose_name = "Punct de control"
+        verbose_name_plural = "Puncte de control"
+
+    def __str__(self):
+        return self.name
+
+
+# Un număr de newsletter (ex. săptămâna 2026-W42); trimiterea se poate relua oricând
+class Newsletter(models.Model):
+    STATUS_CHOICES = [
+        ('RUNNING', 'În curs'),
+        ('DONE', 'Finalizat'),
+        ('FAILED', 'Eșuat'),
+    ]
+    issue = models.CharField(max_length=50, unique=True, verbose_name="Număr")
+    subject = models.CharField(max_length=200, verbose_name="Subiect")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='RUNNING', verbose_name="Status")
+    sent = models.IntegerField(default=0, verbose_name="Trimise")
+    failed = models.IntegerField(default=0, verbose_name="Eșuate")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data creării")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Finalizat la")
+
+    class Meta:
+        verbose_name = "Newsletter"
+        verbose_name_plural = "Newslettere"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.issue} ({self.get_status_display()})"
+
+
+# Jurnalul trimiterilor: câte un rând pe (newsletter, adresă); la reluare se sar adresele cu status SENT
+class JurnalNewsletter(models.Model):
+    STATUS_CHOICES = [
+        ('SENT', 'Trimis'),
+        ('FAILED', 'Eșuat'),
+    ]
+    newsletter = models.ForeignKey(Newsletter, on_delete=models.CASCADE, related_name='jurnal', verbose_name="Newsletter")
+    email = models.EmailField(verbose_name="E-mail")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, verbose_name="Status")
+    attempts = models.PositiveSmallIntegerField(default=1, verbose_name="Încercări")
+    error = models.TextField(blank=True, default='', verbose_name="Eroare")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
+
+    class Meta:
+        verbose_name = "Jurnal newsletter"
+        verbose_name_plural = "Jurnal newslettere"
+        constraints = [
+            models.UniqueConstraint(fields=['newsletter', 'email'], name='jurnal_newsletter_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.newsletter.issue} -> {self.email}: {self.status}"
+
+
+# Blocarea unui job programat între noduri: un singur proces îl rulează la un moment dat,
+# iar un slot programat (ex. joi 18:00) e preluat de un singur nod
+class JobLock(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Job")
+    owner = models.CharField(max_length=200, blank=True, default='', verbose_name="Deținut de")
+    locked_until = models.DateTimeField(blank=True, null=True, verbose_name="Blocat până la")
+    last_slot = models.DateTimeField(blank=True, null=True, verbose_name="Ultimul slot preluat")
+
+    class Meta:
+        verbose_name = "Blocare job"
+        verbose_name_plural = "Blocări job-uri"
+
+    def __str__(self):
+        return self.name
+
+
+# Istoricul rulărilor job-urilor programate
+class JobRun(models.Model):
+    STATUS_CHOICES = [
+        ('RUNNING', 'În curs'),
+        ('OK', 'Reușită'),
+        ('FAILED', 'Eșuată'),
+        ('TIMEOUT', 'Depășire timp'),
+        ('SKIPPED', 'Sărită (rulare anterioară în curs)'),
+    ]
+    job = models.CharField(max_length=100, verbose_name="Job")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='RUNNING', verbose_name="Status")
+    scheduled_for = models.DateTimeField(verbose_name="Programată pentru")
+    started_at = models.DateTimeField(default=timezone.now, verbose_name="Pornită la")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Finalizată la")
+    duration = models.FloatField(blank=True, null=True, verbose_name="Durată (s)")
+    rows = models.IntegerField(blank=True, null=True, verbose_name="Rânduri afectate")
+    error = models.TextField(blank=True, default='', verbose_name="Eroare")
+    owner = models.CharField(max_length=200, blank=True, default='', verbose_name="Proces")
+
+    class Meta:
+        verbose_name = "Rulare job"
+        verbose_name_plural = "Rulări job-uri"
+        ordering = ['-started_at']
+        indexes = [
+            # run_scheduler --list: ultima rulare a fiecărui job
+            models.Index(fields=['job', '-started_at'], name='jobrun_job_started_idx'),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.job} {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
@@ -0,0 +1,179 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from . import metrics
+from .models import Book, CustomUser, JurnalNewsletter, Newsletter
+from .promotions import PLACEHOLDER
+
+logger = logging.getLogger('django')
+
+# Newsletter-ul săptămânal:
+#  1. destinatarii se citesc în flux (iterator cu chunk_size), fără a încărca toți utilizatorii în memorie;
+#  2. template-ul se compilează o singură dată, iar corpul se randează o dată pe segment
+#     (gen preferat, frecvența lecturii); numele se completează apoi prin marcaje @@user.x@@;
+#  3. e-mailurile pleacă unul câte unul pe aceeași conexiune (backend-ul SMTP se oprește la primul
+#     mesaj eșuat, după ce le-a trimis pe cele dinainte), deci o reîncercare, cu conexiune nouă și
+#     pauze crescătoare, reia doar mesajul eșuat;
+#  4. rezultatul fiecărei adrese (SENT/FAILED) se scrie în JurnalNewsletter, câte un upsert pe lot,
+#     deci o nouă rulare pentru același număr trimite doar ce a rămas (adresele eșuate sau netrimise);
+#  5. după NEWSLETTER_MAX_CONSECUTIVE_FAILURES mesaje eșuate la rând (server SMTP căzut) rularea se
+#     oprește cu FAILED, în loc să plătească reîncercările și pauzele pentru fiecare destinatar rămas.
+
+TEMPLATE = 'aplicatie/email_newsletter.txt'
+SUBJECT = 'Newsletter Bookstore - Oferte speciale!'
+USER_FIELDS = ('email', 'first_name', 'username', 'favorite_genre', 'reading_frequency')
+
+
+def current_issue(day=None):
+    year, week, _ = (day or timezone.localdate()).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def recipients(newsletter, chunk_size=None):
+    # Utilizatorii mai vechi de NEWSLETTER_MIN_ACCOUNT_AGE (față de crearea numărului, ca reluările
+    # să vadă aceeași audiență) care nu au primit încă acest număr
+    cutoff = newsletter.created_at - settings.NEWSLETTER_MIN_ACCOUNT_AGE
+    already_sent = JurnalNewsletter.objects.filter(newsletter=newsletter, status='SENT').values('email')
+    rows = (
+        CustomUser.objects.filter(date_joined__lte=cutoff)
+        .exclude(email='')
+        .exclude(email__in=already_sent)
+        .order_by('pk')
+        .values_list(*USER_FIELDS)
+        .iterator(chunk_size=chunk_size or settings.NEWSLETTER_CHUNK_SIZE)
+    )
+    for values in rows:
+        yield dict(zip(USER_FIELDS, values))
+
+
+class Renderer:
+    # Template compilat o dată; corpul randat o dată pe (gen, frecvență)
+    def __init__(self):
+        self.template = get_template(TEMPLATE)
+        self.segments = {}
+
+    def _segment(self, genre, frequency):
+        key = (genre.strip().lower(), frequency)
+        if key not in self.segments:
+            books = []
+            if key[0]:
+                books = list(
+                    Book.objects.filter(categories__name__iexact=key[0])
+                    .select_related('author').order_by('-created_at')[:settings.NEWSLETTER_RECOMMENDATIONS]
+                )
+            self.segments[key] = self.template.render({
+                'user': {'name': '@@user.name@@'},
+                'genre': genre.strip(),
+                'books': books,
+                'frequency': frequency,
+                'site_url': settings.NEWSLETTER_SITE_URL,
+            })
+        return self.segments[key]
+
+    def render(self, user):
+        body = self._segment(user['favorite_genre'] or '', user['reading_frequency'])
+        fields = {'name': user['first_name'] or user['username']}
+        return PLACEHOLDER.sub(lambda m: fields.get(m.group(1), ''), body)
+
+
+def _send_one(connection, message, retries, backoff):
+    # -> (trimis, încercări, eroare); reia mesajul cu o conexiune nouă după pauze crescătoare
+    error = ''
+    for attempt in range(1, retries + 1):
+        try:
+            if attempt > 1:
+                connection.open()  # deschisă explicit, ca send_messages să nu o închidă după mesaj
+            return bool(connection.send_messages([message])), attempt, ''
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            logger.warning(f"Newsletter către {', '.join(message.to)} eșuat (încercarea {attempt}/{retries}): {error}")
+            try:
+                connection.close()  # următoarea încercare deschide o conexiune nouă
+            except Exception:
+                pass
+            if attempt < retries and backoff:
+                time.sleep(backoff * 2 ** (attempt - 1))
+    return False, retries, error
+
+
+def _log(newsletter, results):
+    # results: [(adresă, status, încercări, eroare)], un singur upsert pentru tot lotul
+    JurnalNewsletter.objects.bulk_create(
+        [JurnalNewsletter(newsletter=newsletter, email=email, status=status, attempts=attempts, error=error)
+         for email, status, attempts, error in results],
+        update_conflicts=True,
+        unique_fields=['newsletter', 'email'],
+        update_fields=['status', 'attempts', 'error', 'updated_at'],
+    )
+
+
+class SmtpUnavailable(Exception):
+    pass
+
+
+def _deliver(newsletter, connection, renderer, batch, retries, backoff, streak):
+    # -> (trimise, eșuate, eșecuri consecutive); SmtpUnavailable după prea multe eșecuri la rând
+    results = []
+    for user in batch:
+        message = EmailMessage(newsletter.subject, renderer.render(user), settings.DEFAULT_FROM_EMAIL, [user['email']])
+        delivered, attempts, error = _send_one(connection, message, retries, backoff)
+        results.append((user['email'], 'SENT' if delivered else 'FAILED', attempts, error))
+        streak = 0 if delivered else streak + 1
+        if streak >= settings.NEWSLETTER_MAX_CONSECUTIVE_FAILURES:
+            break  # restul lotului rămâne nejurnalizat, deci e reluat la rularea următoare
+    _log(newsletter, results)
+    sent = sum(status == 'SENT' for _, status, _, _ in results)
+    metrics.EMAILS.inc(sent, flow='newsletter', result='sent')
+    metrics.EMAILS.inc(len(results) - sent, flow='newsletter', result='failed')
+    if streak >= settings.NEWSLETTER_MAX_CONSECUTIVE_FAILURES:
+        raise SmtpUnavailable(f"{streak} mesaje eșuate la rând; ultima eroare: {results[-1][3]}")
+    return sent, len(results) - sent, streak
+
+
+def send_newsletter(issue=None, subject=SUBJECT, batch_size=None, retries=None, backoff=None):
+    # -> Newsletter; idempotent pentru același număr
+    issue = issue or current_issue()
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    retries = retries or settings.NEWSLETTER_RETRIES
+    backoff = settings.NEWSLETTER_BACKOFF if backoff is None else backoff
+
+    newsletter, _ = Newsletter.objects.get_or_create(issue=issue, defaults={'subject': subject})
+    newsletter.status = 'RUNNING'
+    newsletter.save(update_fields=['status'])
+    renderer = Renderer()
+    sent = failed = streak = 0
+    try:
+        with get_connection() as connection:
+            batch = []
+            for user in recipients(newsletter):
+                batch.append(user)
+                if len(batch) < batch_size:
+                    continue
+                ok, bad, streak = _deliver(newsletter, connection, renderer, batch, retries, backoff, streak)
+                sent, failed, batch = sent + ok, failed + bad, []
+            if batch:
+                ok, bad, streak = _deliver(newsletter, connection, renderer, batch, retries, backoff, streak)
+                sent, failed = sent + ok, failed + bad
+        newsletter.status = 'DONE'
+    except SmtpUnavailable as e:
+        logger.error(f"Newsletter-ul {issue} a fost oprit: {e}. Rularea următoare continuă din jurnal.")
+        newsletter.status = 'FAILED'
+    except Exception as e:
+        logger.exception("Trimiterea newsletter-ului %s a eșuat: %s", issue, e)
+        newsletter.status = 'FAILED'
+
+    # Totalurile numărului (inclusiv rulările anterioare), din jurnal
+    newsletter.sent = newsletter.jurnal.filter(status='SENT').count()
+    newsletter.failed = newsletter.jurnal.filter(status='FAILED').count()
+    newsletter.finished_at = timezone.now()
+    newsletter.save(update_fields=['status', 'sent', 'failed', 'finished_at'])
+    if sent or failed:
+        logger.info(f"Newsletter {issue} trimis către {sent} utilizatori ({failed} eșuate) în această rulare.")
+    elif newsletter.status == 'DONE':
+        logger.warning(f"Nu există utilizatori eligibili pentru newsletter-ul {issue}.")
+    return newsletter
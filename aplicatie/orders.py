@@ -0,0 +1,125 @@
+import logging
+import uuid
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import catalog_cache, metrics
+from .models import Book, Order
+
+logger = logging.getLogger('django')
+
+# Plasarea comenzilor cu rezervarea stocului, sigură la cumpărători concurenți:
+#  - stocul se rezervă cu UPDATE ... SET stock = stock - n WHERE id = ... AND stock >= n (expresie F),
+#    fără citire-modificare-scriere; dacă o linie nu are stoc, toată comanda e anulată (o tranzacție);
+#  - liniile se rezervă în ordinea id-ului cărții, deci două comenzi cu aceleași titluri iau
+#    blocările pe rânduri în aceeași ordine (fără deadlock pe PostgreSQL), iar tranzacția ține
+#    blocările doar cât durează câteva UPDATE-uri și inserarea liniilor;
+#  - o comandă PENDING ține stocul până la expires_at (ORDER_RESERVATION_TTL); anularea și expirarea
+#    (release_expired, rulat de scheduler) îl returnează tot printr-un UPDATE cu F, o singură dată:
+#    doar rândurile încă PENDING, blocate (SKIP LOCKED pe PostgreSQL), trec în CANCELED;
+#  - constrângerea book_stock_nonnegative e ultima plasă de siguranță.
+
+PENDING, SHIPPED, CANCELED = 'PENDING', 'SHIPPED', 'CANCELED'
+
+
+class OutOfStock(Exception):
+    def __init__(self, book_ids):
+        self.book_ids = book_ids
+        super().__init__(f"Stoc insuficient pentru cărțile: {', '.join(map(str, book_ids))}")
+
+
+def _merge(lines):
+    # [(book_id, cantitate)] -> {book_id: cantitate totală}, în ordinea id-urilor
+    quantities = Counter()
+    for book_id, quantity in lines:
+        if quantity < 1:
+            raise ValueError("Cantitatea trebuie să fie pozitivă.")
+        quantities[int(book_id)] += quantity
+    if not quantities:
+        raise ValueError("Comanda nu are nicio linie.")
+    return dict(sorted(quantities.items()))
+
+
+def _invalidate(book_ids):
+    # Doar cardul cărții: generația CATALOG ar goli toate paginile listei la fiecare comandă;
+    # stocul din listă se reîmprospătează după CATALOG_LIST_CACHE_TIMEOUT
+    catalog_cache.bump('book', *book_ids)
+
+
+def _restock(quantities):
+    for book_id, quantity in sorted(quantities.items()):
+        Book.objects.filter(pk=book_id).update(stock=F('stock') + quantity)
+    transaction.on_commit(partial(_invalidate, list(quantities)))
+
+
+def place_order(lines, ttl=None):
+    # lines: [(book_id, cantitate)]; -> liniile create (PENDING, același checkout); OutOfStock dacă nu ajunge stocul
+    quantities = _merge(lines)
+    now = timezone.now()
+    checkout = uuid.uuid4()
+    missing = []
+    with transaction.atomic():
+        for book_id, quantity in quantities.items():
+            if not Book.objects.filter(pk=book_id, stock__gte=quantity).update(stock=F('stock') - quantity):
+                missing.append(book_id)
+                break
+        if missing:
+            transaction.set_rollback(True)  # rezervările deja făcute pentru liniile anterioare
+        else:
+            orders = Order.objects.bulk_create([
+                Order(book_id=book_id, quantity=quantity, status=PENDING, checkout=checkout,
+                      expires_at=now + (ttl or settings.ORDER_RESERVATION_TTL))
+                for book_id, quantity in quantities.items()
+            ])
+            transaction.on_commit(partial(_invalidate, list(quantities)))
+    if missing:
+        metrics.ORDERS_REJECTED.inc()
+        raise OutOfStock(missing)
+    metrics.ORDERS_CREATED.inc(len(orders), status=PENDING)  # bulk_create nu trimite post_save
+    return orders
+
+
+def release(queryset, limit=None, reason='canceled'):
+    # Trece în CANCELED liniile PENDING din queryset și le returnează stocul; -> numărul de linii
+    with transaction.atomic():
+        locked = queryset.filter(status=PENDING).order_by('pk').select_for_update(skip_locked=True)
+        rows = list(locked.values_list('pk', 'book_id', 'quantity')[:limit])
+        if not rows:
+            return 0
+        Order.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(status=CANCELED, expires_at=None)
+        quantities = Counter()
+        for _, book_id, quantity in rows:
+            quantities[book_id] += quantity
+        _restock(quantities)
+    metrics.ORDERS_RELEASED.inc(len(rows), reason=reason)
+    return len(rows)
+
+
+def cancel_order(checkout):
+    return release(Order.objects.filter(checkout=checkout))
+
+
+def ship_order(checkout):
+    # Confirmă rezervarea: liniile încă PENDING devin SHIPPED și nu mai expiră; -> numărul de linii
+    return Order.objects.filter(checkout=checkout, status=PENDING).update(status=SHIPPED, expires_at=None)
+
+
+def release_expired(now=None, batch_size=None):
+    # Rezervările expirate, în loturi scurte (fiecare lot e o tranzacție); -> numărul de linii eliberate
+    now = now or timezone.now()
+    batch_size = batch_size or settings.ORDER_SWEEP_BATCH_SIZE
+    expired = Order.objects.filter(expires_at__lt=now)
+    total = 0
+    while True:
+        released = release(expired, limit=batch_size, reason='expired')
+        total += released
+        if released < batch_size:
+            break
+    if total:
+        logger.info(f"Rezervări expirate eliberate: {total} linii de comandă.")
+    return total
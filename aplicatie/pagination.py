@@ -0,0 +1,107 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Paginare pe cheie (keyset / cursor): în loc de COUNT(*) + OFFSET, fiecare pagină
+# continuă de la ultima cheie văzută, deci costul nu crește cu numărul paginii.
+# Ordonarea trebuie să fie stabilă și să se termine cu cheia primară.
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'v': values, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    # Cursor invalid (modificat manual, expirat etc.) => prima pagină
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data['d'] not in ('n', 'p') or not isinstance(data['v'], list):
+            return None
+        return data['v'], data['d']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page, ordering):
+        # ordering: ex. ('-created_at', '-id'); toate câmpurile în aceeași direcție
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.model_fields = [queryset.model._meta.get_field(name) for name in self.fields]
+
+    def _keys(self, obj):
+        return [field.value_to_string(obj) for field in self.model_fields]
+
+    def _parse(self, values):
+        if len(values) != len(self.model_fields):
+            raise ValidationError("Cursor incompatibil cu ordonarea curentă.")
+        return [field.to_python(value) for field, value in zip(self.model_fields, values)]
+
+    def _after(self, values, forward):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y); generalizat pe n coloane
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        for i, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def get_page(self, cursor=None):
+        decoded = decode_cursor(cursor) if cursor else None
+        values, direction = None, 'n'
+        if decoded:
+            try:
+                values, direction = self._parse(decoded[0]), decoded[1]
+            except ValidationError:
+                values, direction = None, 'n'
+
+        if direction == 'p':
+            qs = self.queryset.filter(self._after(values, forward=False)).order_by(*self._reversed_ordering())
+            rows = list(qs[:self.per_page + 1])
+            has_more_before = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_more_after = True
+        else:
+            qs = self.queryset
+            if values is not None:
+                qs = qs.filter(self._after(values, forward=True))
+            rows = list(qs.order_by(*self.ordering)[:self.per_page + 1])
+            has_more_after = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_more_before = values is not None
+
+        next_cursor = encode_cursor(self._keys(rows[-1]), 'n') if rows and has_more_after else None
+        prev_cursor = encode_cursor(self._keys(rows[0]), 'p') if rows and has_more_before else None
+        return KeysetPage(rows, next_cursor, prev_cursor)
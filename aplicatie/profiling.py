@@ -0,0 +1,242 @@
+import contextvars
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.backends.django import DjangoTemplates
+
+# Profilarea cererilor: pentru fiecare view (nume URL) ținem în memorie histograme cu
+# memorie mărginită pentru latență, timpul SQL, numărul de interogări, timpul de randare
+# a template-urilor și dimensiunea răspunsului. Periodic, fiecare proces își publică
+# instantaneul în cache-ul PROFILING_CACHE_ALIAS (partajat de procese, ca versiunile din
+# catalog_cache), iar pagina de staff le combină (vezi views.profiling_dashboard).
+
+# Măsurătorile cererii curente (setate de ProfilingMiddleware, completate de TimedTemplate)
+current = contextvars.ContextVar('profiling_current', default=None)
+
+METRICS = ('latency_ms', 'db_ms', 'db_queries', 'template_ms', 'size')
+
+
+class QuantileSketch:
+    # Histogramă pe găleți logaritmice (ca DDSketch): eroare relativă ~alpha pentru orice cuantilă,
+    # cel mult max_buckets găleți; la depășire se unesc cele mai mici valori
+    def __init__(self, alpha=0.02, max_buckets=256):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            lowest = min(self.buckets)
+            moved = self.buckets.pop(lowest)
+            self.buckets[min(self.buckets)] += moved
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return min(2 * self.gamma ** key / (self.gamma + 1), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other):
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        while len(self.buckets) > self.max_buckets:
+            lowest = min(self.buckets)
+            moved = self.buckets.pop(lowest)
+            self.buckets[min(self.buckets)] += moved
+
+    def to_dict(self):
+        return {'buckets': self.buckets, 'zeros': self.zeros, 'count': self.count, 'total': self.total, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        sketch.buckets = dict(data['buckets'])
+        sketch.zeros, sketch.count, sketch.total, sketch.max = data['zeros'], data['count'], data['total'], data['max']
+        return sketch
+
+
+class ViewProfile:
+    def __init__(self):
+        self.sketches = {metric: QuantileSketch() for metric in METRICS}
+        self.n_plus_one = {}  # sql -> {'requests': cereri afectate, 'max_repeats': cel mai mare număr de repetări}
+
+    def add(self, sample, repeated):
+        for metric in METRICS:
+            self.sketches[metric].add(sample[metric])
+        for sql, repeats in repeated.items():
+            entry = self.n_plus_one.setdefault(sql, {'requests': 0, 'max_repeats': 0})
+            entry['requests'] += 1
+            entry['max_repeats'] = max(entry['max_repeats'], repeats)
+
+    def merge(self, other):
+        for metric in METRICS:
+            self.sketches[metric].merge(other.sketches[metric])
+        for sql, entry in other.n_plus_one.items():
+            mine = self.n_plus_one.setdefault(sql, {'requests': 0, 'max_repeats': 0})
+            mine['requests'] += entry['requests']
+            mine['max_repeats'] = max(mine['max_repeats'], entry['max_repeats'])
+
+    def to_dict(self):
+        return {'sketches': {m: s.to_dict() for m, s in self.sketches.items()}, 'n_plus_one': self.n_plus_one}
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls()
+        profile.sketches = {m: QuantileSketch.from_dict(s) for m, s in data['sketches'].items()}
+        profile.n_plus_one = {sql: dict(entry) for sql, entry in data['n_plus_one'].items()}
+        return profile
+
+
+def _cache():
+    return caches[settings.PROFILING_CACHE_ALIAS]
+
+
+class ProfileRegistry:
+    # Fiecare proces ocupă un slot din PROFILING_MAX_PROCESSES cu cache.add (atomic, fără citire-
+    # modificare-scriere a unei liste comune) și îl ține cât timp publică; un slot al unui proces
+    # oprit expiră odată cu instantaneul lui și poate fi ocupat de altul
+    SLOT_KEY = 'profilare:slot:{}'
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._ids = {}  # pid -> identificatorul pornirii (după fork copilul are alt pid)
+        self._slot = None
+
+    def _process_id(self):
+        pid = os.getpid()
+        if pid not in self._ids:
+            self._ids[pid] = f'{pid}-{time.time_ns()}'
+            self._slot = None
+        return self._ids[pid]
+
+    def _process_key(self, process_id):
+        return f'profilare:proces:{process_id}'
+
+    def _slot_keys(self):
+        return [self.SLOT_KEY.format(i) for i in range(settings.PROFILING_MAX_PROCESSES)]
+
+    def _claim_slot(self, process_id, timeout):
+        cache = _cache()
+        if self._slot is not None and cache.get(self._slot) == process_id:
+            cache.touch(self._slot, timeout)
+            return
+        self._slot = next((key for key in self._slot_keys() if cache.add(key, process_id, timeout)), None)
+
+    def record(self, view, sample, repeated):
+        with self._lock:
+            self._views.setdefault(view, ViewProfile()).add(sample, repeated)
+            due = time.monotonic() - self._last_flush >= settings.PROFILING_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        # Publică instantaneul (cumulativ) al procesului; expiră dacă procesul nu mai trimite nimic
+        with self._lock:
+            snapshot = {view: profile.to_dict() for view, profile in self._views.items()}
+            self._last_flush = time.monotonic()
+        timeout = settings.PROFILING_FLUSH_INTERVAL * 20
+        process_id = self._process_id()
+        _cache().set(self._process_key(process_id), snapshot, timeout)
+        self._claim_slot(process_id, timeout)
+
+    def merged(self):
+        # {view: ViewProfile} din toate procesele care au publicat recent
+        self.flush()
+        cache = _cache()
+        process_ids = cache.get_many(self._slot_keys()).values()
+        snapshots = cache.get_many([self._process_key(process_id) for process_id in process_ids])
+        merged = {}
+        for snapshot in snapshots.values():
+            for view, data in snapshot.items():
+                merged.setdefault(view, ViewProfile()).merge(ViewProfile.from_dict(data))
+        return merged
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+        keys = self._slot_keys()
+        cache = _cache()
+        cache.delete_many([self._process_key(process_id) for process_id in cache.get_many(keys).values()] + keys)
+        self._slot = None
+
+
+registry = ProfileRegistry()
+
+
+class SqlRecorder:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.repeats = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.repeats[sql] = self.repeats.get(sql, 0) + 1
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        measurements = current.get()
+        if measurements is None or measurements['template_depth']:
+            return self.template.render(context, request)  # randare imbricată: e deja cronometrată
+        measurements['template_depth'] += 1
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            measurements['template_seconds'] += time.perf_counter() - started
+            measurements['template_depth'] -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    # Backend-ul obișnuit, dar măsoară timpul de randare pentru ProfilingMiddleware
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
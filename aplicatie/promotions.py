@@ -0,0 +1,200 @@
+import logging
+import queue
+import re
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+
+from . import metrics, recent_views
+from .models import JurnalPromotie, TrimiterePromotie
+
+logger = logging.getLogger('django')
+
+# Trimiterea e-mailurilor de promoție în fundal:
+#  1. audiența se obține dintr-o singură interogare, fără duplicate între categorii;
+#  2. fiecare template se randează o singură dată, cu marcaje pentru datele utilizatorului;
+#  3. e-mailurile pleacă unul câte unul pe aceeași conexiune SMTP (backend-ul se oprește la primul
+#     mesaj refuzat, după ce le-a trimis pe cele dinainte), deci fiecare mesaj e numărat corect;
+#  4. rezultatul fiecărui destinatar se scrie în JurnalPromotie (un upsert pe lot), iar progresul
+#     pe TrimiterePromotie, ca view-ul să poată răspunde imediat.
+
+# Categoriile care au template de e-mail, în ordinea priorității (un utilizator
+# care a văzut cărți din mai multe categorii primește un singur e-mail, pentru prima)
+PROMOTION_TEMPLATES = {
+    'Poezie': 'aplicatie/email_promotion_poetry.html',
+    'Ficțiune': 'aplicatie/email_promotion_fiction.html',
+}
+
+USER_FIELDS = ('first_name', 'last_name', 'username', 'email')
+PLACEHOLDER = re.compile(r'@@user\.(\w+)@@')
+
+
+def resolve_audience(promotion):
+    # -> [(user_id, {câmpuri utilizator}, categoria)] câte un rând pe utilizator
+    categories = {c.pk: c.name for c in promotion.categories.filter(name__in=PROMOTION_TEMPLATES)}
+    if not categories:
+        return []
+    rows = recent_views.viewers_of_categories(list(categories), *USER_FIELDS)
+    priority = list(PROMOTION_TEMPLATES)
+    audience = {}
+    for user_id, category_id, *values in rows:
+        category = categories.get(category_id)
+        if category is None:
+            continue
+        current = audience.get(user_id)
+        if current is None or priority.index(category) < priority.index(current[1]):
+            audience[user_id] = (dict(zip(USER_FIELDS, values)), category)
+    return [(user_id, fields, category) for user_id, (fields, category) in sorted(audience.items())]
+
+
+def render_template_once(template_name, promotion):
+    # Datele utilizatorului devin marcaje @@user.x@@, înlocuite apoi pentru fiecare destinatar
+    context = {
+        'user': {field: f'@@user.{field}@@' for field in USER_FIELDS},
+        'promotion': promotion,
+        'expiry_date': promotion.date_expiry,
+    }
+    return render_to_string(template_name, context)
+
+
+def personalize(html, fields):
+    return PLACEHOLDER.sub(lambda m: escape(fields.get(m.group(1)) or ''), html)
+
+
+def build_messages(promotion, audience):
+    rendered = {}
+    for user_id, fields, category in audience:
+        if category not in rendered:
+            rendered[category] = render_template_once(PROMOTION_TEMPLATES[category], promotion)
+        message = EmailMultiAlternatives(
+            f"Promoție {promotion.name} - {category}",
+            '',  # Corpul textului simplu (nu e necesar, deoarece folosim HTML)
+            settings.DEFAULT_FROM_EMAIL,
+            [fields['email']],
+        )
+        message.attach_alternative(personalize(rendered[category], fields), 'text/html')
+        yield message
+
+
+def _send_each(connection, messages):
+    # -> [(adresă, status, eroare)]; după un mesaj eșuat conexiunea se redeschide pentru următorul
+    results = []
+    reopen = False
+    for message in messages:
+        try:
+            if reopen:
+                connection.open()
+                reopen = False
+            delivered, error = bool(connection.send_messages([message])), ''
+        except Exception as e:
+            delivered, error = False, str(e) or e.__class__.__name__
+            try:
+                connection.close()
+            except Exception:
+                pass
+            reopen = True
+        results.append((message.to[0], 'SENT' if delivered else 'FAILED', error))
+    return results
+
+
+def _log(job, results):
+    JurnalPromotie.objects.bulk_create(
+        [JurnalPromotie(trimitere=job, email=email, status=status, error=error) for email, status, error in results],
+        update_conflicts=True,
+        unique_fields=['trimitere', 'email'],
+        update_fields=['status', 'error', 'updated_at'],
+    )
+
+
+def run_job(job_id):
+    # Preia job-ul doar dacă e încă în așteptare (un singur worker îl poate rula)
+    claimed = TrimiterePromotie.objects.filter(pk=job_id, status='PENDING').update(
+        status='RUNNING', started_at=timezone.now()
+    )
+    if not claimed:
+        return
+    job = TrimiterePromotie.objects.select_related('promotion').get(pk=job_id)
+    try:
+        audience = resolve_audience(job.promotion)
+        job.total = len(audience)
+        job.save(update_fields=['total'])
+
+        batch_size = settings.PROMOTII_BATCH_SIZE
+        messages_iter = build_messages(job.promotion, audience)
+        with get_connection() as connection:
+            while True:
+                batch = [m for _, m in zip(range(batch_size), messages_iter)]
+                if not batch:
+                    break
+                results = _send_each(connection, batch)
+                _log(job, results)
+                errors = [(email, error) for email, status, error in results if status == 'FAILED']
+                for email, error in errors:
+                    logger.error(f"Eroare la trimiterea promoției {job.promotion.name} către {email}: {error}")
+                if errors:
+                    job.error = errors[-1][1]  # ultima eroare, pentru promotion_job_status
+                sent = len(batch) - len(errors)
+                job.sent += sent
+                job.failed += len(batch) - sent
+                metrics.EMAILS.inc(sent, flow='promotii', result='sent')
+                metrics.EMAILS.inc(len(batch) - sent, flow='promotii', result='failed')
+                job.save(update_fields=['sent', 'failed'])
+
+        # Mesaje eșuate: PARTIAL dacă a plecat măcar un e-mail, altfel FAILED
+        job.status = 'DONE' if not job.failed else 'PARTIAL' if job.sent else 'FAILED'
+        log = logger.info if job.status == 'DONE' else logger.error
+        log(f"Promoție {job.promotion.name} trimisă către {job.sent} utilizatori ({job.failed} eșuate).")
+    except Exception as e:
+        logger.exception("Trimiterea promoției #%s a eșuat: %s", job_id, e)
+        job.status = 'FAILED'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def run_pending():
+    # Folosit de comanda process_promotions (modul 'db'); întoarce numărul de job-uri rulate
+    count = 0
+    for job_id in TrimiterePromotie.objects.filter(status='PENDING').order_by('pk').values_list('pk', flat=True):
+        run_job(job_id)
+        count += 1
+    return count
+
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _worker_loop():
+    while True:
+        job_id = _queue.get()
+        try:
+            run_job(job_id)
+        except Exception:
+            logger.exception("Eroare în worker-ul de promoții pentru job-ul #%s", job_id)
+        finally:
+            close_old_connections()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_worker_loop, name='promotii-worker', daemon=True)
+            _worker.start()
+
+
+def enqueue(job):
+    # PROMOTII_DISPATCH: 'thread' (coadă în proces), 'db' (comanda process_promotions) sau 'sync'
+    mode = settings.PROMOTII_DISPATCH
+    if mode == 'sync':
+        run_job(job.pk)
+    elif mode == 'thread':
+        _ensure_worker()
+        transaction.on_commit(lambda: _queue.put(job.pk))
@@ -0,0 +1,71 @@
+import logging
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CustomUser, PunctControl
+
+logger = logging.getLogger('django')
+
+# Ștergerea utilizatorilor neconfirmați în loturi mici, pe intervale de chei primare:
+#  - fiecare lot e o tranzacție scurtă, deci login-ul și înregistrarea nu așteaptă după un lock lung;
+#  - cascadele (Vizualizari, grupuri, permisiuni, LogEntry) se șterg cu câte un DELETE ... WHERE
+#    user_id IN (...) pe tabel (fast delete al lui Django), fără a încărca obiectele în memorie;
+#  - după fiecare lot se salvează ultima cheie în PunctControl, iar o rulare întreruptă
+#    continuă de acolo, cu aceeași dată limită.
+
+CHECKPOINT = 'purge_unconfirmed_users'
+
+
+def unconfirmed(cutoff):
+    return CustomUser.objects.filter(email_confirmat=False, date_joined__lte=cutoff)
+
+
+def purge_unconfirmed_users(cutoff=None, batch_size=None, sleep=None, max_batches=None, restart=False, progress=None):
+    # -> {'users', 'rows', 'batches', 'seconds', 'rows_per_second', 'finished'}
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    sleep = settings.PURGE_SLEEP if sleep is None else sleep
+    checkpoint, _ = PunctControl.objects.get_or_create(name=CHECKPOINT)
+    state = {} if restart else checkpoint.value
+    if state.get('cutoff'):
+        cutoff = datetime.fromisoformat(state['cutoff'])  # reluare: aceeași limită
+    elif cutoff is None:
+        cutoff = timezone.now() - settings.UNCONFIRMED_USER_MAX_AGE
+    last_pk = state.get('last_pk', 0)
+
+    stats = {'users': 0, 'rows': 0, 'batches': 0, 'finished': False}
+    started = time.perf_counter()
+    while max_batches is None or stats['batches'] < max_batches:
+        pks = list(
+            unconfirmed(cutoff).filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            stats['finished'] = True
+            break
+        with transaction.atomic():
+            # Condiția se reverifică: un utilizator poate confirma între SELECT și DELETE
+            rows, per_model = unconfirmed(cutoff).filter(pk__in=pks).delete()
+            last_pk = pks[-1]
+            checkpoint.value = {'cutoff': cutoff.isoformat(), 'last_pk': last_pk}
+            checkpoint.save(update_fields=['value', 'updated_at'])
+        stats['users'] += per_model.get(CustomUser._meta.label, 0)
+        stats['rows'] += rows
+        stats['batches'] += 1
+        if progress:
+            progress(stats, last_pk)
+        if sleep:
+            time.sleep(sleep)  # lăsăm loc celorlalte scrieri (SQLite are un singur scriitor)
+
+    if stats['finished']:
+        checkpoint.value = {}
+        checkpoint.save(update_fields=['value', 'updated_at'])
+    stats['seconds'] = time.perf_counter() - started
+    stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+    logger.info(
+        f"Șterse {stats['users']} utilizatori fără e-mail confirmat ({stats['rows']} rânduri în total, "
+        f"{stats['batches']} loturi, {stats['rows_per_second']:.0f} rânduri/s)."
+    )
+    return stats
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import Book, Vizualizari
+
+# "Văzute recent": cel mult VIZUALIZARI_MAX rânduri pe utilizator în Vizualizari.
+# Slotul fiecărei vizualizări se alege din baza de date, în tranzacția flush-ului: același
+# (user, book) => același rând; altfel cel mai mic slot liber, iar cu bufferul plin rândul cu
+# cel mai vechi date_viewed. Două flush-uri (alte procese sau fire) pentru același utilizator
+# nu pornesc din copii diferite ale stării: pe SQLite tranzacția IMMEDIATE le serializează,
+# pe PostgreSQL rândurile utilizatorilor sunt blocate (SELECT ... FOR UPDATE) până la commit.
+# Un flush costă un SELECT de cel mult N rânduri pe utilizator plus un upsert pe lot.
+
+
+def _load_rings(user_ids):
+    # {user_id: {'books': {slot: book_id}, 'order': [sloturi de la cea mai veche la cea mai nouă]}}
+    rings = {user_id: {'books': {}, 'order': []} for user_id in user_ids}
+    rows = (
+        Vizualizari.objects.filter(user_id__in=user_ids, slot__lt=settings.VIZUALIZARI_MAX)
+        .order_by('user_id', 'date_viewed', 'pk')
+        .values_list('user_id', 'slot', 'book_id')
+    )
+    for user_id, slot, book_id in rows:
+        rings[user_id]['books'][slot] = book_id
+        rings[user_id]['order'].append(slot)
+    return rings
+
+
+def _next_slot(ring, book_id):
+    # Aceeași carte văzută din nou => același slot, mutat la capătul "recent" al listei
+    for slot, existing in ring['books'].items():
+        if existing == book_id:
+            ring['order'].remove(slot)
+            break
+    else:
+        free = [s for s in range(settings.VIZUALIZARI_MAX) if s not in ring['books']]
+        slot = free[0] if free else ring['order'].pop(0)
+    ring['books'][slot] = book_id
+    ring['order'].append(slot)
+    return slot
+
+
+def record_views(events, batch_size=None):
+    # events: [(user_id, book_id, date_viewed)] în ordine cronologică; un INSERT ... ON CONFLICT pe lot
+    user_ids = sorted({user_id for user_id, _, _ in events})
+    if not user_ids:
+        return 0
+    with transaction.atomic():
+        if connection.features.has_select_for_update:
+            # În ordinea cheii, ca două flush-uri cu utilizatori comuni să nu se blocheze reciproc
+            list(get_user_model().objects.filter(pk__in=user_ids).order_by('pk')
+                 .select_for_update().values_list('pk', flat=True))
+        rings = _load_rings(user_ids)
+        rows = {}
+        for user_id, book_id, date_viewed in events:
+            slot = _next_slot(rings[user_id], book_id)
+            rows[(user_id, slot)] = Vizualizari(user_id=user_id, book_id=book_id, slot=slot, date_viewed=date_viewed)
+        objs = list(rows.values())
+        Vizualizari.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['user', 'slot'],
+            update_fields=['book', 'date_viewed'],
+            batch_size=batch_size,
+        )
+    metrics.VIEW_WRITES.inc(len(objs))
+    return len(objs)
+
+
+def record_view(user_id, book_id):
+    return record_views([(user_id, book_id, timezone.now())])
+
+
+def recent_book_ids(user_ids, limit=None):
+    # Citire în bloc: {user_id: [book_id, ...]} de la cea mai recentă vizualizare, o singură interogare
+    result = {user_id: [] for user_id in user_ids}
+    rows = (
+        Vizualizari.objects.filter(user_id__in=list(result))
+        .order_by('user_id', '-date_viewed')
+        .values_list('user_id', 'book_id')
+    )
+    for user_id, book_id in rows:
+        if limit is None or len(result[user_id]) < limit:
+            result[user_id].append(book_id)
+    return result
+
+
+def recent_books(user, exclude=None, limit=None, pending=()):
+    # Pentru widget-ul "Văzute recent": cărțile, cu autor/editură, în ordinea vizualizării.
+    # pending = vizualizări încă nescrise (din buffer), de la cea mai veche la cea mai nouă
+    book_ids = []
+    for pk in [*reversed(pending), *recent_book_ids([user.pk])[user.pk]]:
+        if pk != exclude and pk not in book_ids:
+            book_ids.append(pk)
+    book_ids = book_ids[:limit]
+    books = Book.objects.with_related().in_bulk(book_ids)
+    return [books[pk] for pk in book_ids if pk in books]
+
+
+def viewers_of_categories(category_ids, *user_fields):
+    # Utilizatorii confirmați care au văzut recent cărți din categoriile date (audiența promoțiilor).
+    # Cărțile vin din stratul de catalog (Book.objects.in_categories); rândurile au toate categoriile
+    # cărții văzute, deci și altele decât cele cerute: apelantul le ignoră pe acelea.
+    return (
+        Vizualizari.objects
+        .filter(book__in=Book.objects.in_categories(category_ids), user__email_confirmat=True)
+        .values_list('user_id', 'book__categories', *[f'user__{f}' for f in user_fields])
+        .distinct()
+    )
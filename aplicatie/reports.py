@@ -0,0 +1,222 @@
+import csv
+import json
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import log_query
+from .models import Book, CustomUser, Order, RaportZilnic, Review
+
+# Rapoarte de activitate incrementale:
+#  1. rollup(start, end) agregă în SQL (GROUP BY zi) tot intervalul dintr-o singură
+#     interogare pe sursă și citește jurnalul JSON o singură dată, apoi face upsert în RaportZilnic;
+#  2. rollup_pending() procesează doar zilele noi, plus ultima zi deja agregată: aceea poate fi
+#     parțială (rularea de duminică 23:59 cu include_today), deci se recalculează la fiecare rulare;
+#  3. rapoartele săptămânale/lunare se calculează din RaportZilnic, nu din tabelele brute.
+
+SCALAR_METRICS = ('utilizatori_noi', 'carti_create', 'recenzii')
+BOOK_PATH = re.compile(r'/book/(\d+)/')
+
+
+def _bounds(start, end):
+    # [start, end) ca datetime-uri aware în fusul orar curent
+    tz = timezone.get_current_timezone()
+    return (timezone.make_aware(datetime.combine(start, time.min), tz),
+            timezone.make_aware(datetime.combine(end, time.min), tz))
+
+
+def _per_day(queryset, field, *group_by):
+    return (
+        queryset.order_by()
+        .annotate(day=TruncDate(field))
+        .values('day', *group_by)
+        .annotate(n=Count('pk'))
+    )
+
+
+def _database_counts(start_dt, end_dt):
+    # -> {(zi, metrică, cheie): valoare}, câte o interogare GROUP BY pe sursă
+    counts = {}
+    sources = [
+        ('utilizatori_noi', CustomUser.objects.filter(date_joined__gte=start_dt, date_joined__lt=end_dt), 'date_joined'),
+        ('carti_create', Book.objects.filter(created_at__gte=start_dt, created_at__lt=end_dt), 'created_at'),
+        ('recenzii', Review.objects.filter(created_at__gte=start_dt, created_at__lt=end_dt), 'created_at'),
+    ]
+    for metric, queryset, field in sources:
+        for row in _per_day(queryset, field):
+            counts[(row['day'], metric, '')] = row['n']
+    orders = Order.objects.filter(created_at__gte=start_dt, created_at__lt=end_dt)
+    for row in _per_day(orders, 'created_at', 'status'):
+        counts[(row['day'], 'comenzi', row['status'])] = row['n']
+    return counts
+
+
+def _log_counts(start_dt, end_dt):
+    # Vizualizări pe carte (rândurile de acces book_detail) și erori pe view, dintr-o singură trecere;
+    # fișierele rotite modificate ultima dată înainte de start_dt nu se mai citesc
+    counts = {}
+    end = end_dt.astimezone(dt_timezone.utc).isoformat(timespec='milliseconds')
+    markers = ('"book_detail"',) + log_query.ERROR_MARKERS
+    tz = timezone.get_current_timezone()
+    for record in log_query.records(start_dt, markers=markers):
+        ts = record.get('ts', '')
+        if ts >= end:
+            continue
+        if record.get('level') in ('ERROR', 'CRITICAL'):
+            key = ('erori', record.get('view') or '-')
+        elif record.get('view') == 'book_detail' and record.get('status') == 200:
+            match = BOOK_PATH.search(record.get('path', ''))
+            if not match:
+                continue
+            key = ('vizualizari', match.group(1))
+        else:
+            continue
+        day = datetime.fromisoformat(ts).astimezone(tz).date()
+        counts[(day, *key)] = counts.get((day, *key), 0) + 1
+    return counts
+
+
+def rollup(start, end):
+    # Recalculează zilele [start, end); idempotent (upsert). Întoarce numărul de zile.
+    start_dt, end_dt = _bounds(start, end)
+    counts = _database_counts(start_dt, end_dt)
+    counts.update(_log_counts(start_dt, end_dt))
+    days = (end - start).days
+    for offset in range(days):
+        # Valorile scalare se scriu și când sunt 0, ca fiecare zi procesată să aibă rânduri
+        for metric in SCALAR_METRICS:
+            counts.setdefault((start + timedelta(days=offset), metric, ''), 0)
+
+    with transaction.atomic():
+        RaportZilnic.objects.filter(day__gte=start, day__lt=end).exclude(metric__in=SCALAR_METRICS).delete()
+        RaportZilnic.objects.bulk_create(
+            [RaportZilnic(day=day, metric=metric, key=key, value=value) for (day, metric, key), value in counts.items()],
+            update_conflicts=True,
+            unique_fields=['day', 'metric', 'key'],
+            update_fields=['value', 'computed_at'],
+            batch_size=1000,
+        )
+    return days
+
+
+def _first_activity_day():
+    candidates = [
+        CustomUser.objects.aggregate(first=Min('date_joined'))['first'],
+        Book.objects.aggregate(first=Min('created_at'))['first'],
+    ]
+    candidates = [c for c in candidates if c is not None]
+    return timezone.localtime(min(candidates)).date() if candidates else timezone.localdate()
+
+
+def rollup_pending(include_today=False):
+    # Zilele noi până ieri (sau azi), începând cu ultima zi agregată: poate fi parțială, o recalculăm
+    last = RaportZilnic.objects.aggregate(last=Max('day'))['last']
+    today = timezone.localdate()
+    if last is not None and last > today:
+        last = today
+    start = last if last is not None else _first_activity_day()
+    end = today + timedelta(days=1) if include_today else today
+    if start >= end:
+        return 0
+    return rollup(start, end)
+
+
+def period_bounds(period, day):
+    if period == 'daily':
+        return day, day + timedelta(days=1)
+    if period == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def summarize(start, end):
+    # {metrică: {cheie: total}} din rollup-uri (un singur GROUP BY)
+    totals = {}
+    rows = (
+        RaportZilnic.objects.filter(day__gte=start, day__lt=end)
+        .values('metric', 'key')
+        .annotate(total=Sum('value'))
+    )
+    for row in rows:
+        totals.setdefault(row['metric'], {})[row['key']] = row['total']
+    return totals
+
+
+def build_report(period, day):
+    start, end = period_bounds(period, day)
+    totals = summarize(start, end)
+    views = sorted(totals.get('vizualizari', {}).items(), key=lambda item: -item[1])[:10]
+    titles = Book.objects.in_bulk([int(pk) for pk, _ in views])
+    return {
+        'period': period,
+        'start': start.isoformat(),
+        'end': (end - timedelta(days=1)).isoformat(),
+        'utilizatori_noi': totals.get('utilizatori_noi', {}).get('', 0),
+        'carti_create': totals.get('carti_create', {}).get('', 0),
+        'recenzii': totals.get('recenzii', {}).get('', 0),
+        'comenzi': totals.get('comenzi', {}),
+        'vizualizari': [
+            {'book_id': int(pk), 'title': titles[int(pk)].title if int(pk) in titles else '(ștearsă)', 'count': n}
+            for pk, n in views
+        ],
+        'erori': dict(sorted(totals.get('erori', {}).items(), key=lambda item: -item[1])),
+    }
+
+
+PERIOD_LABELS = {'daily': 'zilnic', 'weekly': 'săptămânal', 'monthly': 'lunar'}
+PERIOD_SLUGS = {'daily': 'zilnic', 'weekly': 'saptamanal', 'monthly': 'lunar'}
+
+
+def _render_text(report):
+    orders = '\n'.join(f"     - {status}: {n}" for status, n in sorted(report['comenzi'].items())) or "     - 0"
+    views = '\n'.join(f"   - {row['title']}: {row['count']}" for row in report['vizualizari']) or "   - Nicio vizualizare."
+    errors = '\n'.join(f"   - {view}: {n}" for view, n in report['erori'].items()) or "   - Nicio eroare."
+    return f"""Raport de Activitate ({PERIOD_LABELS[report['period']]}) - {report['start']} .. {report['end']}
+
+1. Număr de utilizatori noi: {report['utilizatori_noi']}
+2. Acțiuni importante:
+   - Cărți create: {report['carti_create']}
+   - Comenzi plasate: {sum(report['comenzi'].values())}
+{orders}
+   - Recenzii adăugate: {report['recenzii']}
+3. Cele mai vizualizate cărți:
+{views}
+4. Erori pe view:
+{errors}
+
+Generat automat de Bookstore.
+"""
+
+
+def write_report(period, day, formats=('txt', 'csv', 'json')):
+    report = build_report(period, day)
+    base = settings.REPORTS_DIR / f"report_{PERIOD_SLUGS[period]}_{report['start']}"
+    paths = []
+    for fmt in formats:
+        path = base.with_suffix(f'.{fmt}')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if fmt == 'txt':
+                f.write(_render_text(report))
+            elif fmt == 'json':
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(['metrica', 'cheie', 'eticheta', 'valoare'])
+                for metric in SCALAR_METRICS:
+                    writer.writerow([metric, '', '', report[metric]])
+                for status, n in sorted(report['comenzi'].items()):
+                    writer.writerow(['comenzi', status, '', n])
+                for row in report['vizualizari']:
+                    writer.writerow(['vizualizari', row['book_id'], row['title'], row['count']])
+                for view, n in report['erori'].items():
+                    writer.writerow(['erori', view, '', n])
+        paths.append(path)
+    return paths
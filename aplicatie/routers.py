@@ -0,0 +1,33 @@
+from django.db import connections
+
+# Citirile pentru catalog (cărți, autori, edituri, categorii, promoții) pot merge pe o
+# replică de citire, dacă în DATABASES există alias-ul 'replica'. Scrierile, migrațiile
+# și tot restul aplicației rămân pe 'default'.
+
+REPLICA = 'replica'
+
+CATALOG_MODELS = {'book', 'author', 'publisher', 'category', 'promotii', 'book_categories'}
+
+
+class CatalogReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if REPLICA not in connections.databases:
+            return None
+        if model._meta.app_label != 'aplicatie' or model._meta.model_name not in CATALOG_MODELS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db  # relațiile unui obiect se citesc de unde a fost încărcat
+        if connections['default'].in_atomic_block:
+            return 'default'  # într-o tranzacție vrem să vedem propriile scrieri
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica are aceleași date ca 'default'
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
@@ -0,0 +1,297 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import metrics
+from .models import JobLock, JobRun
+
+logger = logging.getLogger('django')
+
+# Scheduler-ul aplicației (comanda run_scheduler): un singur proces de lungă durată rulează
+# job-urile din SCHEDULED_JOBS după expresii cron, fără a porni câte un interpretor nou la fiecare rulare.
+#  - JobLock: un job rulează pe un singur nod la un moment dat, iar fiecare slot programat e
+#    preluat o singură dată (UPDATE condiționat, deci funcționează cu mai multe noduri pe aceeași bază);
+#  - blocarea expiră după timeout + SCHEDULER_LOCK_GRACE, ca un proces oprit brusc să nu blocheze job-ul;
+#    fiecare rulare are propriul token de proprietar, deci doar ea își poate elibera blocarea;
+#  - fiecare job scadent rulează într-un proces copil (fork), deci un job lung (newsletter-ul, până la
+#    o oră) nu întârzie job-urile scurte și dese (release_expired_orders, în fiecare minut); dacă slotul
+#    următor al aceluiași job vine cât încă rulează, blocarea îl marchează SKIPPED, ca pe alt nod;
+#  - timeout-ul se aplică prin SIGALRM în firul principal al copilului (sau al run_scheduler --run);
+#    un copil care nu răspunde la alarmă e oprit de scheduler la timeout + SCHEDULER_LOCK_GRACE / 2,
+#    înainte să expire blocarea, deci același job nu ajunge să ruleze de două ori deodată;
+#  - fiecare rulare lasă un rând în JobRun (durată, rânduri afectate, eroare).
+
+
+class JobTimeout(BaseException):
+    # BaseException: să nu fie prinsă de blocurile `except Exception` din job-uri
+    pass
+
+
+class CronSchedule:
+    # Expresie cron cu 5 câmpuri: minut oră zi-din-lună lună zi-din-săptămână (0 sau 7 = duminică).
+    # Acceptă *, liste (1,15), intervale (1-5) și pași (*/10, 0-30/5).
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expresie cron invalidă: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.FIELDS)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        # Ca în cron: dacă ziua lunii și a săptămânii sunt ambele restrânse, ajunge una dintre ele
+        self.any_day = parts[2] == '*' or parts[4] == '*'
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for item in field.split(','):
+            item, _, step = item.partition('/')
+            if item == '*':
+                start, end = low, high
+            elif '-' in item:
+                start, end = map(int, item.split('-'))
+            else:
+                start = end = int(item)
+            if not low <= start <= end <= high:
+                raise ValueError(f"Valoare cron în afara intervalului {low}-{high}: {field!r}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, day):
+        in_month = day.day in self.days
+        in_week = day.isoweekday() % 7 in self.weekdays
+        return in_month and in_week if self.any_day else in_month or in_week
+
+    def next_after(self, moment):
+        # Primul minut (aware, în fusul orar curent) strict după `moment`
+        tz = timezone.get_current_timezone()
+        current = timezone.localtime(moment, tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366 * 5)
+        while current < limit:
+            if current.month not in self.months:
+                current = (current.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return timezone.make_aware(current, tz)
+        raise ValueError(f"Expresia cron {self.expression!r} nu se potrivește cu nicio dată")
+
+
+class Job:
+    def __init__(self, name, schedule, func, timeout=None):
+        self.name = name
+        self.schedule = schedule if isinstance(schedule, CronSchedule) else CronSchedule(schedule)
+        self.func = import_string(func) if isinstance(func, str) else func
+        self.timeout = timeout or settings.SCHEDULER_DEFAULT_TIMEOUT
+
+
+def load_jobs(config=None):
+    # SCHEDULED_JOBS: {nume: {'schedule': '0 18 * * 4', 'callable': 'modul.funcție', 'timeout': secunde}}
+    config = settings.SCHEDULED_JOBS if config is None else config
+    return [
+        Job(name, options['schedule'], options['callable'], options.get('timeout'))
+        for name, options in config.items()
+    ]
+
+
+def default_owner():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def run_token(owner=None):
+    # Proprietarul unei singure rulări: procesul + un sufix unic
+    return f'{owner or default_owner()}:{uuid.uuid4().hex[:12]}'
+
+
+def acquire(job, slot, owner):
+    # True dacă acest proces a preluat slotul: job-ul nu rulează altundeva și slotul nu a fost deja rulat
+    JobLock.objects.get_or_create(name=job.name)
+    now = timezone.now()
+    free = Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    new_slot = Q(last_slot__isnull=True) | Q(last_slot__lt=slot)
+    lease = now + timedelta(seconds=job.timeout + settings.SCHEDULER_LOCK_GRACE)
+    return bool(
+        JobLock.objects.filter(free, new_slot, name=job.name).update(owner=owner, locked_until=lease, last_slot=slot)
+    )
+
+
+def release(job, owner):
+    JobLock.objects.filter(name=job.name, owner=owner).update(owner='', locked_until=None)
+
+
+@contextmanager
+def time_limit(seconds):
+    # SIGALRM funcționează doar în firul principal; altundeva timeout-ul rămâne doar expirarea blocării
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise JobTimeout(f"Depășit timeout-ul de {seconds} s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_job(job, slot=None, owner=None):
+    # -> JobRun sau None dacă slotul a fost deja preluat de alt nod
+    owner = owner or run_token()
+    slot = slot or timezone.now()
+    if not acquire(job, slot, owner):
+        lock = JobLock.objects.get(name=job.name)
+        if lock.locked_until and lock.locked_until >= timezone.now() and (lock.last_slot is None or lock.last_slot < slot):
+            # Rularea anterioară încă nu s-a terminat: o sărim, dar o lăsăm în istoric
+            logger.warning(f"Job-ul {job.name} rulează deja pe {lock.owner}; slotul {slot:%Y-%m-%d %H:%M} a fost sărit.")
+            metrics.JOB_RUNS.inc(job=job.name, status='SKIPPED')
+            return JobRun.objects.create(
+                job=job.name, status='SKIPPED', scheduled_for=slot, finished_at=timezone.now(), owner=owner,
+                error=f"În curs pe {lock.owner}",
+            )
+        return None
+
+    run = JobRun.objects.create(job=job.name, scheduled_for=slot, owner=owner)
+    started = time.perf_counter()
+    try:
+        with time_limit(job.timeout):
+            rows = job.func()
+        run.rows = rows if isinstance(rows, int) else None
+        run.status = 'OK'
+    except JobTimeout as e:
+        run.status, run.error = 'TIMEOUT', str(e)
+        logger.error(f"Job-ul {job.name} a depășit timeout-ul de {job.timeout} s.")
+    except Exception:
+        run.status, run.error = 'FAILED', traceback.format_exc()
+        logger.exception(f"Job-ul {job.name} a eșuat.")
+    finally:
+        run.duration = time.perf_counter() - started
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'rows', 'error', 'duration', 'finished_at'])
+        release(job, owner)
+    metrics.JOB_RUNS.inc(job=job.name, status=run.status)
+    logger.info(f"Job-ul {job.name}: {run.status} în {run.duration:.2f} s (rânduri: {run.rows}).")
+    return run
+
+
+def abandon(job, owner):
+    # Rularea unui copil oprit forțat: rândul din JobRun devine TIMEOUT, blocarea (doar a ei) se eliberează
+    JobRun.objects.filter(job=job.name, owner=owner, finished_at__isnull=True).update(
+        status='TIMEOUT', error=f"Oprit după {job.timeout} s (nu a răspuns la SIGALRM)", finished_at=timezone.now(),
+    )
+    release(job, owner)
+    metrics.JOB_RUNS.inc(job=job.name, status='TIMEOUT')
+    logger.error(f"Job-ul {job.name} ({owner}) a fost oprit forțat după timeout.")
+
+
+def _run_child(job, slot, owner):
+    # În procesul copil: SIGTERM/SIGINT nu mai opresc bucla părintelui, ci copilul
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        run_job(job, slot=slot, owner=owner)
+    except Exception:
+        logger.exception(f"Eroare a scheduler-ului la rularea job-ului {job.name}")
+    finally:
+        connections.close_all()
+        metrics.flush()  # copilul iese fără atexit
+
+
+class Scheduler:
+    def __init__(self, jobs=None, owner=None):
+        self.jobs = load_jobs() if jobs is None else jobs
+        self.owner = owner or default_owner()
+        self.stopping = False
+        self.running = {}  # proces copil -> (job, token, termen monotonic)
+        self._context = multiprocessing.get_context('fork')
+
+    def stop(self, *args):
+        # Oprire curată (SIGTERM/SIGINT): nu mai pornesc job-uri noi, cele în curs se termină, apoi bucla iese
+        self.stopping = True
+
+    def dispatch(self, next_runs):
+        # Pornește job-urile scadente, fiecare în procesul lui, și mută next_runs la slotul următor; -> procesele pornite
+        started = []
+        for job in self.jobs:
+            if self.stopping or next_runs[job.name] > timezone.now():
+                continue
+            connections.close_all()  # copilul nu trebuie să moștenească conexiunile părintelui
+            token = run_token(self.owner)
+            process = self._context.Process(target=_run_child, args=(job, next_runs[job.name], token),
+                                            name=f'job-{job.name}')
+            process.start()
+            self.running[process] = (job, token, time.monotonic() + job.timeout + settings.SCHEDULER_LOCK_GRACE / 2)
+            started.append(process)
+            # Sloturile ratate nu se recuperează (ca în cron)
+            next_runs[job.name] = job.schedule.next_after(timezone.now())
+        return started
+
+    def reap(self):
+        # Strânge copiii terminați și îi oprește pe cei care au depășit termenul; -> secunde până la primul termen
+        for process, (job, token, deadline) in list(self.running.items()):
+            if process.is_alive() and time.monotonic() < deadline:
+                continue
+            if process.is_alive():
+                process.kill()
+                process.join()
+                abandon(job, token)
+            process.join()
+            del self.running[process]
+        deadlines = [deadline for _, _, deadline in self.running.values()]
+        return min(deadlines) - time.monotonic() if deadlines else None
+
+    def run_forever(self):
+        now = timezone.now()
+        next_runs = {job.name: job.schedule.next_after(now) for job in self.jobs}
+        logger.info(f"Scheduler pornit ({self.owner}) cu {len(self.jobs)} job-uri.")
+        while not self.stopping:
+            self.dispatch(next_runs)
+            wait = settings.SCHEDULER_POLL_INTERVAL
+            if self.jobs:
+                wait = min(wait, (min(next_runs.values()) - timezone.now()).total_seconds())
+            until_deadline = self.reap()
+            if until_deadline is not None:
+                wait = min(wait, until_deadline)
+            self._sleep(max(wait, 0))
+        while self.running:
+            time.sleep(min(1.0, max(self.reap() or 0, 0.05)))
+        logger.info(f"Scheduler oprit ({self.owner}).")
+
+    def _sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1.0, deadline - time.monotonic()))
+
+
+def status():
+    # [(job, următoarea rulare, ultima rulare)] pentru run_scheduler --list
+    now = timezone.now()
+    result = []
+    for job in load_jobs():
+        last = JobRun.objects.filter(job=job.name).order_by('-started_at').first()
+        result.append((job, job.schedule.next_after(now), last))
+    return result
@@ -0,0 +1,175 @@
+import re
+import unicodedata
+
+from django.db import connections
+
+# Căutare full-text pentru cărți: titlu, descriere, nume autor, nume editură.
+# SQLite -> tabel virtual FTS5; PostgreSQL -> coloană tsvector cu index GIN.
+# Textul e normalizat în Python (fără diacritice, litere mici) atât la indexare
+# cât și la interogare, deci "Ion Creanga" găsește "Ion Creangă", "sat" găsește "șat" etc.
+
+SQLITE_TABLE = 'aplicatie_book_fts'
+POSTGRES_TABLE = 'aplicatie_book_search'
+
+
+def normalize(text):
+    # ă/â/î/ș/ț (și variantele cu sedilă ş/ţ) -> a/a/i/s/t
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(query):
+    return re.findall(r'\w+', normalize(query))
+
+
+class SqliteBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} "
+                "USING fts5(title, description, author, publisher, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+
+    def remove(self, book_ids):
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        placeholders = ','.join(['%s'] * len(book_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({placeholders})", book_ids)
+
+    def index(self, rows):
+        # rows: (book_id, title, description, author, publisher); rowid-ul FTS este id-ul cărții
+        rows = [(pk, *(normalize(value) for value in values)) for pk, *values in rows]
+        self.remove(row[0] for row in rows)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, title, description, author, publisher) VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def search(self, query, limit):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Fiecare cuvânt ca prefix ("crea"*), toate obligatorii; bm25 cu pondere mare pe titlu
+        match = ' '.join(f'"{term}"*' for term in terms)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+                f"ORDER BY bm25({SQLITE_TABLE}, 10.0, 1.0, 5.0, 2.0) LIMIT %s",
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+                "book_id bigint PRIMARY KEY REFERENCES aplicatie_book(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_idx ON {POSTGRES_TABLE} USING GIN (document)"
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+    def remove(self, book_ids):
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE book_id = ANY(%s)", [book_ids])
+
+    def index(self, rows):
+        rows = [(pk, *(normalize(value) for value in values)) for pk, *values in rows]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (book_id, document) VALUES (%s, "
+                "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'C') || "
+                "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C')) "
+                "ON CONFLICT (book_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def search(self, query, limit):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT book_id FROM {POSTGRES_TABLE}, to_tsquery('simple', %s) query "
+                "WHERE document @@ query ORDER BY ts_rank(document, query) DESC, book_id LIMIT %s",
+                [tsquery, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SqliteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend(connection=None):
+    # None pentru baze de date fără suport -> apelantul folosește icontains
+    connection = connection or connections['default']
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class(connection) if backend_class else None
+
+
+def book_rows(queryset):
+    return queryset.values_list('pk', 'title', 'description', 'author__name', 'publisher__name')
+
+
+def index_books(book_ids=None, batch_size=2000):
+    # Reindexează cărțile date (sau tot catalogul) în loturi
+    from .models import Book
+    backend = get_backend()
+    if backend is None:
+        return 0
+    queryset = Book.objects.order_by('pk')
+    if book_ids is not None:
+        queryset = queryset.filter(pk__in=list(book_ids))
+    count = 0
+    batch = []
+    for row in book_rows(queryset).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        backend.index(batch)
+        count += len(batch)
+    return count
+
+
+def remove_books(book_ids):
+    backend = get_backend()
+    if backend is not None:
+        backend.remove(book_ids)
+
+
+def search_ids(query, limit):
+    # Id-urile cărților ordonate după relevanță, sau None dacă nu există index
+    backend = get_backend()
+    if backend is None:
+        return None
+    return backend.search(query, limit)
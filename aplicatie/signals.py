@@ -0,0 +1,127 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import search, catalog_cache, metrics
+from .models import Book, Author, Publisher, Category, Promotii, Order
+
+
+# Indexul de căutare se actualizează la fiecare modificare a cărții sau a numelui autorului/editurii
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_books([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    search.remove_books([instance.pk])
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Publisher)
+def reindex_related_books(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        search.index_books(instance.books.values_list('pk', flat=True))
+
+
+# Invalidarea cache-ului de catalog (catalog_cache.py): incrementăm versiunile
+# paginilor afectate de modificare și generația listei de cărți.
+@receiver(pre_save, sender=Book)
+def remember_book_relations(sender, instance, raw=False, **kwargs):
+    # Autorul/editura de dinainte, ca să invalidăm și paginile lor dacă s-au schimbat
+    instance._previous_relations = None
+    if instance.pk and not raw:
+        instance._previous_relations = Book.objects.filter(pk=instance.pk).values('author_id', 'publisher_id').first()
+
+
+@receiver(pre_delete, sender=Book)
+def remember_book_categories(sender, instance, **kwargs):
+    # După ștergere legăturile M2M nu mai există, deci le reținem înainte
+    instance._previous_categories = list(instance.categories.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book(sender, instance, created=False, **kwargs):
+    previous = getattr(instance, '_previous_relations', None) or {}
+    catalog_cache.bump(catalog_cache.CATALOG)
+    catalog_cache.bump('book', instance.pk)
+    catalog_cache.bump('author', instance.author_id, previous.get('author_id'))
+    catalog_cache.bump('publisher', instance.publisher_id, previous.get('publisher_id'))
+    categories = getattr(instance, '_previous_categories', None)
+    if categories is None and not created:
+        categories = instance.categories.values_list('pk', flat=True)
+    catalog_cache.bump('category', *(categories or ()))
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_author(sender, instance, **kwargs):
+    catalog_cache.bump(catalog_cache.CATALOG)
+    catalog_cache.bump('author', instance.pk)
+    catalog_cache.bump('book', *instance.books.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+def invalidate_publisher(sender, instance, **kwargs):
+    catalog_cache.bump(catalog_cache.CATALOG)
+    catalog_cache.bump('publisher', instance.pk)
+    catalog_cache.bump('book', *instance.books.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    catalog_cache.bump(catalog_cache.CATALOG)
+    catalog_cache.bump('category', instance.pk)
+
+
+def _changed_m2m_pks(action, pk_set, related):
+    # pre_clear: legăturile încă există; post_add/post_remove: pk_set conține obiectele afectate
+    if action == 'pre_clear':
+        return list(related.values_list('pk', flat=True))
+    if action in ('post_add', 'post_remove'):
+        return list(pk_set or ())
+    return None
+
+
+@receiver(m2m_changed, sender=Book.categories.through)
+def invalidate_book_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    related = instance.books if reverse else instance.categories
+    pks = _changed_m2m_pks(action, pk_set, related)
+    if pks is None:
+        return
+    catalog_cache.bump(catalog_cache.CATALOG)
+    if reverse:  # category.books.add(...)
+        catalog_cache.bump('category', instance.pk)
+        catalog_cache.bump('book', *pks)
+    else:  # book.categories.add(...)
+        catalog_cache.bump('book', instance.pk)
+        catalog_cache.bump('category', *pks)
+
+
+@receiver(pre_delete, sender=Promotii)
+@receiver(post_save, sender=Promotii)
+def invalidate_promotion(sender, instance, **kwargs):
+    # Promoțiile active apar pe paginile categoriilor lor
+    catalog_cache.bump('category', *instance.categories.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Promotii.categories.through)
+def invalidate_promotion_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    related = instance.promotii if reverse else instance.categories
+    pks = _changed_m2m_pks(action, pk_set, related)
+    if pks is None:
+        return
+    if reverse:
+        catalog_cache.bump('category', instance.pk)
+    else:
+        catalog_cache.bump('category', *pks)
+
+
+# Metrici (metrics.py): comenzile noi, pe status
+@receiver(post_save, sender=Order)
+def count_order(sender, instance, created, **kwargs):
+    if created:
+        metrics.ORDERS_CREATED.inc(status=instance.status)
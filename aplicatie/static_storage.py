@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:  # opțional: fără el se scriu doar variantele .gz
+    brotli = None
+
+# Fișiere statice pentru un singur nod, fără server web separat (STATIC_ASSETS = 'compressed'):
+#  - la collectstatic: fiecare fișier primește un nume cu hash (al sursei) și intră în manifest,
+#    imaginile PNG/JPEG se optimizează (deterministic, deci hash-ul sursei rămâne o versiune validă),
+#    iar fișierele text primesc variante .br (dacă e instalat brotli) și .gz;
+#  - la servire (middleware.StaticAssetMiddleware): fișierele cu hash au Cache-Control immutable,
+#    toate au ETag și se trimite varianta precomprimată acceptată de client.
+
+COMPRESSIBLE = {'.css', '.js', '.map', '.svg', '.html', '.txt', '.json', '.xml', '.ico', '.ttf', '.otf', '.eot'}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))  # în ordinea preferinței
+
+
+def optimize_image(path):
+    # Recomprimare fără pierderi pentru PNG, JPEG progresiv cu STATIC_JPEG_QUALITY; păstrăm doar dacă e mai mic
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'rb') as f:
+        original = f.read()
+    try:
+        image = Image.open(BytesIO(original))
+        out = BytesIO()
+        if ext == '.png':
+            image.save(out, 'PNG', optimize=True)
+        else:
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(out, 'JPEG', quality=settings.STATIC_JPEG_QUALITY, optimize=True, progressive=True)
+    except OSError:
+        return 0
+    if out.tell() >= len(original):
+        return 0
+    with open(path, 'wb') as f:
+        f.write(out.getvalue())
+    return len(original) - out.tell()
+
+
+def compress_file(path):
+    # Scrie <fișier>.br / <fișier>.gz dacă reduc dimensiunea cu cel puțin 5%; -> extensiile scrise
+    with open(path, 'rb') as f:
+        data = f.read()
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ('.br', brotli.compress(data, quality=11)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            written.append(suffix)
+    return written
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+        done = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            yield name, hashed_name, processed
+            if isinstance(processed, Exception):
+                continue
+            ext = os.path.splitext(name)[1].lower()
+            if ext in ('.png', '.jpg', '.jpeg'):
+                # Copia fără hash e deja optimizată dacă diferă de sursă (collectstatic n-a recopiat-o);
+                # cea cu hash doar dacă a fost scrisă acum. Altfel JPEG-ul s-ar recomprima la fiecare rulare.
+                source_storage, source_path = paths[name]
+                if self.size(name) == source_storage.size(source_path):
+                    optimize_image(self.path(name))
+                if processed and hashed_name:
+                    optimize_image(self.path(hashed_name))
+            elif ext in COMPRESSIBLE:
+                for target in (name, hashed_name):
+                    if target and target not in done:
+                        done.add(target)
+                        compress_file(self.path(target))
+
+
+# --- servire ---
+
+_hashed_names = {'root': None, 'names': frozenset()}
+
+
+def hashed_names():
+    # Numele cu hash din manifestul lui collectstatic (imutabile: conținutul nou primește alt nume)
+    root = str(settings.STATIC_ROOT)
+    if _hashed_names['root'] != root:
+        names = frozenset()
+        try:
+            with open(os.path.join(root, 'staticfiles.json'), encoding='utf-8') as f:
+                names = frozenset(json.load(f).get('paths', {}).values())
+        except (OSError, ValueError):
+            pass
+        _hashed_names.update(root=root, names=names)
+    return _hashed_names['names']
+
+
+def resolve(url_path):
+    # '/static/css/x.css' -> (cale relativă, cale absolută) sau None
+    prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+    if not url_path.startswith(prefix):
+        return None
+    relative = posixpath.normpath(url_path[len(prefix):]).lstrip('/')
+    if not relative or relative.startswith('..') or relative.endswith(('.br', '.gz')):
+        return None
+    try:
+        full = safe_join(str(settings.STATIC_ROOT), relative)
+    except SuspiciousFileOperation:
+        return None
+    return (relative, full) if os.path.isfile(full) else None
+
+
+def etag(stat, encoding=None):
+    # Varianta comprimată are alți octeți, deci alt ETag
+    digest = hashlib.md5(f'{stat.st_size}-{stat.st_mtime_ns}'.encode()).hexdigest()[:16]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def choose_encoding(full_path, accept_encoding):
+    # -> (cale de servit, Content-Encoding sau None)
+    accepted = {part.split(';')[0].strip() for part in accept_encoding.lower().split(',')}
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(full_path + suffix):
+            return full_path + suffix, encoding
+    return full_path, None
+
+
+def content_type(relative):
+    guessed, _ = mimetypes.guess_type(relative)
+    if guessed and (guessed.startswith('text/') or guessed in ('application/javascript', 'image/svg+xml', 'application/json')):
+        return f'{guessed}; charset=utf-8'
+    return guessed or 'application/octet-stream'
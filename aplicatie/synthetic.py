@@ -0,0 +1,278 @@
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import catalog_cache, search
+from .models import Author, Book, Category, CustomUser, Order, Publisher, Review, Vizualizari
+
+# Date sintetice pentru teste de încărcare (comanda generate_data), deterministe pentru o sămânță dată:
+#  - volumele pornesc de la numărul de cărți (plan()), fiecare poate fi dat explicit;
+#  - popularitatea e distribuită Zipf: câțiva autori/edituri au multe cărți, câteva categorii adună
+#    majoritatea cărților, iar comenzile, recenziile și vizualizările se concentrează pe titlurile "hit";
+#  - datele calendaristice sunt relative la începutul zilei curente, cu mai multă activitate recentă;
+#  - inserarea e în masă (bulk_create pe bucăți, legăturile M2M direct în tabel, ca în catalog_io),
+#    deci fără semnale: indexul de căutare și versiunile din catalog_cache se actualizează la final.
+
+PASSWORD = 'Parola-sintetica-1'  # aceeași pentru toți utilizatorii generați (un singur hash)
+STAFF_USERNAME = 'sintetic_staff'
+USERNAME_PREFIX = 'cititor'
+ZIPF_EXPONENT = 1.1
+
+FIRST_NAMES = ('Ana', 'Maria', 'Elena', 'Ioana', 'Andreea', 'Mihai', 'Andrei', 'Alexandru', 'Ion', 'Radu',
+               'Cristina', 'Vlad', 'Gabriel', 'Irina', 'Sorin', 'Diana', 'Matei', 'Teodora', 'Paul', 'Ilinca')
+LAST_NAMES = ('Popescu', 'Ionescu', 'Popa', 'Stan', 'Dumitru', 'Stoica', 'Gheorghe', 'Matei', 'Ciobanu', 'Rusu',
+              'Munteanu', 'Constantin', 'Marin', 'Tudor', 'Florea', 'Barbu', 'Nistor', 'Dobre', 'Lazăr', 'Moldovan')
+CITIES = ('București', 'Cluj-Napoca', 'Iași', 'Timișoara', 'Brașov', 'Constanța', 'Craiova', 'Sibiu', 'Oradea', 'Galați')
+GENRES = ('Roman', 'Poezie', 'Istorie', 'Science fiction', 'Fantasy', 'Biografie', 'Filozofie', 'Thriller', 'Teatru',
+          'Eseu', 'Memorialistică', 'Psihologie', 'Economie', 'Artă', 'Călătorii', 'Copii', 'Știință', 'Polițist',
+          'Umor', 'Religie', 'Gastronomie', 'Sport', 'Muzică', 'Tehnologie', 'Drept', 'Medicină', 'Politică',
+          'Aventură', 'Horror', 'Romance')
+TITLE_NOUNS = ('umbra', 'casa', 'drumul', 'orașul', 'grădina', 'marea', 'noaptea', 'cartea', 'pădurea', 'fereastra',
+               'scrisoarea', 'insula', 'muntele', 'vremea', 'tăcerea', 'memoria', 'lumina', 'harta', 'trenul', 'podul')
+TITLE_ADJECTIVES = ('pierdută', 'uitată', 'tainică', 'albastră', 'veche', 'nouă', 'ultimă', 'dintâi', 'rece', 'caldă',
+                    'îndepărtată', 'ascunsă', 'liniștită', 'sălbatică', 'fragilă', 'luminoasă', 'întunecată', 'strâmtă')
+REVIEW_TEXTS = ('O lectură captivantă, recomand.', 'Bună, dar finalul m-a dezamăgit.', 'Nu am reușit să o termin.',
+                'Personaje memorabile și un stil curat.', 'Se citește dintr-o suflare.', 'Prea lungă pentru subiect.',
+                'Traducere excelentă.', 'O recitesc cu plăcere.', 'Medie, nimic deosebit.', 'Cea mai bună carte a anului.')
+RATINGS = ((1, 2, 3, 4, 5), (5, 8, 17, 35, 35))  # recenziile sunt mai degrabă pozitive
+ORDER_STATUSES = (('SHIPPED', 'PENDING', 'CANCELED'), (70, 20, 10))
+ORDER_QUANTITIES = ((1, 2, 3, 5), (75, 17, 6, 2))
+READING_FREQUENCIES = (('daily', 'weekly', 'monthly', 'rarely'), (15, 40, 30, 15))
+VIEWS_PER_FREQUENCY = {'daily': 1.0, 'weekly': 0.7, 'monthly': 0.4, 'rarely': 0.15}  # fracțiune din VIZUALIZARI_MAX
+
+
+def plan(books, **overrides):
+    # Volumele implicite pentru un catalog de `books` cărți; valorile None din overrides sunt ignorate
+    counts = {
+        'books': books,
+        'authors': max(1, books // 8),
+        'publishers': max(1, books // 100),
+        'categories': max(3, min(len(GENRES), books // 100)),
+        'users': max(1, books // 5),
+        'orders': books * 2,
+        'reviews': books,
+    }
+    counts.update({name: value for name, value in overrides.items() if value is not None})
+    return counts
+
+
+def zipf_cum_weights(n, exponent=ZIPF_EXPONENT):
+    # Ponderi cumulate 1/rang^s pentru rng.choices (rangul 1 e cel mai popular)
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+class Popularity:
+    # Alegeri ponderate Zipf dintr-o listă de id-uri; cele populare sunt amestecate, nu primele id-uri
+    def __init__(self, rng, ids):
+        self.rng = rng
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self.cum_weights = zipf_cum_weights(len(self.ids))
+
+    def pick(self, k=1):
+        return self.rng.choices(self.ids, cum_weights=self.cum_weights, k=k)
+
+    def distinct(self, k):
+        # k id-uri diferite (sau toate, dacă sunt mai puține)
+        k = min(k, len(self.ids))
+        chosen = dict.fromkeys(self.pick(k))
+        while len(chosen) < k:
+            chosen.update(dict.fromkeys(self.pick(k - len(chosen))))
+        return list(chosen)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    # auto_now_add ar suprascrie datele generate; îl oprim doar pe durata inserării
+    fields = [field for model in models for field in model._meta.concrete_fields if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class Generator:
+    def __init__(self, counts, seed=0, chunk_size=None, progress=None):
+        self.counts = counts
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size or settings.CATALOG_IMPORT_CHUNK_SIZE
+        self.progress = progress
+        self.now = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.result = dict.fromkeys(('authors', 'publishers', 'categories', 'books', 'book_categories', 'users',
+                                     'orders', 'reviews', 'views'), 0)
+
+    def recent(self, days, skew=2.0):
+        # Un moment din ultimele `days` zile, mai des aproape de prezent (skew > 1)
+        return self.now - timedelta(seconds=days * 86400 * self.rng.random() ** skew)
+
+    def run(self):
+        # -> numărul de rânduri pe tabel + 'seconds' și 'rows_per_second'
+        started = time.perf_counter()
+        with explicit_timestamps(Book, Review, Order):
+            authors = self.authors()
+            publishers = self.publishers()
+            categories = self.categories()
+            books = self.books(authors, publishers, categories)
+            users = self.users()
+            self.orders(books)
+            self.reviews(books)
+            self.views(books, users)
+        search.index_books()
+        catalog_cache.bump(catalog_cache.CATALOG)
+        self.result['seconds'] = time.perf_counter() - started
+        self.result['rows_per_second'] = sum(
+            value for name, value in self.result.items() if name != 'seconds') / (self.result['seconds'] or 1)
+        return self.result
+
+    def insert(self, name, objects):
+        # bulk_create pe bucăți, câte o tranzacție pe bucată; -> id-urile create, în ordine
+        pks = []
+        for chunk in _chunks(objects, self.chunk_size):
+            with transaction.atomic():
+                pks += [obj.pk for obj in type(chunk[0]).objects.bulk_create(chunk)]
+            self.result[name] += len(chunk)
+            if self.progress:
+                self.progress(name, self.result[name], self.counts.get(name))
+        return pks
+
+    def authors(self):
+        rng = self.rng
+        return self.insert('authors', (
+            Author(name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}',
+                   birth_date=date(1900, 1, 1) + timedelta(days=rng.randrange(100 * 365)))
+            for i in range(self.counts['authors'])
+        ))
+
+    def publishers(self):
+        rng = self.rng
+        return self.insert('publishers', (
+            Publisher(name=f'Editura {rng.choice(LAST_NAMES)} {i}', address=rng.choice(CITIES),
+                      website=f'https://editura{i}.example.com')
+            for i in range(self.counts['publishers'])
+        ))
+
+    def categories(self):
+        names = [GENRES[i] if i < len(GENRES) else f'{GENRES[i % len(GENRES)]} {i // len(GENRES)}'
+                 for i in range(self.counts['categories'])]
+        return self.insert('categories', (Category(name=name, description=f'Cărți din genul {name.lower()}')
+                                           for name in names))
+
+    def books(self, authors, publishers, categories):
+        rng = self.rng
+        authors, publishers = Popularity(rng, authors), Popularity(rng, publishers)
+        categories = Popularity(rng, categories)
+        genre_names = dict(Category.objects.filter(pk__in=categories.ids).values_list('pk', 'name'))
+        through = Book.categories.through
+        quote = connection.ops.quote_name
+        insert_links = (f'INSERT INTO {quote(through._meta.db_table)} ({quote("book_id")}, {quote("category_id")}) '
+                        f'VALUES (%s, %s)')
+        pks = []
+        for start in range(0, self.counts['books'], self.chunk_size):
+            size = min(self.chunk_size, self.counts['books'] - start)
+            rows = []
+            for i in range(start, start + size):
+                # 1-3 categorii, cele populare mai des; prima dă și tema descrierii
+                book_categories = categories.distinct(1 + (rng.random() < 0.4) + (rng.random() < 0.1))
+                title = f'{rng.choice(TITLE_NOUNS).capitalize()} {rng.choice(TITLE_ADJECTIVES)}'
+                rows.append((Book(
+                    title=f'{title} {i}' if rng.random() < 0.5 else title,
+                    description=f'Un volum de {genre_names[book_categories[0]].lower()} despre '
+                                f'{rng.choice(TITLE_NOUNS)} și {rng.choice(TITLE_NOUNS)}.',
+                    # prețuri log-normale în jurul a ~40 lei, stoc zero pentru ~15% din titluri
+                    price=Decimal(min(max(rng.lognormvariate(3.7, 0.5), 5), 999)).quantize(Decimal('0.01')),
+                    publication_date=date(1950, 1, 1) + timedelta(days=int(rng.triangular(0, 75, 70) * 365)),
+                    stock=0 if rng.random() < 0.15 else 1 + int(rng.expovariate(1 / 20)),
+                    created_at=self.recent(730),
+                    author_id=authors.pick()[0],
+                    publisher_id=publishers.pick()[0],
+                ), book_categories))
+            with transaction.atomic():
+                Book.objects.bulk_create([book for book, _ in rows])
+                links = [(book.pk, category_id) for book, ids in rows for category_id in ids]
+                with connection.cursor() as cursor:
+                    cursor.executemany(insert_links, links)
+            pks += [book.pk for book, _ in rows]
+            self.result['books'] += size
+            self.result['book_categories'] += len(links)
+            if self.progress:
+                self.progress('books', self.result['books'], self.counts['books'])
+        return pks
+
+    def users(self):
+        rng = self.rng
+        password = make_password(PASSWORD)  # hash-ul costă: o dată pentru toți
+        first = (CustomUser.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+
+        def user(n, **extra):
+            fields = dict(
+                username=f'{USERNAME_PREFIX}{n}', password=password, email=f'{USERNAME_PREFIX}{n}@example.com',
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES), favorite_genre=rng.choice(GENRES),
+                birth_date=date(1950, 1, 1) + timedelta(days=rng.randrange(55 * 365)),
+                phone_number=f'07{rng.randrange(10 ** 8):08d}', address=f'Str. {rng.choice(LAST_NAMES)} {n}, {rng.choice(CITIES)}',
+                reading_frequency=rng.choices(*READING_FREQUENCIES)[0],
+                email_confirmat=rng.random() < 0.9, date_joined=self.recent(1095),
+            )
+            return CustomUser(**{**fields, **extra})
+
+        users = (user(first + i) for i in range(self.counts['users']))
+        staff = () if CustomUser.objects.filter(username=STAFF_USERNAME).exists() else (
+            user(first + self.counts['users'], username=STAFF_USERNAME, is_staff=True, email_confirmat=True),)
+        self.insert('users', itertools.chain(users, staff))
+        return list(CustomUser.objects.filter(pk__gte=first).values_list('pk', 'reading_frequency'))
+
+    def orders(self, books):
+        rng = self.rng
+        popular = Popularity(rng, books)
+
+        def order(book_id):
+            created = self.recent(365, skew=3.0)
+            return Order(book_id=book_id, quantity=rng.choices(*ORDER_QUANTITIES)[0],
+                         status=rng.choices(*ORDER_STATUSES)[0], order_date=created, created_at=created)
+
+        self.insert('orders', (order(book_id) for book_id in popular.pick(self.counts['orders'])))
+
+    def reviews(self, books):
+        rng = self.rng
+        popular = Popularity(rng, books)
+
+        def review(book_id):
+            created = self.recent(730)
+            return Review(book_id=book_id, text=rng.choice(REVIEW_TEXTS), rating=rng.choices(*RATINGS)[0],
+                          date=created, created_at=created)
+
+        self.insert('reviews', (review(book_id) for book_id in popular.pick(self.counts['reviews'])))
+
+    def views(self, books, users):
+        # Sloturile din Vizualizari (vezi recent_views.py): cititorii frecvenți au toate sloturile ocupate
+        rng = self.rng
+        popular = Popularity(rng, books)
+        limit = settings.VIZUALIZARI_MAX
+
+        def user_views(user_id, frequency):
+            count = round(limit * VIEWS_PER_FREQUENCY[frequency] * rng.uniform(0.5, 1))
+            for slot, book_id in enumerate(popular.distinct(count)):
+                yield Vizualizari(user_id=user_id, book_id=book_id, slot=slot, date_viewed=self.recent(30))
+
+        self.insert('views', (view for user_id, frequency in users for view in user_views(user_id, frequency)))
+
+
+def generate(counts, seed=0, chunk_size=None, progress=None):
+    return Generator(counts, seed, chunk_size, progress).run()
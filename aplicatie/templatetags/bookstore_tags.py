@@ -0,0 +1,16 @@
+from django import template
+
+from aplicatie import recent_views, view_events
+
+register = template.Library()
+
+
+@register.inclusion_tag('aplicatie/recently_viewed.html', takes_context=True)
+def recently_viewed(context, exclude=None, limit=5):
+    # Widget "Văzute recent" pentru utilizatorul autentificat
+    user = context.get('user')
+    books = []
+    if user is not None and user.is_authenticated:
+        pending = view_events.buffer.pending_for(user.pk)
+        books = recent_views.recent_books(user, exclude=exclude, limit=limit, pending=pending)
+    return {'books': books}
@@ -1,3 +1,1519 @@
-from django.test import TestCase
+import gzip
+import logging
+import json
+import os
+import re
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bookstore import urls as bookstore_urls
+from . import urls, views, async_views, catalog_io, synthetic, benchmark, orders, search, facets, recent_views, view_events, promotions, catalog_cache, log_query, profiling, metrics, reports, purge, newsletter, scheduler, contact_store
+from .routers import CatalogReplicaRouter
+from .middleware import ProfilingMiddleware
+from .jurnalizare import QueueLogHandler, SamplingFilter, JsonFormatter
+from .forms import BookFilterForm
+from .models import Author, Publisher, Category, Book, CustomUser, Vizualizari, Promotii, TrimiterePromotie, Order, RaportZilnic, PunctControl, JurnalNewsletter, JobLock, JobRun
+
+
+def creeaza_carti(numar, author=None, publisher=None, category=None):
+    # Date minime pentru catalog; fiecare carte are autor, editură și o categorie
+    author = author or Author.objects.create(name="Mihai Eminescu")
+    publisher = publisher or Publisher.objects.create(name="Humanitas")
+    category = category or Category.objects.create(name="Poezie")
+    books = []
+    for i in range(numar):
+        book = Book.objects.create(
+            title=f"Carte {i}",
+            price=Decimal('10.00') + i,
+            stock=i % 3,
+            author=Author.objects.create(name=f"Autor {i}") if i % 2 else author,
+            publisher=Publisher.objects.create(name=f"Editura {i}") if i % 2 else publisher,
+        )
+        book.categories.add(category)
+        books.append(book)
+    return books
+
+
+class BookListQueryCountTests(TestCase):
+    def numar_interogari(self, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('book_list'), headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_numar_constant_de_interogari(self):
+        # O singură carte vs. o pagină plină: numărul de interogări nu depinde de rânduri
+        creeaza_carti(1)
+        o_carte = self.numar_interogari()
+        creeaza_carti(9)
+        pagina_plina = self.numar_interogari()
+        self.assertEqual(o_carte, pagina_plina)
+
+    def test_numar_constant_de_interogari_ajax(self):
+        creeaza_carti(1)
+        o_carte = self.numar_interogari(x_requested_with='XMLHttpRequest')
+        creeaza_carti(9)
+        pagina_plina = self.numar_interogari(x_requested_with='XMLHttpRequest')
+        self.assertEqual(o_carte, pagina_plina)
+
+    def test_detaliu_carte_fara_interogari_pe_relatii(self):
+        book = creeaza_carti(1)[0]
+        with self.assertNumQueries(2):  # cartea cu autor/editură + categoriile
+            response = self.client.get(reverse('book_detail', kwargs={'pk': book.pk}))
+        self.assertContains(response, book.author.name)
+
+
+class BookListCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.books = creeaza_carti(25)
+
+    def get_json(self, **params):
+        response = self.client.get(reverse('book_list'), params, headers={'x-requested-with': 'XMLHttpRequest'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def titluri(self, data):
+        return re.findall(r'>(Carte \d+)</a>', data['books_html'])
+
+    def test_parcurgere_inainte_si_inapoi(self):
+        pagini = []
+        data = self.get_json(ordonare='pret')
+        self.assertIsNone(data['prev'])
+        while True:
+            pagini.append(self.titluri(data))
+            if not data['next']:
+                break
+            data = self.get_json(ordonare='pret', cursor=data['next'])
+        vazute = [titlu for pagina in pagini for titlu in pagina]
+        self.assertEqual(vazute, [f"Carte {i}" for i in range(25)])
+        self.assertEqual([len(p) for p in pagini], [10, 10, 5])
+
+        # Înapoi de pe ultima pagină revine exact pe pagina a doua
+        inapoi = self.get_json(ordonare='pret', cursor=data['prev'])
+        self.assertEqual(self.titluri(inapoi), pagini[1])
+        self.assertIsNotNone(inapoi['next'])
+
+    def test_cursor_invalid_inseamna_prima_pagina(self):
+        data = self.get_json(cursor='nu-e-un-cursor')
+        self.assertEqual(len(self.titluri(data)), 10)
+        self.assertIsNone(data['prev'])
+
+    def test_total_din_cache(self):
+        self.assertIsNone(self.get_json()['total'])
+        self.assertEqual(self.get_json(total='on')['total'], 25)
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.books = creeaza_carti(3)
+
+    def stats(self, region):
+        return catalog_cache.stats().get(region, {'hits': 0, 'misses': 0})
+
+    def test_lista_din_cache_fara_interogari(self):
+        url = reverse('book_list')
+        before = self.stats('book_list')
+        self.client.get(url)
+        with self.assertNumQueries(0):  # utilizator anonim, fragmentul e deja în cache
+            response = self.client.get(url)
+        self.assertContains(response, "Carte 2")
+        after = self.stats('book_list')
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_salvarea_cartii_invalideaza_lista_si_detaliul(self):
+        book = self.books[0]
+        self.client.get(reverse('book_list'))
+        self.client.get(reverse('book_detail', kwargs={'pk': book.pk}))
+        book.title = "Titlu nou"
+        book.save()
+        self.assertContains(self.client.get(reverse('book_list')), "Titlu nou")
+        self.assertContains(self.client.get(reverse('book_detail', kwargs={'pk': book.pk})), "Titlu nou")
+
+    def test_redenumirea_autorului_invalideaza_detaliul_cartii(self):
+        book = self.books[0]
+        url = reverse('book_detail', kwargs={'pk': book.pk})
+        self.client.get(url)
+        book.author.name = "Ion Creangă"
+        book.author.save()
+        self.assertContains(self.client.get(url), "Ion Creangă")
+
+    def test_versiunile_sunt_comune_workerilor(self):
+        # Alt proces (alt obiect cache, aceeași configurație) vede versiunea schimbată de semnal aici
+        book = self.books[0]
+        version = catalog_cache.get_version('book', book.pk)
+        other = caches.create_connection(settings.CATALOG_VERSION_CACHE_ALIAS)
+        self.assertEqual(other.get(f'ver:book:{book.pk}'), version)
+        book.save()
+        self.assertNotEqual(other.get(f'ver:book:{book.pk}'), version)
+
+    def test_detaliu_categorie_si_statistici(self):
+        category = self.books[0].categories.get()
+        url = reverse('category_detail', kwargs={'pk': category.pk})
+        self.assertContains(self.client.get(url), "Carte 1")
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        staff = CustomUser.objects.create_user('staff', 'staff@example.com', 'parola-test', is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get(reverse('cache_stats')).json()
+        self.assertGreaterEqual(data['category_detail']['hits'], 1)
+
+
+class BookSearchTests(TestCase):
+    def setUp(self):
+        self.creanga = Author.objects.create(name="Ion Creangă")
+        self.eliade = Author.objects.create(name="Mircea Eliade")
+        publisher = Publisher.objects.create(name="Humanitas")
+        self.amintiri = Book.objects.create(
+            title="Amintiri din copilărie", description="Povestiri din satul Humulești",
+            price=Decimal('25.00'), author=self.creanga, publisher=publisher,
+        )
+        self.maitreyi = Book.objects.create(
+            title="Maitreyi", description="Roman despre India și dragoste",
+            price=Decimal('30.00'), author=self.eliade, publisher=publisher,
+        )
+
+    def test_cautare_fara_diacritice_si_pe_prefix(self):
+        self.assertEqual(search.search_ids("creanga", 10), [self.amintiri.pk])
+        self.assertEqual(search.search_ids("copilarie", 10), [self.amintiri.pk])
+        self.assertEqual(search.search_ids("HUMULEȘTI", 10), [self.amintiri.pk])
+        self.assertEqual(search.search_ids("mirc eli", 10), [self.maitreyi.pk])
+        self.assertEqual(sorted(search.search_ids("humanitas", 10)), sorted([self.amintiri.pk, self.maitreyi.pk]))
+
+    def test_indexul_urmeaza_modificarile(self):
+        self.eliade.name = "Mircea Eliade Ionescu"
+        self.eliade.save()
+        self.assertEqual(search.search_ids("ionescu", 10), [self.maitreyi.pk])
+        self.maitreyi.delete()
+        self.assertEqual(search.search_ids("maitreyi", 10), [])
+
+    def test_titlul_are_prioritate(self):
+        Book.objects.create(
+            title="India", description="Maitreyi apare doar în descriere",
+            price=Decimal('12.00'), author=self.eliade, publisher=self.amintiri.publisher,
+        )
+        self.assertEqual(search.search_ids("maitreyi", 10)[0], self.maitreyi.pk)
+
+    def test_parametrul_q_in_lista(self):
+        response = self.client.get(reverse('book_list'), {'q': 'amintiri'})
+        self.assertContains(response, "Amintiri din copilărie")
+        self.assertNotContains(response, "Maitreyi</a>")
+
+    def test_cautarea_din_admin_nu_e_trunchiata(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', 'admin@example.com', 'parola-test'))
+        url = reverse('admin:aplicatie_book_changelist')
+        # Sub limită: indexul full-text (fără diacritice, ceea ce LIKE nu găsește)
+        self.assertEqual(self.client.get(url, {'q': 'creanga'}).context['cl'].result_count, 1)
+        # Limita atinsă: căutarea implicită, cu toate rezultatele
+        with override_settings(SEARCH_MAX_RESULTS=1):
+            self.assertEqual(self.client.get(url, {'q': 'humanitas'}).context['cl'].result_count, 2)
+
+
+class BookFacetTests(TestCase):
+    def setUp(self):
+        self.eminescu = Author.objects.create(name="Mihai Eminescu")
+        self.creanga = Author.objects.create(name="Ion Creangă")
+        self.humanitas = Publisher.objects.create(name="Humanitas")
+        self.poezie = Category.objects.create(name="Poezie")
+        self.proza = Category.objects.create(name="Proză")
+        for title, author, price, stock, category in [
+            ("Luceafărul", self.eminescu, '20.00', 3, self.poezie),
+            ("Poezii", self.eminescu, '45.00', 0, self.poezie),
+            ("Amintiri din copilărie", self.creanga, '25.00', 1, self.proza),
+        ]:
+            book = Book.objects.create(title=title, author=author, publisher=self.humanitas, price=Decimal(price), stock=stock)
+            book.categories.add(category)
+
+    def get_facets(self, **params):
+        response = self.client.get(reverse('book_list'), params, headers={'x-requested-with': 'XMLHttpRequest'})
+        return response.json()['facets']
+
+    def test_fatete_pentru_tot_catalogul(self):
+        with self.assertNumQueries(4):
+            result = facets.compute_facets({})
+        self.assertEqual(result['author'], {self.eminescu.pk: 2, self.creanga.pk: 1})
+        self.assertEqual(result['category'], {self.poezie.pk: 2, self.proza.pk: 1})
+        self.assertEqual(result['stock'], {'disponibil': 2, 'epuizat': 1})
+        self.assertEqual([b['count'] for b in result['price']], [2, 1, 0, 0])
+
+    def test_fateta_ignora_propriul_filtru(self):
+        result = self.get_facets(author=self.creanga.pk)
+        # Ceilalți autori rămân vizibili, dar categoriile și prețul respectă filtrul pe autor
+        self.assertEqual(result['author'], {str(self.eminescu.pk): 2, str(self.creanga.pk): 1})
+        self.assertEqual(result['category'], {str(self.proza.pk): 1})
+        self.assertEqual(result['stock'], {'disponibil': 1, 'epuizat': 0})
+
+    def test_optiunile_fara_rezultate_sunt_ascunse(self):
+        response = self.client.get(reverse('book_list'), {'category': self.proza.pk})
+        form = response.context['form']
+        self.assertEqual(list(form.fields['author'].queryset), [self.creanga])
+        self.assertContains(response, "Ion Creangă (1)")
+
+
+@override_settings(PROMOTII_DISPATCH='sync', PROMOTII_BATCH_SIZE=2)
+class PromotionDispatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = CustomUser.objects.create_user('admin', 'admin@example.com', 'parola-test', is_staff=True, email_confirmat=True)
+        self.poezie = Category.objects.create(name="Poezie")
+        self.fictiune = Category.objects.create(name="Ficțiune")
+        poezie_book, fictiune_book = creeaza_carti(2)
+        poezie_book.categories.set([self.poezie])
+        fictiune_book.categories.set([self.fictiune])
+
+        def user(name, confirmed=True, views=()):
+            u = CustomUser.objects.create_user(name, f'{name}@example.com', 'parola-test', first_name=name.title(), email_confirmat=confirmed)
+            for book in views:
+                recent_views.record_view(u.pk, book.pk)
+            return u
+
+        user('ana', views=[poezie_book, fictiune_book])
+        user('dan', views=[fictiune_book])
+        user('ion', confirmed=False, views=[poezie_book])
+        user('eva')
+
+    def test_trimitere_fara_duplicate(self):
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse('promotii'), {
+            'name': 'Toamna', 'discount_percentage': '15', 'description': '',
+            'date_expiry': '2030-01-01', 'categories': [self.poezie.pk, self.fictiune.pk],
+        })
+        self.assertRedirects(response, reverse('promotii'))
+
+        job = TrimiterePromotie.objects.get()
+        self.assertEqual((job.status, job.total, job.sent, job.failed), ('DONE', 2, 2, 0))
+        destinatari = sorted((m.to[0], m.subject) for m in mail.outbox)
+        self.assertEqual(destinatari, [
+            ('ana@example.com', 'Promoție Toamna - Poezie'),
+            ('dan@example.com', 'Promoție Toamna - Ficțiune'),
+        ])
+        html = dict((m.to[0], m.alternatives[0][0]) for m in mail.outbox)
+        self.assertIn('Bună, Ana', html['ana@example.com'])
+        self.assertIn('Bună, Dan', html['dan@example.com'])
+
+        status = self.client.get(reverse('promotion_job_status', kwargs={'pk': job.pk})).json()
+        self.assertEqual((status['status'], status['sent']), ('DONE', 2))
+        self.assertContains(self.client.get(reverse('promotii')), 'Trimiteri recente')
+
+    def test_audienta_ignora_celelalte_categorii_ale_cartii(self):
+        # Cartea e și în "Istorie", necerută de promoție: rândul acela nu schimbă audiența
+        book = creeaza_carti(1)[0]
+        book.categories.set([self.poezie, Category.objects.create(name="Istorie")])
+        u = CustomUser.objects.create_user('ioana', 'ioana@example.com', 'parola-test', email_confirmat=True)
+        recent_views.record_view(u.pk, book.pk)
+        promotion = Promotii.objects.create(name='Toamna', discount_percentage=15, date_expiry=timezone.now() + timedelta(days=30))
+        promotion.categories.set([self.poezie])
+        audience = {user_id: category for user_id, _, category in promotions.resolve_audience(promotion)}
+        self.assertEqual(audience.get(u.pk), 'Poezie')
+        self.assertEqual(sorted(set(audience.values())), ['Poezie'])
+
+    def test_loturile_esuate_nu_sunt_raportate_ca_reusite(self):
+        self.client.force_login(self.staff)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP indisponibil')), \
+                self.assertLogs('django', 'ERROR'):
+            self.client.post(reverse('promotii'), {
+                'name': 'Toamna', 'discount_percentage': '15', 'description': '',
+                'date_expiry': '2030-01-01', 'categories': [self.poezie.pk, self.fictiune.pk],
+            })
+        job = TrimiterePromotie.objects.get()
+        status = self.client.get(reverse('promotion_job_status', kwargs={'pk': job.pk})).json()
+        self.assertEqual((status['status'], status['sent'], status['failed']), ('FAILED', 0, 2))
+        self.assertEqual(status['error'], 'SMTP indisponibil')
+
+    def test_mesajele_din_lot_numarate_separat(self):
+        # Serverul acceptă primul mesaj al lotului și îl refuză pe al doilea
+        stub = SmtpStub(fail_data=10, accept=1)
+        self.addCleanup(stub.stop)
+        self.client.force_login(self.staff)
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                               EMAIL_HOST='127.0.0.1', EMAIL_PORT=stub.server_address[1]), self.assertLogs('django', 'ERROR'):
+            self.client.post(reverse('promotii'), {
+                'name': 'Toamna', 'discount_percentage': '15', 'description': '',
+                'date_expiry': '2030-01-01', 'categories': [self.poezie.pk, self.fictiune.pk],
+            })
+        job = TrimiterePromotie.objects.get()
+        self.assertEqual((job.status, job.sent, job.failed), ('PARTIAL', 1, 1))
+        self.assertEqual(dict(job.jurnal.values_list('email', 'status')), {'ana@example.com': 'SENT', 'dan@example.com': 'FAILED'})
+        self.assertEqual([rcpt for rcpt, _ in stub.messages], [['ana@example.com']])
+
+
+class RecentViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('cititor', 'cititor@example.com', 'parola-test')
+        self.books = creeaza_carti(7)
+
+    def test_pastreaza_ultimele_n_vizualizari(self):
+        for book in self.books:
+            recent_views.record_view(self.user.pk, book.pk)
+        recente = recent_views.recent_book_ids([self.user.pk])[self.user.pk]
+        self.assertEqual(recente, [b.pk for b in reversed(self.books)][:5])
+        self.assertEqual(Vizualizari.objects.filter(user=self.user).count(), 5)
+
+    def test_revizualizarea_nu_dubleaza(self):
+        a, b, c = self.books[:3]
+        for book in (a, b, c, a):
+            recent_views.record_view(self.user.pk, book.pk)
+        self.assertEqual(recent_views.recent_book_ids([self.user.pk])[self.user.pk], [a.pk, c.pk, b.pk])
+
+    def test_slotul_se_alege_din_baza_de_date(self):
+        for book in self.books[:5]:
+            recent_views.record_view(self.user.pk, book.pk)
+        # Alt proces a rescris între timp cel mai vechi slot; flush-ul următor pornește de la rândurile din baza de date
+        Vizualizari.objects.filter(user=self.user, book=self.books[0]).update(
+            book=self.books[5], date_viewed=timezone.now())
+        recent_views.record_view(self.user.pk, self.books[5].pk)
+        self.assertEqual(Vizualizari.objects.filter(user=self.user, book=self.books[5]).count(), 1)
+        recent_views.record_view(self.user.pk, self.books[6].pk)
+        self.assertEqual(
+            recent_views.recent_book_ids([self.user.pk])[self.user.pk],
+            [b.pk for b in reversed(self.books)][:5],
+        )
+        self.assertEqual(Vizualizari.objects.filter(user=self.user).count(), 5)
+
+    @override_settings(VIZUALIZARI_BUFFER='manual')
+    def test_widget_pe_pagina_cartii(self):
+        self.client.force_login(self.user)
+        first, second, third = self.books[:3]
+        self.client.get(reverse('book_detail', kwargs={'pk': first.pk}))
+        view_events.buffer.flush()
+        # A doua vizualizare e încă în buffer, dar apare deja în widget
+        self.client.get(reverse('book_detail', kwargs={'pk': second.pk}))
+        response = self.client.get(reverse('book_detail', kwargs={'pk': third.pk}))
+        self.assertContains(response, "Văzute recent")
+        self.assertContains(response, first.title)
+        self.assertContains(response, second.title)
+        view_events.buffer.flush()
+
+
+@override_settings(VIZUALIZARI_BUFFER='manual', VIZUALIZARI_FLUSH_SIZE=3)
+class ViewEventBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        view_events.buffer.flush()
+        self.user = CustomUser.objects.create_user('cititor', 'cititor@example.com', 'parola-test')
+        self.books = creeaza_carti(7)
+
+    def tearDown(self):
+        view_events.buffer.flush()  # în tranzacția testului, ca să nu rămână nimic pentru atexit
+
+    def test_pagina_de_detaliu_nu_scrie_in_baza_de_date(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('book_detail', kwargs={'pk': self.books[0].pk}))
+        scrieri = [q['sql'] for q in ctx.captured_queries if q['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+        self.assertEqual(scrieri, [])
+        self.assertEqual(view_events.buffer.depth(), 1)
+
+    def test_flush_in_loturi_pastreaza_retentia(self):
+        for book in self.books:
+            view_events.record(self.user.pk, book.pk)
+        before = view_events.metrics()
+        self.assertEqual(before['depth'], 7)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(view_events.buffer.flush(), 7)
+        # rândurile existente (+ blocarea utilizatorilor, unde există) + 2 upsert-uri (7 evenimente -> 5 sloturi, loturi de 3)
+        interogari = [q for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(interogari), 3 + connection.features.has_select_for_update)
+        after = view_events.metrics()
+        self.assertEqual(after['depth'], 0)
+        self.assertEqual(after['flushed_events'] - before['flushed_events'], 7)
+        self.assertEqual(
+            recent_views.recent_book_ids([self.user.pk])[self.user.pk],
+            [b.pk for b in reversed(self.books)][:5],
+        )
+
+    def test_metrici_expuse_la_endpoint(self):
+        def valoare(text, series):
+            match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.MULTILINE)
+            return float(match.group(1)) if match else 0.0
+
+        for book in self.books[:3]:
+            view_events.record(self.user.pk, book.pk)
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE bookstore_vizualizari_buffer_depth gauge', text)
+        self.assertEqual(valoare(text, 'bookstore_vizualizari_buffer_depth'), 3)
+        series = 'bookstore_vizualizari_flush_duration_seconds_count{result="ok"}'
+        before = valoare(text, series)
+        view_events.buffer.flush()
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertEqual(valoare(text, 'bookstore_vizualizari_buffer_depth'), 0)
+        self.assertEqual(valoare(text, series) - before, 1)
+
+
+class QueryPlanTests(TestCase):
+    def test_interogarile_de_baza_folosesc_indexuri(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)  # CommandError la orice full scan
+        self.assertNotIn('FULL SCAN', out.getvalue())
+
+
+class DatabaseProfileTests(TestCase):
+    @skipUnless(connection.vendor == 'sqlite', 'Pragmele se aplică doar pe SQLite')
+    def test_pragme_sqlite_la_conectare(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+
+    def test_router_trimite_catalogul_pe_replica(self):
+        router = CatalogReplicaRouter()
+        self.assertIsNone(router.db_for_read(Book))  # fără replică configurată
+        with mock.patch.dict(connections.databases, {'replica': connections.databases['default']}):
+            self.assertEqual(router.db_for_read(Book), 'default')  # în tranzacție: propriile scrieri
+            with mock.patch.object(connections['default'], 'in_atomic_block', False):
+                self.assertEqual(router.db_for_read(Book), 'replica')
+                self.assertIsNone(router.db_for_read(CustomUser))
+            self.assertEqual(router.db_for_write(Book), 'default')
+            self.assertFalse(router.allow_migrate('replica', 'aplicatie'))
+
+
+class LoggingPipelineTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.logger = logging.Logger('test_jurnalizare', logging.DEBUG)
+
+    def handler(self, **kwargs):
+        files = {'DEBUG': f'{self.tmp.name}/debug.log', 'ERROR': f'{self.tmp.name}/error.log'}
+        handler = QueueLogHandler(files, **kwargs)
+        handler.setFormatter(logging.Formatter('{levelname} {message}', style='{'))
+        self.logger.addHandler(handler)
+        return handler
+
+    def read(self, name):
+        with open(f'{self.tmp.name}/{name}', encoding='utf-8') as f:
+            return f.read()
+
+    def test_rutare_pe_niveluri_prin_coada(self):
+        handler = self.handler()
+        self.logger.info("carte %s", 1)
+        self.logger.error("eroare %s", 2)
+        handler.close()  # așteaptă firul listener-ului
+        self.assertEqual(self.read('debug.log'), "INFO carte 1\nERROR eroare 2\n")
+        self.assertEqual(self.read('error.log'), "ERROR eroare 2\n")
+
+    def test_coada_plina_pierde_doar_debug_info(self):
+        handler = self.handler(queue_size=1, full_timeout=0.01)
+        handler.listener.stop()  # nimeni nu golește coada
+        self.logger.info("încape")
+        self.logger.info("pierdut")
+        self.logger.error("scris direct")
+        self.assertEqual(handler.dropped, 1)
+        self.assertEqual(self.read('error.log'), "ERROR scris direct\n")
+        handler.listener.start()
+        handler.close()
+        self.assertEqual(sorted(self.read('debug.log').splitlines()), ["ERROR scris direct", "INFO încape"])
+
+    def test_rotire_cu_gzip(self):
+        handler = self.handler(max_bytes=200, backup_count=2, compress=True)
+        for i in range(50):
+            self.logger.warning("rând de log numărul %s", i)
+        handler.close()
+        with gzip.open(f'{self.tmp.name}/debug.log.1.gz', 'rt', encoding='utf-8') as f:
+            self.assertIn("rând de log", f.read())
+
+    def test_rotire_externa(self):
+        # Fișierul mutat de logrotate e redeschis; procesul nu rotește nimic singur
+        handler = self.handler(rotation='external', max_bytes=10)
+        self.logger.warning("înainte")
+        handler.listener.stop()
+        handler.listener.start()
+        os.rename(f'{self.tmp.name}/debug.log', f'{self.tmp.name}/debug.log.1')
+        self.logger.warning("după")
+        handler.close()
+        self.assertEqual(self.read('debug.log.1'), "WARNING înainte\n")
+        self.assertEqual(self.read('debug.log'), "WARNING după\n")
+
+    def test_esantionare_debug_info(self):
+        handler = self.handler()
+        handler.addFilter(SamplingFilter(burst=3, interval=60))
+        for i in range(10):
+            self.logger.info("vizită %s", i)
+        self.logger.error("eroarea nu e eșantionată")
+        handler.close()
+        lines = self.read('debug.log').splitlines()
+        self.assertEqual(lines, ["INFO vizită 0", "INFO vizită 1", "INFO vizită 2", "ERROR eroarea nu e eșantionată"])
+
+
+class StructuredLogTests(TestCase):
+    def test_rand_de_acces_pentru_fiecare_cerere(self):
+        creeaza_carti(2)
+        with self.assertLogs('aplicatie.acces', 'INFO') as logs:
+            response = self.client.get(reverse('book_list'), headers={'x-request-id': 'abc123'})
+        self.assertEqual(response['X-Request-ID'], 'abc123')
+        record = logs.records[0]
+        self.assertEqual((record.view, record.status, record.request_id), ('book_list', 200, 'abc123'))
+        self.assertGreater(record.db_queries, 0)
+        line = json.loads(JsonFormatter().format(record))
+        self.assertEqual(line['view'], 'book_list')
+        self.assertIn('latency_ms', line)
+
+    def test_interogari_peste_fisiere_rotite(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        rows = [
+            {'ts': '2026-01-01T10:00:00.000+00:00', 'level': 'INFO', 'view': 'book_list', 'latency_ms': 30.0, 'db_queries': 5},
+            {'ts': '2026-01-01T10:05:00.000+00:00', 'level': 'ERROR', 'view': 'book_list', 'msg': 'boom'},
+        ]
+        with gzip.open(f'{tmp.name}/app.jsonl.1.gz', 'wt', encoding='utf-8') as f:
+            f.write('\n'.join(json.dumps(row) for row in rows) + '\n')
+        with open(f'{tmp.name}/app.jsonl', 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'ts': '2026-01-01T11:00:00.000+00:00', 'level': 'INFO', 'view': 'index', 'latency_ms': 90.0}) + '\n')
+            f.write('{"ts": "trunchiat\n')
+        pattern = f'{tmp.name}/app.jsonl*'
+
+        slowest = log_query.slowest_views(log_query.records(markers=('"latency_ms"',), pattern=pattern))
+        self.assertEqual([row[0] for row in slowest], ['index', 'book_list'])
+        errors = log_query.errors_per_view_hour(log_query.records(markers=log_query.ERROR_MARKERS, pattern=pattern))
+        self.assertEqual(errors, {('book_list', '2026-01-01T10'): 1})
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        profiling.registry.reset()
+
+    def test_cuantile_cu_eroare_relativa_mica(self):
+        sketch = profiling.QuantileSketch()
+        for value in range(1, 1001):
+            sketch.add(value)
+        for q, expected in ((0.5, 500), (0.95, 950), (0.99, 990)):
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.03)
+        self.assertLessEqual(len(sketch.buckets), sketch.max_buckets)
+
+    def test_interogare_repetata_marcata_ca_n_plus_1(self):
+        creeaza_carti(1)
+
+        def view(request):
+            for _ in range(7):
+                list(Book.objects.all())
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/')
+        request.resolver_match = mock.Mock(view_name='test_n_plus_1')
+        with override_settings(PROFILING_N_PLUS_ONE=5):
+            ProfilingMiddleware(view)(request)
+        profile = profiling.registry.merged()['test_n_plus_1']
+        self.assertEqual(profile.sketches['db_queries'].max, 7)
+        [(sql, entry)] = profile.n_plus_one.items()
+        self.assertIn('aplicatie_book', sql)
+        self.assertEqual(entry['max_repeats'], 7)
+
+    def test_procesele_publica_in_sloturi_separate(self):
+        # Două procese (registre cu identificatori diferiți) nu își suprascriu înregistrarea
+        other = profiling.ProfileRegistry()
+        sample = {metric: 1 for metric in profiling.METRICS}
+        profiling.registry.record('vedere_a', sample, {})
+        other.record('vedere_b', sample, {})
+        other.flush()
+        self.assertEqual(set(profiling.registry.merged()), {'vedere_a', 'vedere_b'})
+        self.assertEqual(len(caches[settings.PROFILING_CACHE_ALIAS].get_many(profiling.registry._slot_keys())), 2)
+
+    def test_pagina_staff(self):
+        creeaza_carti(3)
+        self.client.get(reverse('book_list'))
+        url = reverse('profiling_dashboard')
+        self.assertRedirects(self.client.get(url), f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+        self.client.force_login(CustomUser.objects.create_user('client', 'client@example.com', 'parola-test'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        staff = CustomUser.objects.create_user('staff', 'staff@example.com', 'parola-test', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(url)
+        self.assertContains(response, 'book_list')
+        row = next(row for row in response.context['rows'] if row['view'] == 'book_list')
+        self.assertGreater(row['template_p95'], 0)
+
+
+class MetricsTests(TestCase):
+    def valoare(self, text, series):
+        match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.MULTILINE)
+        return float(match.group(1)) if match else 0.0
+
+    def test_endpoint_cereri_si_comenzi(self):
+        book = creeaza_carti(1)[0]
+        before = metrics.render()
+        self.client.get(reverse('book_list'))
+        Order.objects.create(book=book, quantity=1)
+        text = self.client.get(reverse('metrics')).content.decode()
+        for series in (
+            'bookstore_requests_total{view="book_list",status="200"}',
+            'bookstore_request_duration_seconds_count{view="book_list"}',
+            'bookstore_orders_created_total{status="PENDING"}',
+            'bookstore_request_duration_seconds_bucket{view="book_list",le="+Inf"}',
+        ):
+            self.assertEqual(self.valoare(text, series) - self.valoare(before, series), 1, series)
+        self.assertIn('# TYPE bookstore_request_duration_seconds histogram', text)
+
+    def test_contoare_pe_fir_adunate_la_colectare(self):
+        counter = metrics.Counter('bookstore_test_fire_total', 'Test')
+        threads = [threading.Thread(target=lambda: [counter.inc() for _ in range(1000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.valoare(metrics.render(), 'bookstore_test_fire_total'), 4000)
+
+    def test_mod_fisier_aduna_procesele(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        counter = metrics.Counter('bookstore_test_procese_total', 'Test')
+        counter.inc(3)
+        # Fișierul unui alt worker (sau al unuia oprit)
+        with open(f'{tmp.name}/999999.json', 'w', encoding='utf-8') as f:
+            json.dump([['bookstore_test_procese_total', [], '', 4]], f)
+        with override_settings(METRICS_MODE='file', METRICS_DIR=tmp.name):
+            self.assertEqual(self.valoare(metrics.render(), 'bookstore_test_procese_total'), 7)
+            # Procesul oprit a trecut în retained.json; un proces nou cu același pid are alt fișier
+            self.assertFalse(os.path.exists(f'{tmp.name}/999999.json'))
+            with open(f'{tmp.name}/999999-1.json', 'w', encoding='utf-8') as f:
+                json.dump([['bookstore_test_procese_total', [], '', 1]], f)
+            self.assertEqual(self.valoare(metrics.render(), 'bookstore_test_procese_total'), 8)
+            self.assertEqual(self.valoare(metrics.render(), 'bookstore_test_procese_total'), 8)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), headers={'authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, 200)
+
+
+class ActivityReportTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.books = creeaza_carti(3)
+        # Activitate pe zile diferite (created_at e auto_now_add, deci îl mutăm cu update)
+        self.ziua = lambda d: timezone.make_aware(datetime.combine(d, datetime.min.time())) + timedelta(hours=12)
+        self.luni = date(2026, 3, 2)
+        Book.objects.filter(pk=self.books[0].pk).update(created_at=self.ziua(self.luni))
+        Book.objects.filter(pk__in=[b.pk for b in self.books[1:]]).update(created_at=self.ziua(self.luni + timedelta(days=2)))
+        for status, day in (('PENDING', self.luni), ('SHIPPED', self.luni), ('SHIPPED', self.luni + timedelta(days=8))):
+            order = Order.objects.create(book=self.books[0], quantity=1, status=status)
+            Order.objects.filter(pk=order.pk).update(created_at=self.ziua(day))
+        with open(f'{self.tmp.name}/app.jsonl', 'w', encoding='utf-8') as f:
+            ts = self.ziua(self.luni).isoformat()
+            f.write(json.dumps({'ts': ts, 'level': 'INFO', 'view': 'book_detail', 'status': 200,
+                                'path': f'/book/{self.books[0].pk}/'}) + '\n')
+            f.write(json.dumps({'ts': ts, 'level': 'ERROR', 'view': 'promotii', 'msg': 'boom'}) + '\n')
+        self.settings_override = override_settings(JSON_LOG_FILE=f'{self.tmp.name}/app.jsonl', REPORTS_DIR=Path(self.tmp.name))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_backfill_un_an_cu_numar_constant_de_interogari(self):
+        start = self.luni - timedelta(days=300)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(reports.rollup(start, start + timedelta(days=365)), 365)
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 4)  # un GROUP BY pe sursă, indiferent de numărul de zile
+        self.assertEqual(RaportZilnic.objects.filter(metric='carti_create').count(), 365)
+
+    def test_raport_saptamanal_din_rollup(self):
+        reports.rollup(self.luni, self.luni + timedelta(days=14))
+        report = reports.build_report('weekly', self.luni + timedelta(days=3))
+        self.assertEqual(report['carti_create'], 3)
+        self.assertEqual(report['comenzi'], {'PENDING': 1, 'SHIPPED': 1})
+        self.assertEqual(report['vizualizari'], [{'book_id': self.books[0].pk, 'title': 'Carte 0', 'count': 1}])
+        self.assertEqual(report['erori'], {'promotii': 1})
+        self.assertEqual(reports.build_report('monthly', self.luni)['comenzi'], {'PENDING': 1, 'SHIPPED': 2})
+
+        paths = reports.write_report('weekly', self.luni, ('txt', 'csv', 'json'))
+        self.assertEqual([p.suffix for p in paths], ['.txt', '.csv', '.json'])
+        self.assertIn('Cărți create: 3', paths[0].read_text(encoding='utf-8'))
+        self.assertEqual(json.loads(paths[2].read_text(encoding='utf-8'))['carti_create'], 3)
+
+    def test_incremental_doar_zilele_noi(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        reports.rollup(yesterday - timedelta(days=5), yesterday)
+        self.assertEqual(reports.rollup_pending(), 2)  # ultima zi agregată (recalculată) + ieri
+        self.assertEqual(reports.rollup_pending(), 1)  # doar ultima zi
+
+    def test_ziua_partiala_se_recalculeaza(self):
+        # Rularea de la 23:59 a agregat ieri parțial; cartea creată după ea intră la rularea următoare
+        yesterday = timezone.localdate() - timedelta(days=1)
+        reports.rollup(yesterday, yesterday + timedelta(days=1))
+        Book.objects.filter(pk=self.books[0].pk).update(created_at=self.ziua(yesterday) + timedelta(hours=11, minutes=59, seconds=30))
+        reports.rollup_pending()
+        self.assertEqual(RaportZilnic.objects.get(day=yesterday, metric='carti_create').value, 1)
+
+    def test_jurnalele_vechi_nu_se_citesc(self):
+        path = f'{self.tmp.name}/app.jsonl'
+        old = self.ziua(self.luni).timestamp()
+        os.utime(path, (old, old))
+        self.assertEqual(log_query.log_files(modified_since=self.ziua(self.luni) - timedelta(hours=1)), [path])
+        self.assertEqual(log_query.log_files(modified_since=self.ziua(self.luni) + timedelta(hours=1)), [])
+
+
+class PurgeUnconfirmedUsersTests(TestCase):
+    def setUp(self):
+        books = creeaza_carti(3)
+        old = timezone.now() - timedelta(days=1)
+        self.spam = []
+        for i in range(7):
+            user = CustomUser.objects.create_user(f'spam{i}', f'spam{i}@example.com', 'parola-test')
+            Vizualizari.objects.bulk_create([Vizualizari(user=user, book=b, slot=j) for j, b in enumerate(books)])
+            self.spam.append(user)
+        self.confirmed = CustomUser.objects.create_user('cititor', 'cititor@example.com', 'parola-test', email_confirmat=True)
+        self.recent = CustomUser.objects.create_user('nou', 'nou@example.com', 'parola-test')
+        CustomUser.objects.exclude(pk=self.recent.pk).update(date_joined=old)
+
+    def test_loturi_reluate_de_la_punctul_de_control(self):
+        first = purge.purge_unconfirmed_users(batch_size=3, sleep=0, max_batches=1)
+        self.assertEqual((first['users'], first['rows'], first['finished']), (3, 12, False))  # 3 utilizatori + 9 vizualizări
+        self.assertEqual(PunctControl.objects.get(name=purge.CHECKPOINT).value['last_pk'], self.spam[2].pk)
+
+        rest = purge.purge_unconfirmed_users(batch_size=3, sleep=0)
+        self.assertEqual((rest['users'], rest['finished']), (4, True))
+        self.assertEqual(PunctControl.objects.get(name=purge.CHECKPOINT).value, {})
+        self.assertEqual(set(CustomUser.objects.values_list('username', flat=True)), {'cititor', 'nou'})
+        self.assertFalse(Vizualizari.objects.exists())
+
+    def test_cascade_in_bloc(self):
+        # Numărul de interogări al unui lot nu depinde de câte vizualizări au utilizatorii
+        Vizualizari.objects.filter(user__in=self.spam[3:]).delete()
+        PunctControl.objects.create(name=purge.CHECKPOINT)
+        with CaptureQueriesContext(connection) as with_views:
+            purge.purge_unconfirmed_users(batch_size=3, sleep=0, max_batches=1)
+        with CaptureQueriesContext(connection) as without_views:
+            purge.purge_unconfirmed_users(batch_size=3, sleep=0, max_batches=1)
+        self.assertEqual(len(with_views.captured_queries), len(without_views.captured_queries))
+
+
+class SmtpStub(socketserver.ThreadingTCPServer):
+    # Server SMTP minimal pentru teste: reține mesajele, poate refuza primele `fail_data` mesaje
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, fail_data=0, accept=0):
+        self.messages = []
+        self.sessions = 0
+        self.fail_data = fail_data
+        self.accept = accept  # mesaje acceptate înainte de primul refuz
+        super().__init__(('127.0.0.1', 0), SmtpStubHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SmtpStubHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.sessions += 1
+        self.reply('220 stub')
+        rcpt = []
+        while line := self.rfile.readline().decode().strip():
+            verb = line.split(' ', 1)[0].upper()
+            if verb == 'DATA':
+                self.reply('354 end with .')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                if self.server.accept:
+                    self.server.accept -= 1
+                    self.server.messages.append((rcpt, data.decode()))
+                    self.reply('250 queued')
+                elif self.server.fail_data:
+                    self.server.fail_data -= 1
+                    self.reply('451 try again later')
+                else:
+                    self.server.messages.append((rcpt, data.decode()))
+                    self.reply('250 queued')
+                rcpt = []
+            elif verb == 'RCPT':
+                rcpt.append(line.split(':', 1)[1].strip(' <>'))
+                self.reply('250 ok')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:  # EHLO, HELO, MAIL, RSET, NOOP
+                self.reply('250 ok')
+
+
+@override_settings(NEWSLETTER_BACKOFF=0, NEWSLETTER_BATCH_SIZE=2)
+class NewsletterTests(TestCase):
+    def setUp(self):
+        poezie = Category.objects.create(name="Poezie")
+        for book in creeaza_carti(2):
+            book.categories.set([poezie])
+        self.users = [
+            CustomUser.objects.create_user('ana', 'ana@example.com', 'p', first_name='Ana', favorite_genre='poezie', reading_frequency='daily'),
+            CustomUser.objects.create_user('dan', 'dan@example.com', 'p', favorite_genre='Poezie'),
+            CustomUser.objects.create_user('eva', 'eva@example.com', 'p', favorite_genre='Istorie', reading_frequency='rarely'),
+            CustomUser.objects.create_user('ion', 'ion@example.com', 'p', favorite_genre='POEZIE '),  # același segment ca dan
+        ]
+        CustomUser.objects.create_user('nou', 'nou@example.com', 'p')  # prea recent
+        CustomUser.objects.exclude(username='nou').update(date_joined=timezone.now() - timedelta(days=1))
+
+    def test_personalizat_si_idempotent(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = newsletter.send_newsletter(issue='2026-W01')
+        self.assertEqual((result.status, result.sent, result.failed), ('DONE', 4, 0))
+        body = {m.to[0]: m.body for m in mail.outbox}
+        self.assertEqual(set(body), {'ana@example.com', 'dan@example.com', 'eva@example.com', 'ion@example.com'})
+        self.assertIn('Bună, Ana!', body['ana@example.com'])
+        self.assertIn('Bună, dan!', body['dan@example.com'])  # fără prenume: numele de utilizator
+        self.assertIn('îți recomandăm', body['ana@example.com'])
+        self.assertIn('Carte 1', body['dan@example.com'])
+        self.assertIn('adăugăm cărți noi în fiecare zi', body['ana@example.com'])
+        self.assertNotIn('îți recomandăm', body['eva@example.com'])
+        self.assertIn('o carte pe lună', body['eva@example.com'])
+        # Recomandările se citesc o dată pe segment (gen, frecvență): ana, dan/ion; eva nu are cărți în gen
+        self.assertEqual(sum('FROM "aplicatie_book"' in q['sql'] for q in ctx.captured_queries), 3)
+
+        # A doua rulare pentru același număr nu mai trimite nimic
+        again = newsletter.send_newsletter(issue='2026-W01')
+        self.assertEqual((again.status, again.sent, len(mail.outbox)), ('DONE', 4, 4))
+
+    def test_smtp_reincercare_pe_mesaj(self):
+        stub = SmtpStub(fail_data=1)  # primul mesaj e refuzat o dată
+        self.addCleanup(stub.stop)
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                               EMAIL_HOST='127.0.0.1', EMAIL_PORT=stub.server_address[1]):
+            result = newsletter.send_newsletter(issue='2026-W02')
+        self.assertEqual((result.sent, result.failed), (4, 0))
+        # Doar mesajul eșuat se retrimite, pe o conexiune nouă; apoi conexiunea e refolosită
+        self.assertEqual(sorted(r[0] for r, _ in stub.messages), ['ana@example.com', 'dan@example.com', 'eva@example.com', 'ion@example.com'])
+        self.assertEqual(stub.sessions, 2)
+        self.assertEqual(JurnalNewsletter.objects.get(email='ana@example.com').attempts, 2)
+
+    def test_lot_esuat_se_reia(self):
+        stub = SmtpStub(fail_data=10)
+        self.addCleanup(stub.stop)
+        smtp = dict(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                    EMAIL_HOST='127.0.0.1', EMAIL_PORT=stub.server_address[1], NEWSLETTER_RETRIES=2)
+        with override_settings(**smtp):
+            first = newsletter.send_newsletter(issue='2026-W03')
+            self.assertEqual((first.sent, first.failed), (0, 4))
+            stub.fail_data = 0
+            second = newsletter.send_newsletter(issue='2026-W03')
+        self.assertEqual((second.sent, second.failed), (4, 0))
+        self.assertEqual(len(stub.messages), 4)
+
+    def test_doar_mesajele_netrimise_se_reiau(self):
+        stub = SmtpStub(fail_data=10, accept=1)  # primul mesaj al lotului pleacă, al doilea e refuzat
+        self.addCleanup(stub.stop)
+        smtp = dict(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                    EMAIL_HOST='127.0.0.1', EMAIL_PORT=stub.server_address[1], NEWSLETTER_RETRIES=1)
+        with override_settings(**smtp):
+            first = newsletter.send_newsletter(issue='2026-W04')
+            self.assertEqual((first.sent, first.failed), (1, 3))
+            self.assertEqual(JurnalNewsletter.objects.get(email='ana@example.com').status, 'SENT')
+            stub.fail_data = 0
+            second = newsletter.send_newsletter(issue='2026-W04')
+        self.assertEqual((second.sent, second.failed), (4, 0))
+        self.assertEqual(len(stub.messages), 4)  # fiecare adresă a primit un singur e-mail
+
+    def test_oprire_dupa_esecuri_consecutive(self):
+        stub = SmtpStub(fail_data=100)
+        self.addCleanup(stub.stop)
+        smtp = dict(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1',
+                    EMAIL_PORT=stub.server_address[1], NEWSLETTER_RETRIES=2, NEWSLETTER_MAX_CONSECUTIVE_FAILURES=3)
+        with override_settings(**smtp):
+            with self.assertLogs('django', 'ERROR'):
+                first = newsletter.send_newsletter(issue='2026-W05')
+            # Oprit după 3 mesaje (al treilea în lotul al doilea); al patrulea destinatar nici nu e încercat
+            self.assertEqual((first.status, first.sent, first.failed), ('FAILED', 0, 3))
+            self.assertEqual(stub.fail_data, 100 - 3 * 2)
+            stub.fail_data = 0
+            second = newsletter.send_newsletter(issue='2026-W05')
+        self.assertEqual((second.status, second.sent, second.failed), ('DONE', 4, 0))
+
+
+class SchedulerTests(TestCase):
+    def test_expresii_cron(self):
+        utc = timezone.get_current_timezone()
+        moment = datetime(2026, 10, 18, 3, 9, 30, tzinfo=utc)  # duminică
+        self.assertEqual(scheduler.CronSchedule('*/60 * * * *').next_after(moment), datetime(2026, 10, 18, 4, 0, tzinfo=utc))
+        self.assertEqual(scheduler.CronSchedule('*/10 * * * *').next_after(moment), datetime(2026, 10, 18, 3, 10, tzinfo=utc))
+        self.assertEqual(scheduler.CronSchedule('0 18 * * 4').next_after(moment), datetime(2026, 10, 22, 18, 0, tzinfo=utc))
+        self.assertEqual(scheduler.CronSchedule('59 23 * * 0').next_after(moment), datetime(2026, 10, 18, 23, 59, tzinfo=utc))
+        # Zi a lunii sau zi a săptămânii, ca în cron; 7 e tot duminică
+        self.assertEqual(scheduler.CronSchedule('0 0 1 * 7').next_after(moment), datetime(2026, 10, 25, 0, 0, tzinfo=utc))
+        self.assertEqual(scheduler.CronSchedule('30 6 1-2 2 *').next_after(moment), datetime(2027, 2, 1, 6, 30, tzinfo=utc))
+        with self.assertRaises(ValueError):
+            scheduler.CronSchedule('61 * * * *')
+
+    def test_joburile_portate(self):
+        jobs = {job.name: job for job in scheduler.load_jobs()}
+        self.assertEqual(set(jobs), {'clean_unconfirmed_users', 'send_newsletter', 'clear_sessions', 'generate_activity_report',
+                                     'release_expired_orders'})
+        run = scheduler.run_job(jobs['clean_unconfirmed_users'], owner='test')
+        self.assertEqual((run.status, run.rows), ('OK', 0))
+
+    def test_un_singur_nod_pe_slot(self):
+        job = scheduler.Job('demo', '* * * * *', lambda: 7, timeout=60)
+        slot = timezone.now().replace(second=0, microsecond=0)
+        run = scheduler.run_job(job, slot=slot, owner='nod-a')
+        self.assertEqual((run.status, run.rows, run.owner), ('OK', 7, 'nod-a'))
+        self.assertIsNone(scheduler.run_job(job, slot=slot, owner='nod-b'))  # slotul a fost deja rulat
+        self.assertEqual(JobLock.objects.get(name='demo').owner, '')  # blocarea e eliberată
+
+        # Rulare anterioară încă în curs pe alt nod: slotul următor e sărit și apare în istoric
+        JobLock.objects.filter(name='demo').update(owner='nod-a', locked_until=timezone.now() + timedelta(minutes=5))
+        skipped = scheduler.run_job(job, slot=slot + timedelta(minutes=1), owner='nod-b')
+        self.assertEqual(skipped.status, 'SKIPPED')
+        # ... dar o blocare expirată (proces oprit brusc) nu mai oprește job-ul
+        JobLock.objects.filter(name='demo').update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(scheduler.run_job(job, slot=slot + timedelta(minutes=2), owner='nod-b').status, 'OK')
+
+    def test_erori_si_timeout(self):
+        def fails():
+            raise RuntimeError('bum')
+
+        def hangs():
+            try:
+                time.sleep(5)
+            except Exception:
+                return 0  # JobTimeout nu e prinsă de `except Exception`
+
+        with self.assertLogs('django', 'ERROR'):
+            failed = scheduler.run_job(scheduler.Job('fails', '* * * * *', fails, timeout=60))
+            timed_out = scheduler.run_job(scheduler.Job('hangs', '* * * * *', hangs, timeout=0.2))
+        self.assertEqual(failed.status, 'FAILED')
+        self.assertIn('RuntimeError: bum', failed.error)
+        self.assertEqual(timed_out.status, 'TIMEOUT')
+        self.assertLess(timed_out.duration, 2)
+        self.assertEqual(JobRun.objects.filter(finished_at__isnull=True).count(), 0)
+
+    def test_joburile_lungi_nu_blocheaza_restul(self):
+        # Fiecare job scadent rulează în procesul lui: cel scurt se termină cât cel lung încă rulează
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        release = Path(tmp.name) / 'continua'
+
+        def slow():
+            while not release.exists():
+                time.sleep(0.01)
+
+        slow_job = scheduler.Job('lung', '* * * * *', slow, timeout=60)
+        fast_job = scheduler.Job('scurt', '* * * * *', lambda: (Path(tmp.name) / 'scurt').touch(), timeout=60)
+        worker = scheduler.Scheduler(jobs=[slow_job, fast_job], owner='test')
+        due = timezone.now() - timedelta(seconds=1)
+        next_runs = {'lung': due, 'scurt': due}
+        with mock.patch.object(scheduler, 'run_job', lambda job, slot, owner: job.func()), \
+                mock.patch.object(scheduler.connections, 'close_all'):
+            slow_process, fast_process = worker.dispatch(next_runs)
+            fast_process.join(5)
+            self.assertTrue((Path(tmp.name) / 'scurt').exists())
+            self.assertTrue(slow_process.is_alive())
+            release.touch()
+            slow_process.join(5)
+        self.assertIsNone(worker.reap())  # ambii copii strânși
+        self.assertEqual(worker.running, {})
+        self.assertTrue(all(run > timezone.now() for run in next_runs.values()))
+
+    @override_settings(SCHEDULER_LOCK_GRACE=0.2)
+    def test_copilul_blocat_e_oprit_la_timeout(self):
+        # Un job care nu răspunde la SIGALRM e oprit înainte să expire blocarea; doar rularea lui e eliberată
+        job = scheduler.Job('blocat', '* * * * *', lambda: None, timeout=0.1)
+        worker = scheduler.Scheduler(jobs=[job], owner='test')
+        with mock.patch.object(scheduler, 'run_job', lambda job, slot, owner: time.sleep(30)), \
+                mock.patch.object(scheduler.connections, 'close_all'):
+            [process] = worker.dispatch({'blocat': timezone.now() - timedelta(seconds=1)})
+        _, token, _ = worker.running[process]
+        self.assertTrue(token.startswith('test:'))
+        JobLock.objects.create(name='blocat', owner=token, locked_until=timezone.now() + timedelta(minutes=1))
+        JobRun.objects.create(job='blocat', scheduled_for=timezone.now(), owner=token)
+        scheduler.release(job, 'test:alt-token')  # o rulare mai veche nu eliberează blocarea
+        self.assertEqual(JobLock.objects.get(name='blocat').owner, token)
+        time.sleep(0.3)
+        with self.assertLogs('django', 'ERROR'):
+            self.assertIsNone(worker.reap())
+        self.assertFalse(process.is_alive())
+        self.assertEqual(JobRun.objects.get(job='blocat').status, 'TIMEOUT')
+        self.assertEqual(JobLock.objects.get(name='blocat').owner, '')
+
+
+class SessionWriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = creeaza_carti(1)[0]
+
+    def session_queries(self, *urls):
+        with CaptureQueriesContext(connection) as ctx:
+            for url in urls:
+                self.assertEqual(self.client.get(url).status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries if 'django_session' in q['sql']]
+
+    def test_navigare_anonima_fara_sesiuni(self):
+        urls = [reverse('index'), reverse('book_list'), reverse('book_detail', args=[self.book.pk]),
+                reverse('author_detail', args=[self.book.author_id]), reverse('success')]
+        self.assertEqual(self.session_queries(*urls), [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_profil_scrie_sesiunea_doar_la_schimbare(self):
+        user = CustomUser.objects.create_user('ana', 'ana@example.com', 'parola-test', email_confirmat=True)
+        self.client.force_login(user)
+        self.client.get(reverse('profile'))
+        self.assertEqual(self.client.session['user_data']['username'], 'ana')
+        writes = [sql for sql in self.session_queries(reverse('profile'), reverse('user_data_with_confirmation'))
+                  if not sql.startswith('SELECT')]
+        self.assertEqual(writes, [])
+
+        CustomUser.objects.filter(pk=user.pk).update(favorite_genre='Poezie')
+        self.client.get(reverse('profile'))
+        self.assertEqual(self.client.session['user_data']['favorite_genre'], 'Poezie')
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_cookie_semnat(self):
+        CustomUser.objects.create_user('dan', 'dan@example.com', 'parola-test', email_confirmat=True)
+        response = self.client.post(reverse('login'), {'username': 'dan', 'password': 'parola-test'})
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self.client.get(reverse('profile')), 'dan')
+        self.assertEqual(Session.objects.count(), 0)
+
+
+class ContactStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(CONTACT_STORE_DIR=Path(self.tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(lambda: contact_store.get_store().close())
+
+    def trimite(self, tip, email, nume='Dan'):
+        return self.client.post(reverse('contact'), {
+            'nume': nume, 'data_nasterii': '1990-01-01', 'email': email, 'confirmare_email': email,
+            'tip_mesaj': tip, 'subiect': 'Salut', 'zile_asteptare': 2,
+            'mesaj': f'salut am o intrebare despre comanda {nume}',
+        })
+
+    def test_mesaje_in_aceeasi_secunda_si_api_paginat(self):
+        for tip, email in [('intrebare', 'a@example.com'), ('reclamatie', 'b@example.com'), ('intrebare', 'C@example.com')]:
+            self.assertRedirects(self.trimite(tip, email), reverse('success'))
+        store = contact_store.get_store()
+        self.assertEqual(store.count(), 3)  # nicio suprascriere, chiar în aceeași secundă
+
+        staff = CustomUser.objects.create_user('admin', 'admin@example.com', 'parola-test', is_staff=True)
+        self.client.force_login(staff)
+        page = self.client.get(reverse('contact_messages'), {'tip_mesaj': 'intrebare', 'limit': 1}).json()
+        self.assertEqual([m['email'] for m in page['results']], ['C@example.com'])
+        page = self.client.get(page['next']).json()
+        self.assertEqual([m['email'] for m in page['results']], ['a@example.com'])
+        self.assertIsNone(page['next'])
+        by_email = self.client.get(reverse('contact_messages'), {'email': 'c@example.com'}).json()
+        self.assertEqual(by_email['results'][0]['mesaj'], 'salut am o intrebare despre comanda Dan')
+        self.assertEqual(self.client.get(reverse('contact_messages'), {'since': '2999-01-01'}).json()['results'], [])
+
+    def test_import_fisiere_vechi_si_reconstruire_index(self):
+        legacy = Path(self.tmp.name) / 'mesaj_1756890110.json'
+        legacy.write_text(json.dumps({'nume': 'Dan', 'email': 'dan.d@gmail.com', 'tip_mesaj': 'intrebare'}), encoding='utf-8')
+        out = StringIO()
+        call_command('import_contact_messages', stdout=out)
+        call_command('import_contact_messages', stdout=out)  # idempotent
+        self.assertIn('0 mesaje importate, 1 deja existente', out.getvalue())
+
+        store = contact_store.get_store()
+        store.append({'email': 'nou@example.com', 'tip_mesaj': 'cerere'})
+        (message,), _ = store.query(email='dan.d@gmail.com')
+        self.assertEqual(message['received_at'], '2025-09-03T09:01:50.000+00:00')
+        self.assertEqual(store.rebuild_index(), 2)
+        self.assertEqual([m['email'] for m in store.query()[0]], ['nou@example.com', 'dan.d@gmail.com'])
+        self.assertIsNone(store.append({'email': 'x'}, source='mesaj_1756890110.json'))
+
+
+class StaticAssetTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        src, root = Path(self.tmp.name) / 'src', Path(self.tmp.name) / 'root'
+        (src / 'css').mkdir(parents=True)
+        (src / 'images').mkdir()
+        self.css = ('body { background: url("../images/poza.jpg"); }\n' + '.carte { margin: 0 auto; }\n' * 200).encode()
+        (src / 'css' / 'site.css').write_bytes(self.css)
+        from PIL import Image
+        Image.effect_noise((200, 200), 40).convert('RGB').save(src / 'images' / 'poza.jpg', quality=100)
+        self.jpeg_size = (src / 'images' / 'poza.jpg').stat().st_size
+
+        override = override_settings(
+            STATIC_ROOT=root, STATICFILES_DIRS=[src], STATIC_SERVE=True,
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': 'aplicatie.static_storage.CompressedManifestStorage'}},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.manifest = json.loads((root / 'staticfiles.json').read_text())['paths']
+
+    def test_collectstatic_hash_compresie_si_imagini(self):
+        root = Path(settings.STATIC_ROOT)
+        hashed_css = self.manifest['css/site.css']
+        self.assertRegex(hashed_css, r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertIn(self.manifest['images/poza.jpg'], (root / hashed_css).read_text())  # URL-urile rescrise
+        self.assertEqual(gzip.decompress((root / f'{hashed_css}.gz').read_bytes()), (root / hashed_css).read_bytes())
+        self.assertLess((root / self.manifest['images/poza.jpg']).stat().st_size, self.jpeg_size)
+        self.assertFalse((root / 'images/poza.jpg.gz').exists())  # imaginile nu se recomprimă cu gzip
+
+    def test_servire_immutable_etag_si_negociere(self):
+        url = '/static/' + self.manifest['css/site.css']
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], f'public, max-age={365 * 24 * 3600}, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn(b'.carte', gzip.decompress(b''.join(response.streaming_content)))
+        revalidated = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+        plain = self.client.get('/static/css/site.css')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertNotEqual(plain['ETag'], response['ETag'])
+        self.assertEqual(plain['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(plain['Content-Type'], 'text/css; charset=utf-8')
+        self.assertEqual(self.client.get('/static/../bookstore/settings.py').status_code, 404)
+        self.assertEqual(self.client.get(url + '.gz').status_code, 404)
+
+
+# Aceleași rute, dar paginile de catalog din async_views (ca sub ASGI, CATALOG_ASYNC_VIEWS)
+class AsyncUrlconf:
+    urlpatterns = urls.catalog_urls(async_views) + bookstore_urls.urlpatterns
+AJAX = {'x-requested-with': 'XMLHttpRequest'}
+
+
+@override_settings(ROOT_URLCONF=AsyncUrlconf, CATALOG_PARALLEL_QUERIES=False)
+class AsyncCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('cititor', 'cititor@example.com', 'parola-test')
+        self.books = creeaza_carti(3)
+
+    async def test_lista_ajax_la_fel_ca_varianta_sincrona(self):
+        response = await self.async_client.get(reverse('book_list'), {'total': 'on'}, headers=AJAX)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 3)
+
+        await cache.aclear()
+        request = RequestFactory().get(reverse('book_list'), {'total': 'on'})
+        expected = await sync_to_async(views._build_book_list)(request, BookFilterForm(request.GET))
+        expected = json.loads(json.dumps(expected, cls=DjangoJSONEncoder))
+        for key in ('books_html', 'filters_html', 'facets', 'next', 'prev', 'total'):
+            self.assertEqual(data[key], expected[key], key)
+
+    async def test_detaliu_async_din_cache_cu_interogari_numarate(self):
+        url = reverse('book_detail', kwargs={'pk': self.books[0].pk})
+        with self.assertLogs('aplicatie.acces', 'INFO') as logs:
+            first = await self.async_client.get(url)
+            second = await self.async_client.get(url)
+        self.assertContains(first, "Carte 0")
+        self.assertEqual(second.content, first.content)
+        # Interogările ORM-ului async sunt văzute de middleware; a doua oară cardul vine din cache
+        self.assertGreater(logs.records[0].db_queries, 0)
+        self.assertEqual(logs.records[1].db_queries, 0)
+
+        with self.assertLogs('django', 'WARNING'):
+            missing = await self.async_client.get(reverse('author_detail', kwargs={'pk': 999999}))
+        self.assertEqual(missing.status_code, 404)
+
+    @override_settings(VIZUALIZARI_BUFFER='sync')
+    async def test_vizualizare_inregistrata_pentru_utilizator(self):
+        await self.async_client.aforce_login(self.user)
+        for name, obj in (('category_detail', await Category.objects.afirst()), ('index', None)):
+            response = await self.async_client.get(reverse(name, kwargs={'pk': obj.pk} if obj else None))
+            self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(reverse('book_detail', kwargs={'pk': self.books[1].pk}))
+        self.assertContains(response, reverse("logout"))  # bara de navigare vede utilizatorul din request.auser()
+        self.assertTrue(await Vizualizari.objects.filter(user=self.user, book=self.books[1]).aexists())
+
+    def test_bench_asgi_worker(self):
+        out = StringIO()
+        call_command('bench_asgi', worker='asgi', concurrency='1,2', duration=0.2, paths=['/'], stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual([result['concurrency'] for result in results], [1, 2])
+        self.assertTrue(all(result['requests'] > 0 and not result['errors'] for result in results))
+
+
+@override_settings(ROOT_URLCONF=AsyncUrlconf)
+class AsyncParallelQueriesTests(TransactionTestCase):
+    # Firele din pool au conexiunile lor, deci datele trebuie să fie comise (nu TestCase)
+    async def test_pagina_si_fatetele_pe_fire_separate(self):
+        await sync_to_async(creeaza_carti)(4)
+        threads = set()
+        compute_facets = facets.compute_facets
+
+        def spy(filters):
+            threads.add(threading.get_ident())
+            return compute_facets(filters)
+
+        counts = {}
+        for parallel in (False, True):
+            await cache.aclear()
+            with override_settings(CATALOG_PARALLEL_QUERIES=parallel), mock.patch.object(facets, 'compute_facets', spy), \
+                    self.assertLogs('aplicatie.acces', 'INFO') as logs:
+                response = await self.async_client.get(reverse('book_list'), {'total': 'on'}, headers=AJAX)
+            self.assertEqual(response.json()['total'], 4)
+            counts[parallel] = logs.records[0].db_queries
+        self.assertEqual(len(threads), 2)  # în paralel, fațetele nu rulează pe firul cererii
+        self.assertEqual(counts[True], counts[False])  # interogările de pe firele din pool sunt numărate
+
+
+class CatalogImportExportTests(TestCase):
+    CSV = (
+        'title,description,price,publication_date,stock,author,publisher,categories\n'
+        'Luceafărul,Poem,19.50,1883-04-01,4,Mihai Eminescu,Humanitas,Poezie|Clasici\n'
+        'Maitreyi,,30,,,Mircea Eliade,Polirom,Roman\n'
+        'Preț greșit,,abc,,,Mircea Eliade,Polirom,Roman\n'
+        ',,10,,,Mircea Eliade,Polirom,\n'
+        'Enigma Otiliei,,35.00,1938-01-01,2,George Călinescu,Polirom,Roman|Clasici\n'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.eminescu = Author.objects.create(name="Mihai Eminescu")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_import_csv_pe_bucati_cu_nume_rezolvate(self):
+        list_html = self.client.get(reverse('book_list')).content  # lista intră în cache
+        with CaptureQueriesContext(connection) as ctx:
+            result = catalog_io.import_catalog(StringIO(self.CSV), 'csv', chunk_size=2)
+        self.assertEqual((result['created'], result['updated'], result['skipped'], result['chunks']), (3, 0, 2, 2))
+        self.assertEqual([error['line'] for error in result['errors']], [4, 5])
+        self.assertLess(len(ctx.captured_queries), 40)  # în masă, nu câteva interogări pe rând
+
+        luceafarul = Book.objects.get(title="Luceafărul")
+        self.assertEqual(luceafarul.author, self.eminescu)  # autorul existent, găsit după nume
+        self.assertEqual((luceafarul.price, luceafarul.stock, luceafarul.publication_date), (Decimal('19.50'), 4, date(1883, 4, 1)))
+        self.assertEqual(sorted(luceafarul.categories.values_list('name', flat=True)), ['Clasici', 'Poezie'])
+        self.assertEqual(Author.objects.filter(name="Mircea Eliade").count(), 1)
+        self.assertEqual(Book.objects.get(title="Maitreyi").stock, 0)
+        self.assertEqual(set(Category.objects.get(name="Roman").books.values_list('title', flat=True)), {"Maitreyi", "Enigma Otiliei"})
+
+        # Fără semnale: indexul de căutare și cache-ul de catalog sunt actualizate de import
+        self.assertEqual(search.search_ids("otiliei", 10), [Book.objects.get(title="Enigma Otiliei").pk])
+        self.assertNotEqual(self.client.get(reverse('book_list')).content, list_html)
+        self.assertContains(self.client.get(reverse('book_list')), "Enigma Otiliei")
+
+    def test_export_si_reimport_actualizeaza_dupa_id(self):
+        books = creeaza_carti(3, author=self.eminescu)
+        detail_url = reverse('book_detail', kwargs={'pk': books[0].pk})
+        self.client.get(detail_url)
+        path = Path(self.tmp.name) / 'catalog.jsonl'
+        call_command('export_catalog', str(path), stderr=StringIO())
+        rows = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual([row['id'] for row in rows], [book.pk for book in books])
+        self.assertEqual(rows[0]['categories'], ["Poezie"])
+
+        rows[0].update(title="Titlu importat", author="Ion Creangă", categories=["Povești"])
+        del rows[1]['categories']  # fără coloană: categoriile rămân
+        path.write_text(''.join(json.dumps(row) + '\n' for row in rows), encoding='utf-8')
+        out = StringIO()
+        call_command('import_catalog', str(path), stdout=out, stderr=StringIO())
+        self.assertIn("0 cărți noi, 3 actualizate", out.getvalue())
+        self.assertEqual(Book.objects.count(), 3)
+        first = Book.objects.get(pk=books[0].pk)
+        self.assertEqual((first.title, first.author.name), ("Titlu importat", "Ion Creangă"))
+        self.assertEqual(list(first.categories.values_list('name', flat=True)), ["Povești"])
+        self.assertEqual(list(books[1].categories.values_list('name', flat=True)), ["Poezie"])
+        self.assertContains(self.client.get(detail_url), "Titlu importat")  # cardul din cache invalidat
+
+    def test_endpointuri_staff(self):
+        upload = SimpleUploadedFile('carti.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        self.assertEqual(self.client.post(reverse('catalog_import'), {'file': upload}).status_code, 302)  # login
+        staff = CustomUser.objects.create_user('staff', 'staff@example.com', 'parola-test', is_staff=True)
+        self.client.force_login(staff)
+        upload.seek(0)
+        result = self.client.post(reverse('catalog_import'), {'file': upload}).json()
+        self.assertEqual((result['created'], result['skipped']), (3, 2))
+        with self.assertLogs('django', 'WARNING'):
+            self.assertEqual(self.client.get(reverse('catalog_import')).status_code, 405)
+
+        response = self.client.get(reverse('catalog_export'), {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], ','.join(catalog_io.FIELDS))
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Clasici|Poezie', lines[1])
+
+
+class SyntheticDataTests(TestCase):
+    def snapshot(self):
+        return (
+            list(Book.objects.order_by('pk').values_list('title', 'price', 'stock', 'author__name', 'publisher__name')),
+            list(Book.categories.through.objects.order_by('pk').values_list('book__title', 'category__name')),
+            list(Order.objects.order_by('pk').values_list('book__title', 'quantity', 'status', 'created_at')),
+            list(CustomUser.objects.order_by('pk').values_list('username', 'reading_frequency', 'email_confirmat')),
+        )
+
+    def test_aceeasi_samanta_aceleasi_date(self):
+        counts = synthetic.plan(200, users=50)
+        with transaction.atomic():
+            first = synthetic.generate(counts, seed=7, chunk_size=64)
+            data = self.snapshot()
+            transaction.set_rollback(True)
+        second = synthetic.generate(counts, seed=7, chunk_size=50)  # altă împărțire pe bucăți, aceleași date
+        self.assertEqual(self.snapshot(), data)
+        self.assertEqual({name: second[name] for name in counts}, {name: first[name] for name in counts})
+        self.assertEqual((Book.objects.count(), Author.objects.count(), CustomUser.objects.count()), (200, 25, 51))
+        self.assertEqual(Order.objects.count(), counts['orders'])
+
+        # Distribuție asimetrică: titlurile "hit" adună mult peste media comenzilor
+        per_book = sorted(Book.objects.annotate(n=Count('orders')).values_list('n', flat=True), reverse=True)
+        self.assertGreater(per_book[0], 10 * counts['orders'] / counts['books'])
+        self.assertLess(Vizualizari.objects.aggregate(slot=Max('slot'))['slot'], settings.VIZUALIZARI_MAX)
+        self.assertTrue(Book.objects.filter(created_at__lt=timezone.now() - timedelta(days=30)).exists())  # fără auto_now_add
+
+        staff = CustomUser.objects.get(username=synthetic.STAFF_USERNAME)
+        self.assertTrue(staff.is_staff and staff.check_password(synthetic.PASSWORD))
+        title = Book.objects.order_by('pk').values_list('title', flat=True).first()
+        self.assertTrue(search.search_ids(title.split()[0], 10))  # indexat după inserarea în masă
+
+    def test_comanda_refuza_un_catalog_existent(self):
+        creeaza_carti(1)
+        with self.assertRaises(CommandError):
+            call_command('generate_data', books=10)
+        call_command('generate_data', books=10, force=True, stdout=StringIO())
+        self.assertEqual(Book.objects.count(), 11)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        synthetic.generate(synthetic.plan(40), seed=1)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_scenariile_ruleaza_fara_erori_si_nu_lasa_date(self):
+        users, promotions = CustomUser.objects.count(), TrimiterePromotie.objects.count()
+        with self.assertLogs('django', 'WARNING'):  # login_view și lista nefiltrată scriu avertismente
+            result = benchmark.run(requests=2)
+        self.assertEqual(set(result['scenarios']), {
+            'book_list', 'book_list_deep_cursor', 'book_list_deep_offset', 'book_detail', 'book_detail_logged_in',
+            'register', 'login', 'promotii', 'promotii_create',
+        })
+        for name, row in result['scenarios'].items():
+            self.assertEqual(row['errors'], 0, name)
+            self.assertGreater(row['queries_mean'], 0, name)
+            self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+        self.assertEqual(result['dataset']['books'], 40)
+        # Tranzacția rulării e anulată: nici utilizatorii de test, nici înregistrările sau promoțiile
+        self.assertEqual((CustomUser.objects.count(), TrimiterePromotie.objects.count()), (users, promotions))
+
+    def test_salvare_si_comparare(self):
+        result = benchmark.run(requests=1, warm=True, only=['book_detail'])
+        baseline_path = benchmark.save(result, self.tmp.name)
+        self.assertEqual(benchmark.latest(self.tmp.name), baseline_path)
+        self.assertIsNone(benchmark.latest(self.tmp.name, exclude=baseline_path))
+
+        slower = json.loads(json.dumps(result))
+        slower['scenarios']['book_detail']['p95_ms'] = result['scenarios']['book_detail']['p95_ms'] * 2 + 1
+        (row,) = benchmark.compare(slower, benchmark.load(baseline_path), threshold=0.2)
+        self.assertTrue(row['regression'])
+        (row,) = benchmark.compare(result, benchmark.load(baseline_path))
+        self.assertFalse(row['regression'])
+        self.assertEqual(benchmark.differences(result, benchmark.load(baseline_path)), [])
+        slower['options']['warm'] = False
+        self.assertEqual(benchmark.differences(slower, result), ['warm'])
+
+
+class OrderServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.books = creeaza_carti(2)
+        Book.objects.filter(pk=self.books[0].pk).update(stock=5)
+        Book.objects.filter(pk=self.books[1].pk).update(stock=1)
+        self.first, self.second = (book.pk for book in self.books)
+
+    def stock(self):
+        return list(Book.objects.order_by('pk').values_list('stock', flat=True))
+
+    def test_comanda_cu_mai_multe_linii_e_atomica(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            placed = orders.place_order([(self.second, 1), (self.first, 2), (self.first, 1)])
+        self.assertEqual([(order.book_id, order.quantity) for order in placed], [(self.first, 3), (self.second, 1)])
+        self.assertEqual({order.checkout for order in placed}, {placed[0].checkout})
+        self.assertTrue(all(order.status == 'PENDING' and order.expires_at > timezone.now() for order in placed))
+        self.assertEqual(self.stock(), [2, 0])
+
+        # A doua linie nu mai are stoc: nici prima nu rămâne rezervată
+        with self.assertRaises(orders.OutOfStock) as raised:
+            orders.place_order([(self.first, 1), (self.second, 1)])
+        self.assertEqual(raised.exception.book_ids, [self.second])
+        self.assertEqual(self.stock(), [2, 0])
+        self.assertEqual(Order.objects.count(), 2)
+        with self.assertRaises(ValueError):
+            orders.place_order([(self.first, 0)])
+
+    def test_anularea_si_expirarea_returneaza_stocul_o_singura_data(self):
+        canceled = orders.place_order([(self.first, 2)])[0].checkout
+        shipped = orders.place_order([(self.first, 1), (self.second, 1)])[0].checkout
+        expiring = orders.place_order([(self.first, 2)], ttl=timedelta(minutes=-1))[0].checkout
+        self.assertEqual(self.stock(), [0, 0])
+
+        self.assertEqual(orders.cancel_order(canceled), 1)
+        self.assertEqual(orders.cancel_order(canceled), 0)  # deja anulată
+        self.assertEqual(orders.ship_order(shipped), 2)
+        self.assertEqual(self.stock(), [2, 0])
+
+        later = timezone.now() + settings.ORDER_RESERVATION_TTL + timedelta(minutes=1)
+        self.assertEqual(orders.release_expired(now=later, batch_size=1), 1)  # cea expirată; cea expediată rămâne
+        self.assertEqual(orders.release_expired(now=later), 0)
+        self.assertEqual(self.stock(), [4, 0])
+        self.assertEqual(Order.objects.get(checkout=expiring).status, 'CANCELED')
+        self.assertEqual(set(Order.objects.filter(checkout=shipped).values_list('status', flat=True)), {'SHIPPED'})
+
+    def test_stocul_din_cache_e_invalidat(self):
+        url = reverse('book_detail', kwargs={'pk': self.first})
+        self.assertContains(self.client.get(url), 'Stoc:</strong> 5')  # cardul intră în cache
+        version = catalog_cache.get_version(catalog_cache.CATALOG)
+        with self.captureOnCommitCallbacks(execute=True):
+            orders.place_order([(self.first, 5)])
+        self.assertContains(self.client.get(url), 'Stoc:</strong> 0')
+        self.assertEqual(catalog_cache.get_version(catalog_cache.CATALOG), version)  # paginile listei rămân în cache
+
+
+class OrderStressTests(TransactionTestCase):
+    # Cumpărători pe fire cu conexiuni proprii, deci datele trebuie să fie comise (nu TestCase)
+    ARGS = ['--books', '2', '--stock', '40', '--checkouts', '200', '--buyers', '8']
+
+    def test_cumparatori_simultani_nu_vand_peste_stoc(self):
+        if connection.vendor == 'sqlite':
+            # Baza de test SQLite e în memorie, cu cache partajat (fără busy_timeout între conexiuni):
+            # comanda rulează într-un proces separat, pe un fișier nou cu WAL, ca în producție
+            tmp = tempfile.TemporaryDirectory()
+            self.addCleanup(tmp.cleanup)
+            env = {**os.environ, 'BOOKSTORE_DB': 'sqlite', 'SQLITE_PATH': str(Path(tmp.name) / 'stres.sqlite3')}
+            manage = [sys.executable, str(settings.BASE_DIR / 'manage.py')]
+            subprocess.run(manage + ['migrate', '-v0'], env=env, check=True)
+            finished = subprocess.run(manage + ['stress_orders', *self.ARGS], env=env, capture_output=True, text=True)
+            self.assertEqual(finished.returncode, 0, finished.stderr)
+            output = finished.stdout
+        else:
+            out = StringIO()
+            call_command('stress_orders', *self.ARGS, stdout=out)
+            output = out.getvalue()
+        self.assertIn('Stoc consistent', output)
+        self.assertRegex(output, r'200 comenzi .* [1-9]\d* fără stoc, 0 erori')
@@ -1,9 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
-urlpatterns = [
-    path('', views.index, name='index'),  # Pagina principală
-    path('books/', views.book_list, name='book_list'),
+
+def catalog_urls(catalog):
+    # Paginile de catalog, din views (WSGI) sau async_views (ASGI, vezi CATALOG_ASYNC_VIEWS)
+    return [
+        path('', catalog.index, name='index'),  # Pagina principală
+        path('books/', catalog.book_list, name='book_list'),
+        # Pagini detaliu pentru fiecare model   #<int:pk> trebuie să fie un număr întreg și că se va trimite în views.py sub numele pk
+        path('author/<int:pk>/', catalog.author_detail, name='author_detail'),
+        path('publisher/<int:pk>/', catalog.publisher_detail, name='publisher_detail'),
+        path('category/<int:pk>/', catalog.category_detail, name='category_detail'),
+        path('book/<int:pk>/', catalog.book_detail, name='book_detail'),  # Adăugat pentru detalii despre cărți
+    ]
+
+
+urlpatterns = catalog_urls(async_views if settings.CATALOG_ASYNC_VIEWS else views) + [
     path('books/create/', views.create_book, name='create_book'),
     path('contact/', views.contact, name='contact'),
     path('success/', views.success, name='success'),
@@ -13,12 +26,14 @@ urlpatterns = [
     path('profile/', views.profile, name='profile'),  # Rută pentru profil
     path('change-password/', views.change_password, name='change_password'),  # Rută pentru schimbarea parolei
     path('promotii/', views.promotii, name='promotii'),  # Rută pentru crearea promoțiilor
+    path('promotii/trimiteri/<int:pk>/', views.promotion_job_status, name='promotion_job_status'),  # Progresul trimiterii
+    path('staff/cache/', views.cache_stats, name='cache_stats'),  # Hit/miss pentru cache-ul de catalog
+    path('staff/mesaje/', views.contact_messages, name='contact_messages'),  # Mesajele de contact (JSON, paginat)
+    path('staff/catalog/import/', views.catalog_import, name='catalog_import'),  # Import în masă (CSV / JSON lines)
+    path('staff/catalog/export/', views.catalog_export, name='catalog_export'),  # Export în flux
+    path('metrics', views.metrics_view, name='metrics'),  # Scrape Prometheus
+    path('staff/profilare/', views.profiling_dashboard, name='profiling_dashboard'),  # Latențe și N+1 pe view
     path('user-data-with-confirmation/', views.user_data_with_confirmation, name='user_data_with_confirmation'),  # Noua rută
-    # Pagini detaliu pentru fiecare model   #<int:pk> trebuie să fie un număr întreg și că se va trimite în views.py sub numele pk
-    path('author/<int:pk>/', views.author_detail, name='author_detail'),
-    path('publisher/<int:pk>/', views.publisher_detail, name='publisher_detail'),
-    path('category/<int:pk>/', views.category_detail, name='category_detail'),
-    path('book/<int:pk>/', views.book_detail, name='book_detail'),  # Adăugat pentru detalii despre cărți
     path('review/<int:pk>/', views.review_detail, name='review_detail'),
     path('order/<int:pk>/', views.order_detail, name='order_detail'),
     path('user/<int:pk>/', views.user_detail, name='user_detail'),
@@ -0,0 +1,154 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import recent_views
+from .metrics import VIEW_BUFFER_DEPTH, VIEW_DROPPED, VIEW_FLUSH_DURATION
+
+logger = logging.getLogger('django')
+
+# Vizualizările din book_detail nu se mai scriu pe loc: se adaugă într-un buffer în
+# memorie, iar un fir de execuție separat le scrie în loturi (recent_views.record_views,
+# adică un upsert pe lot) la fiecare VIZUALIZARI_FLUSH_INTERVAL secunde sau când bufferul
+# ajunge la VIZUALIZARI_FLUSH_SIZE evenimente. Pagina de detaliu nu mai face nicio scriere.
+#
+# Adâncimea bufferului și durata flush-urilor se exportă la /metrics (VIEW_BUFFER_DEPTH,
+# VIEW_FLUSH_DURATION); metrics() dă aceleași date pentru procesul curent.
+#
+# VIZUALIZARI_BUFFER: 'thread' (implicit), 'manual' (fără fir, se apelează flush()) sau 'sync'.
+
+
+class ViewEventBuffer:
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._consecutive_failures = 0
+        self._stats = {
+            'flushes': 0,
+            'flushed_events': 0,
+            'dropped_events': 0,
+            'failed_flushes': 0,
+            'last_flush_seconds': 0.0,
+            'max_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0,
+        }
+
+    def add(self, user_id, book_id, date_viewed=None):
+        event = (user_id, book_id, date_viewed or timezone.now())
+        with self._lock:
+            self._events.append(event)
+            depth = len(self._events)
+            # Protecție la memorie dacă baza de date nu mai acceptă scrieri: renunțăm la cele mai vechi
+            overflow = depth - settings.VIZUALIZARI_BUFFER_MAX
+            if overflow > 0:
+                del self._events[:overflow]
+                self._stats['dropped_events'] += overflow
+        if overflow > 0:
+            VIEW_DROPPED.inc(overflow)
+        if depth >= settings.VIZUALIZARI_FLUSH_SIZE:
+            self._wakeup.set()
+
+    def depth(self):
+        with self._lock:
+            return len(self._events)
+
+    def pending_for(self, user_id):
+        # Evenimentele încă nescrise ale unui utilizator (pentru widget-ul "Văzute recent")
+        with self._lock:
+            return [book_id for uid, book_id, _ in self._events if uid == user_id]
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+            started = time.perf_counter()
+            try:
+                written = recent_views.record_views(events, batch_size=settings.VIZUALIZARI_FLUSH_SIZE)
+            except Exception:
+                dropped = 0
+                with self._lock:
+                    self._stats['failed_flushes'] += 1
+                    self._consecutive_failures += 1
+                    if self._consecutive_failures < 3:
+                        self._events[:0] = events  # reîncercăm la următorul flush
+                    else:
+                        # Probabil un eveniment invalid (carte/utilizator șters): nu blocăm bufferul la infinit
+                        self._stats['dropped_events'] += len(events)
+                        self._consecutive_failures = 0
+                        dropped = len(events)
+                # În afara lock-ului: metricile pot colecta gauge-ul, care citește depth()
+                VIEW_FLUSH_DURATION.observe(time.perf_counter() - started, result='error')
+                VIEW_DROPPED.inc(dropped)
+                logger.exception("Scrierea a %s vizualizări din buffer a eșuat.", len(events))
+                return 0
+            self._consecutive_failures = 0
+            elapsed = time.perf_counter() - started
+            VIEW_FLUSH_DURATION.observe(elapsed, result='ok')
+            with self._lock:
+                self._stats['flushes'] += 1
+                self._stats['flushed_events'] += len(events)
+                self._stats['last_flush_seconds'] = elapsed
+                self._stats['max_flush_seconds'] = max(self._stats['max_flush_seconds'], elapsed)
+                self._stats['total_flush_seconds'] += elapsed
+            logger.debug(f"Buffer vizualizări: {len(events)} evenimente -> {written} rânduri în {elapsed * 1000:.1f} ms.")
+            return len(events)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats, depth=len(self._events))
+        stats['avg_flush_seconds'] = stats['total_flush_seconds'] / stats['flushes'] if stats['flushes'] else 0.0
+        return stats
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.VIZUALIZARI_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='vizualizari-flusher', daemon=True)
+                self._thread.start()
+
+
+buffer = ViewEventBuffer()
+VIEW_BUFFER_DEPTH.set_function(buffer.depth)
+
+
+def record(user_id, book_id):
+    mode = settings.VIZUALIZARI_BUFFER
+    if mode == 'sync':
+        recent_views.record_view(user_id, book_id)
+        return
+    buffer.add(user_id, book_id)
+    if mode == 'thread':
+        buffer.ensure_started()
+
+
+def metrics():
+    return buffer.metrics()
+
+
+@atexit.register
+def _flush_on_exit():
+    # La oprirea procesului nu pierdem ce a rămas în buffer
+    try:
+        buffer.flush()
+    except Exception:
+        pass
@@ -2,7 +2,7 @@ import logging
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
-from .models import Book, Author, Publisher, Category, Review, Order, CustomUser, Vizualizari, Promotii
+from .models import Book, Author, Publisher, Category, Review, Order, CustomUser, Vizualizari, Promotii, TrimiterePromotie
 from .forms import BookFilterForm, BookForm, UserRegistrationForm, CustomLoginForm, ContactForm, PromotionForm  
 from django.core.files.storage import default_storage
 from datetime import datetime, timedelta
@@ -23,6 +23,9 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.exceptions import PermissionDenied
 from django.contrib import messages
 import uuid
+import io
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
 from django.template.loader import render_to_string
@@ -32,6 +35,12 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django import forms
 from django.views.generic import ListView
+from .pagination import KeysetPaginator
+from . import search, facets, promotions, view_events, catalog_cache, catalog_io, profiling, metrics, contact_store
+from django.utils.safestring import mark_safe
+from django.db.models import Q, Prefetch
+from django.utils import timezone
+from django.core.cache import cache
 
 
 logger = logging.getLogger('django')
@@ -56,47 +65,31 @@ def book_list(request):
     logger.info("Accesare lista de cărți - INFO 1: Utilizatorul a accesat lista de cărți.")
     messages.info(request, "INFO: Filtrele sunt disponibile pentru a restrânge rezultatele listei de cărți.")
 
-    # 1) Form + queryset de bază
+    # 1) Form (validarea e ieftină; partea scumpă e în _build_book_list și e cache-uită)
     form = BookFilterForm(request.GET or None)
-    qs = Book.objects.all()
-
-    # 2) Aplic filtru doar dacă e valid și câmpurile sunt completate
-    if form.is_valid():
-        cd = form.cleaned_data
-        if cd.get('title'):
-            qs = qs.filter(title__icontains=cd['title'])
-        if cd.get('author'):
-            qs = qs.filter(author=cd['author'])
-        if cd.get('publisher'):
-            qs = qs.filter(publisher=cd['publisher'])
-        if cd.get('category'):
-            qs = qs.filter(categories=cd['category'])
-        if cd.get('min_price') is not None:
-            qs = qs.filter(price__gte=cd['min_price'])
-        if cd.get('max_price') is not None:
-            qs = qs.filter(price__lte=cd['max_price'])
-        if cd.get('publication_date'):
-            qs = qs.filter(publication_date=cd['publication_date'])
-        if cd.get('stock') is not None:
-            qs = qs.filter(stock=cd['stock'])
-    else:
+    if not form.is_valid():
         logger.warning("Accesare lista de cărți - WARNING 1: Formularul de filtrare nu este valid.")
         messages.warning(request, "WARNING: Ați trimis formularul de contact de prea multe ori. Vă rugăm să așteptați sau să contactați suportul.")
 
-    # 3) Paginare (după filtrare)
-    paginator = Paginator(qs, 10)  # 10 carti pe pagina
-    page_number = request.GET.get('page')   #ia nr paginii cerute
-    page_obj = paginator.get_page(page_number)   #returneaza obiectul cu elementele din pagina
+    # 2) Tabelul, paginarea și fațetele nu depind de utilizator: cache pe combinația de parametri
+    data = catalog_cache.get_or_build(
+        'book_list',
+        [catalog_cache.get_version(catalog_cache.CATALOG), settings.BOOK_LIST_PAGINATION, catalog_cache.params_key(request.GET)],
+        lambda: _build_book_list(request, form),
+        timeout=settings.CATALOG_LIST_CACHE_TIMEOUT,
+    )
 
     # 4) AJAX: returnez doar partial-ul ca HTML în JSON
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         logger.debug("Cerere AJAX primită pentru listarea/filtrarea cărților (cu paginare).")
-        books_html = render_to_string(
-            'aplicatie/book_list_partial.html',
-            {'page_obj': page_obj},
-            request=request
-        )
-        return JsonResponse({'books_html': books_html}, status=200)
+        return JsonResponse({
+            'books_html': data['books_html'],
+            'filters_html': data['filters_html'],
+            'facets': data['facets'],
+            'next': data['next'],
+            'prev': data['prev'],
+            'total': data['total'],
+        }, status=200)
 
     # 5) Răspuns normal: pagina completă
     return render(
@@ -104,12 +97,104 @@ def book_list(request):
         'aplicatie/book_list.html',
         {
             'form': form,
-            'page_obj': page_obj,
-            'books': page_obj.object_list,  # alias, ca să nu mai dea "Unresolved reference 'books'"
+            'books_html': mark_safe(data['books_html']),
+            'filters_html': mark_safe(data['filters_html']),
+            'total': data['total'],
+            'facets': data['facets'],
         }
     )
 
 
+def _build_book_list(request, form):
+    qs, filters, ranked_ids = _filter_books(form)
+    book_facets = facets.compute_facets(filters)
+    page_obj = _paginate_books(request, form, qs, ranked_ids)
+
+    # Totalul e opțional și vine din cache, ca să nu rulăm COUNT(*) la fiecare pagină
+    total = None
+    if form.is_valid() and form.cleaned_data.get('total'):
+        total = cached_count(qs, request.GET)
+    return _book_list_data(request, form, page_obj, book_facets, total)
+
+
+def _filter_books(form):
+    # -> (queryset filtrat, filtrele ca Q pe câmp, id-urile căutării full-text sau None)
+    qs = Book.objects.for_list()  # autor/editură prin JOIN, categorii prefetch
+
+    # Aplic filtru doar dacă e valid și câmpurile sunt completate
+    filters = {}  # câmp -> Q, refolosite și la calculul fațetelor
+    ranked_ids = None  # rezultatele căutării full-text, în ordinea relevanței
+    if form.is_valid():
+        cd = form.cleaned_data
+        if cd.get('q'):
+            ranked_ids = search.search_ids(cd['q'], settings.SEARCH_MAX_RESULTS)
+            if ranked_ids is None:  # fără index full-text pe baza de date curentă
+                filters['q'] = Q(title__icontains=cd['q']) | Q(author__name__icontains=cd['q']) | Q(publisher__name__icontains=cd['q'])
+            else:
+                filters['q'] = Q(pk__in=ranked_ids)
+        filters.update(form.get_filters())
+        qs = qs.filter(*filters.values())
+    return qs, filters, ranked_ids
+
+
+def _paginate_books(request, form, qs, ranked_ids):
+    # 3) Paginare (după filtrare): cursor pe (created_at, id) / (price, id) sau clasic pe pagini
+    ordering = form.get_ordering()
+    page_size = settings.BOOK_LIST_PAGE_SIZE
+    if ranked_ids is not None:
+        # Căutare: lista de id-uri e mărginită (SEARCH_MAX_RESULTS), deci paginăm pe ea direct
+        allowed = set(qs.values_list('pk', flat=True))
+        paginator = Paginator([pk for pk in ranked_ids if pk in allowed], page_size)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        books = qs.in_bulk(page_obj.object_list)
+        page_obj.object_list = [books[pk] for pk in page_obj.object_list]
+    elif settings.BOOK_LIST_PAGINATION == 'cursor':
+        page_obj = KeysetPaginator(qs, page_size, ordering).get_page(request.GET.get('cursor'))
+    else:
+        paginator = Paginator(qs.order_by(*ordering), page_size)
+        page_number = request.GET.get('page')   #ia nr paginii cerute
+        page_obj = paginator.get_page(page_number)   #returneaza obiectul cu elementele din pagina
+    return page_obj
+
+
+def _book_list_data(request, form, page_obj, book_facets, total):
+    # Numărul de rezultate pentru fiecare opțiune din filtre; opțiunile cu 0 dispar din formular
+    form.apply_facets(book_facets)
+    books_html = render_to_string(
+        'aplicatie/book_list_partial.html',
+        {'page_obj': page_obj, 'total': total, 'facets': book_facets},
+        request=request
+    )
+    return {
+        'books_html': books_html,
+        'filters_html': form.as_p(),  # dropdown-urile filtrate după fațete (interogări) intră și ele în cache
+        'facets': book_facets,
+        'next': getattr(page_obj, 'next_cursor', None),
+        'prev': getattr(page_obj, 'prev_cursor', None),
+        'total': total,
+    }
+
+
+def cached_count(qs, params):
+    # Numărul total pentru o combinație de filtre, comun tuturor paginilor ei
+    return catalog_cache.get_or_build(
+        'book_list_count',
+        [catalog_cache.get_version(catalog_cache.CATALOG), catalog_cache.params_key(params, ignore=('cursor', 'page', 'total'))],
+        qs.count,
+        timeout=settings.BOOK_LIST_COUNT_TIMEOUT,
+    )
+
+
+def _contact_attempt(request):
+    # Numărul de trimiteri ale formularului de contact de pe acest IP în ultima fereastră
+    key = f"contact:{request.META.get('REMOTE_ADDR', '')}"
+    cache.add(key, 0, settings.CONTACT_THROTTLE_WINDOW)
+    try:
+        return cache.incr(key)
+    except ValueError:  # cheia a expirat între add și incr
+        cache.set(key, 1, settings.CONTACT_THROTTLE_WINDOW)
+        return 1
+
 def contact(request):
     logger.info("Accesare/Procesare formular contact")
 
@@ -140,22 +225,15 @@ def contact(request):
                     'mesaj': mesaj,
                 }
 
-                # --- Throttling simplu pe sesiune ---
-                attempts = request.session.setdefault('contact_attempts', 0)
-                request.session['contact_attempts'] = attempts + 1
-                if request.session['contact_attempts'] > 3:
+                # --- Throttling simplu pe IP, în cache (nu creează/rescrie sesiuni pentru vizitatori) ---
+                if _contact_attempt(request) > 3:
                     messages.warning(request,
                                      "WARNING: Ați trimis formularul de prea multe ori. Vă rugăm să așteptați.")
                 #mesaj!!!!
-                # --- Salvare JSON în <BASE_DIR>/mesaje/ ---
-                dir_path = os.path.join(settings.BASE_DIR, 'mesaje')
-                os.makedirs(dir_path, exist_ok=True)
-                filename = os.path.join(dir_path, f'mesaj_{int(datetime.timestamp(datetime.now()))}.json')
+                # --- Salvare în jurnalul de mesaje (<BASE_DIR>/mesaje/mesaje.jsonl, vezi contact_store.py) ---
+                message_id = contact_store.get_store().append(data)
 
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
-
-                logger.info("Mesaj salvat cu succes în %s", filename)
+                logger.info("Mesaj #%s salvat cu succes", message_id)
                 messages.success(request, "SUCCESS: Formularul a fost trimis cu succes!")
                 return redirect('success')
             else:
@@ -214,7 +292,7 @@ def register(request):
             }
             message = render_to_string('aplicatie/email_confirmation.html', context)
             try:
-                send_mail(
+                sent = send_mail(
                     subject,
                     '',  # Corpul textului simplu (nu e necesar, deoarece folosim HTML)
                     settings.DEFAULT_FROM_EMAIL,  # Adresa expeditorului (fictivă, conform cerinței)
@@ -222,8 +300,10 @@ def register(request):
                     html_message=message,  # Folosim HTML pentru template
                     fail_silently=True,  # Evită erori dacă e-mailul e configurat ca dummy
                 )
+                metrics.EMAILS.inc(flow='register', result='sent' if sent else 'failed')
                 logger.info(f"E-mail de confirmare trimis către {user.email}.")
             except Exception as e:
+                metrics.EMAILS.inc(flow='register', result='failed')
                 logger.error(f"Eroare la trimiterea e-mailului de confirmare: {e}")
 
             # Mesaje de tip SUCCESS (2 locații relevante, conform cerinței anterioare)
@@ -271,16 +351,10 @@ def login_view(request):
         form = CustomLoginForm()
     return render(request, 'aplicatie/login.html', {'form': form})
 
-@login_required
-def user_data_with_confirmation(request):
-    """Afișează datele utilizatorului și linkul de confirmare a e-mailului (dacă este necesar)."""
+def _store_user_data(request):
+    # Sesiunea se salvează doar dacă datele s-au schimbat (altfel fiecare vizită ar rescrie-o)
     user = request.user
-    confirmation_link = None
-    if not user.email_confirmat and user.cod:
-        confirmation_link = request.build_absolute_uri(f'/confirma_mail/{user.cod}/')
-
-    # Stochează datele utilizatorului în sesiune (pentru consistență cu profile)
-    request.session['user_data'] = {
+    data = {
         'username': user.username,
         'email': user.email,
         'first_name': user.first_name,
@@ -291,6 +365,19 @@ def user_data_with_confirmation(request):
         'address': user.address,
         'reading_frequency': user.reading_frequency,
     }
+    if request.session.get('user_data') != data:
+        request.session['user_data'] = data
+
+@login_required
+def user_data_with_confirmation(request):
+    """Afișează datele utilizatorului și linkul de confirmare a e-mailului (dacă este necesar)."""
+    user = request.user
+    confirmation_link = None
+    if not user.email_confirmat and user.cod:
+        confirmation_link = request.build_absolute_uri(f'/confirma_mail/{user.cod}/')
+
+    # Stochează datele utilizatorului în sesiune (pentru consistență cu profile)
+    _store_user_data(request)
     
     # Mesaje de tip INFO (2 locații relevante, conform cerinței anterioare)
     messages.info(request, "INFO: Aici vă puteți vizualiza datele personale și confirma e-mailul, dacă este necesar.")
@@ -305,17 +392,7 @@ def user_data_with_confirmation(request):
 def profile(request):
     # Păstrăm profilul existent pentru compatibilitate, dar îl vom folosi mai puțin
     # Stochează datele utilizatorului în sesiune
-    request.session['user_data'] = {
-        'username': request.user.username,
-        'email': request.user.email,
-        'first_name': request.user.first_name,
-        'last_name': request.user.last_name,
-        'favorite_genre': request.user.favorite_genre,
-        'birth_date': request.user.birth_date.isoformat() if request.user.birth_date else None,
-        'phone_number': request.user.phone_number,
-        'address': request.user.address,
-        'reading_frequency': request.user.reading_frequency,
-    }
+    _store_user_data(request)
     
     # Mesaje de tip INFO (2 locații relevante, conform cerinței anterioare)
     messages.info(request, "INFO: Aici vă puteți vizualiza datele personale.")
@@ -352,27 +429,133 @@ def change_password(request):
     return render(request, 'aplicatie/change_password.html')
 
 # View-uri pentru paginile detaliu ale modelelor
+# Cardul fiecărui obiect e cache-uit pe versiunea obiectului (invalidată prin semnale),
+# deci o pagină nemodificată nu mai atinge baza de date pentru catalog.
+def _cached_card(request, kind, pk, template, load):
+    def build():
+        obj = load()  # poate ridica Http404
+        return render_to_string(template, {kind: obj}, request=request)
+    html = catalog_cache.get_or_build(f'{kind}_detail', [pk, catalog_cache.get_version(kind, pk)], build)
+    return mark_safe(html)
+
 def author_detail(request, pk):
-    author = get_object_or_404(Author, pk=pk)
-    return render(request, 'aplicatie/author_detail.html', {'author': author})
+    card_html = _cached_card(request, 'author', pk, 'aplicatie/author_detail_card.html',
+                             lambda: get_object_or_404(Author.objects.prefetch_related('books'), pk=pk))
+    return render(request, 'aplicatie/catalog_detail.html', {'card_html': card_html})
 
 def publisher_detail(request, pk):
-    publisher = get_object_or_404(Publisher, pk=pk)
-    return render(request, 'aplicatie/publisher_detail.html', {'publisher': publisher})
+    card_html = _cached_card(request, 'publisher', pk, 'aplicatie/publisher_detail_card.html',
+                             lambda: get_object_or_404(Publisher.objects.prefetch_related('books'), pk=pk))
+    return render(request, 'aplicatie/catalog_detail.html', {'card_html': card_html})
 
 def category_detail(request, pk):
-    category = get_object_or_404(Category, pk=pk)
-    return render(request, 'aplicatie/category_detail.html', {'category': category})
+    card_html = _cached_card(request, 'category', pk, 'aplicatie/category_detail_card.html',
+                             lambda: get_object_or_404(Category.objects.prefetch_related(
+                                 'books',
+                                 Prefetch('promotii', queryset=Promotii.objects.filter(date_expiry__gte=timezone.now()),
+                                          to_attr='promotii_active'),
+                             ), pk=pk))
+    return render(request, 'aplicatie/catalog_detail.html', {'card_html': card_html})
 
 def book_detail(request, pk):
-    book = get_object_or_404(Book, pk=pk)
-    # Salvează vizualizarea în tabelul Vizualizari, dacă utilizatorul este autentificat
+    card_html = _cached_card(request, 'book', pk, 'aplicatie/book_detail_card.html',
+                             lambda: get_object_or_404(Book.objects.with_related(), pk=pk))
+    # Vizualizarea intră în buffer și e scrisă în lot de firul de flush (fără scrieri pe request)
     if request.user.is_authenticated:
-        Vizualizari.objects.get_or_create(
-            user=request.user,
-            book=book
-        )
-    return render(request, 'aplicatie/book_detail.html', {'book': book})
+        view_events.record(request.user.pk, pk)
+    return render(request, 'aplicatie/book_detail.html', {'card_html': card_html, 'book_pk': pk})
+
+@login_required
+@require_staff_login
+def profiling_dashboard(request):
+    # p50/p95/p99 pe view și interogările suspecte de N+1, din toate procesele
+    if request.method == 'POST':
+        profiling.registry.reset()
+        return redirect('profiling_dashboard')
+    rows = []
+    for view, profile in profiling.registry.merged().items():
+        latency = profile.sketches['latency_ms']
+        rows.append({
+            'view': view,
+            'count': latency.count,
+            'p50': latency.quantile(0.5),
+            'p95': latency.quantile(0.95),
+            'p99': latency.quantile(0.99),
+            'queries': profile.sketches['db_queries'].mean(),
+            'db_p95': profile.sketches['db_ms'].quantile(0.95),
+            'template_p95': profile.sketches['template_ms'].quantile(0.95),
+            'size': profile.sketches['size'].mean(),
+            'n_plus_one': sorted(profile.n_plus_one.items(), key=lambda item: -item[1]['max_repeats']),
+        })
+    rows.sort(key=lambda row: row['p95'], reverse=True)
+    return render(request, 'aplicatie/profilare.html', {'rows': rows, 'threshold': settings.PROFILING_N_PLUS_ONE})
+
+def metrics_view(request):
+    # Formatul text Prometheus; dacă METRICS_TOKEN e setat, scraper-ul trimite "Authorization: Bearer <token>"
+    if settings.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        raise PermissionDenied("Token invalid pentru /metrics.")
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@login_required
+@require_staff_login
+def cache_stats(request):
+    # Hit/miss pe fiecare zonă cache-uită, pentru verificarea eficienței cache-ului
+    return JsonResponse(catalog_cache.stats())
+
+@login_required
+@require_staff_login
+def contact_messages(request):
+    # Mesajele de contact, paginate după cursor (?before=<id>), filtrabile după tip_mesaj, email și dată
+    # (since/until: YYYY-MM-DD sau ISO, UTC); citește din jurnal doar mesajele paginii
+    try:
+        limit = min(int(request.GET.get('limit', 50)), 200)
+        before = int(request.GET['before']) if request.GET.get('before') else None
+    except ValueError:
+        return JsonResponse({'error': 'Parametri invalizi.'}, status=400)
+    results, next_cursor = contact_store.get_store().query(
+        tip_mesaj=request.GET.get('tip_mesaj'),
+        email=request.GET.get('email'),
+        since=request.GET.get('since'),
+        until=request.GET.get('until'),
+        before=before,
+        limit=max(limit, 1),
+    )
+    next_url = None
+    if next_cursor is not None:
+        params = request.GET.copy()
+        params['before'] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+    return JsonResponse({'results': results, 'next': next_url})
+
+
+@login_required
+@require_staff_login
+@require_POST
+def catalog_import(request):
+    # Import în masă (multipart: file=<CSV sau JSON lines>, format opțional); fișierele mari
+    # ajung pe disc la upload și se citesc în flux, pe bucăți (vezi catalog_io.py)
+    upload = request.FILES.get('file')
+    fmt = request.POST.get('format') or (upload and catalog_io.detect_format(upload.name))
+    if upload is None or fmt not in catalog_io.FORMATS:
+        return JsonResponse({'error': 'Trimiteți un fișier CSV sau JSON lines în câmpul "file".'}, status=400)
+    stream = io.TextIOWrapper(upload.open('rb'), encoding='utf-8-sig', newline='')
+    try:
+        result = catalog_io.import_catalog(stream, fmt)
+    finally:
+        stream.detach()
+    return JsonResponse(result)
+
+
+@login_required
+@require_staff_login
+def catalog_export(request):
+    # Export în flux (?format=csv|jsonl), dintr-un singur instantaneu al bazei
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in catalog_io.FORMATS:
+        return JsonResponse({'error': 'Format necunoscut.'}, status=400)
+    response = StreamingHttpResponse(catalog_io.export_lines(fmt), content_type=f'{catalog_io.FORMATS[fmt]}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="catalog-{timezone.localdate():%Y%m%d}.{fmt}"'
+    return response
 
 def review_detail(request, pk):
     review = get_object_or_404(Review, pk=pk)
@@ -407,52 +590,30 @@ def promotii(request):
         form = PromotionForm(request.POST)
         if form.is_valid():
             promotion = form.save()
-            # Găsește utilizatorii eligibili pentru promoții
-            categories = promotion.categories.all()
-            email_count = 0  # Contor pentru numărul de e-mailuri trimise
-            
-            for category in categories:
-                # Găsește utilizatorii care au vizualizat cel puțin un produs din această categorie
-                viewed_books = Vizualizari.objects.filter(book__categories=category).values('user').distinct()
-                users = CustomUser.objects.filter(id__in=[v['user'] for v in viewed_books], email_confirmat=True)
-                
-                # Alege template-ul de e-mail în funcție de categorie
-                if category.name == 'Poezie':
-                    template_name = 'aplicatie/email_promotion_poetry.html'
-                elif category.name == 'Ficțiune':
-                    template_name = 'aplicatie/email_promotion_fiction.html'
-                else:
-                    continue  # Ignoră categoriile fără template
-
-                for user in users:
-                    context = {
-                        'user': user,
-                        'promotion': promotion,
-                        'expiry_date': promotion.date_expiry,
-                    }
-                    # Subiect și mesaj implicite, bazate pe nume și categorie
-                    subject = f"Promoție {promotion.name} - {category.name}"
-                    html_message = render_to_string(template_name, context)
-                    # Trimite e-mail individual folosind send_mail() cu suport HTML
-                    try:
-                        send_mail(
-                            subject,
-                            '',  # Corpul textului simplu (nu e necesar, deoarece folosim HTML)
-                            settings.DEFAULT_FROM_EMAIL,
-                            [user.email],
-                            html_message=html_message,  # Folosim HTML pentru template
-                            fail_silently=True,  # Evită erori dacă e-mailul e configurat ca dummy
-                        )
-                        email_count += 1
-                    except Exception as e:
-                        logger.error(f"Eroare la trimiterea e-mailului pentru utilizatorul {user.email}: {e}")
-            
-            if email_count > 0:
-                logger.info(f"Promoție {promotion.name} trimisă către {email_count} utilizatori.")
-            
-            messages.success(request, "Promoția a fost creată și e-mailurile au fost trimise cu succes!")
+            # E-mailurile pleacă în fundal; aici doar creăm job-ul și răspundem imediat
+            job = TrimiterePromotie.objects.create(promotion=promotion)
+            promotions.enqueue(job)
+            logger.info(f"Promoție {promotion.name} creată, trimiterea #{job.pk} a fost pusă în coadă.")
+            messages.success(request, f"Promoția a fost creată! E-mailurile se trimit în fundal (trimiterea #{job.pk}).")
             return redirect('promotii')
     else:
         form = PromotionForm()
-    
-    return render(request, 'aplicatie/promotii.html', {'form': form})
\ No newline at end of file
+
+    jobs = TrimiterePromotie.objects.select_related('promotion')[:10]
+    return render(request, 'aplicatie/promotii.html', {'form': form, 'jobs': jobs})
+
+@login_required
+@require_staff_login
+def promotion_job_status(request, pk):
+    # Progresul unei trimiteri, interogat periodic din pagina de promoții
+    job = get_object_or_404(TrimiterePromotie, pk=pk)
+    return JsonResponse({
+        'id': job.pk,
+        'promotion': job.promotion.name,
+        'status': job.status,
+        'total': job.total,
+        'sent': job.sent,
+        'failed': job.failed,
+        'error': job.error,
+        'finished_at': job.finished_at,
+    })
\ No newline at end of file
@@ -2,6 +2,7 @@ from pathlib import Path
 import logging
 import logging.config
 import os
+from datetime import timedelta
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,10 +24,12 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'widget_tweaks',
     'aplicatie.apps.AplicatieConfig',
-    'django_crontab',
 ]  
 
 MIDDLEWARE = [
+    'aplicatie.middleware.StaticAssetMiddleware',  # fișierele statice, fără restul lanțului (dacă STATIC_SERVE)
+    'aplicatie.middleware.RequestLogMiddleware',  # primul: măsoară toată cererea (vezi logs/app.jsonl)
+    'aplicatie.middleware.ProfilingMiddleware',  # histograme pe view (pagina staff/profilare/)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,7 +43,7 @@ ROOT_URLCONF = 'bookstore.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'aplicatie.profiling.TimedDjangoTemplates',  # DjangoTemplates + timpul de randare
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -59,12 +62,61 @@ WSGI_APPLICATION = 'bookstore.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Profilul bazei de date se alege din mediu: BOOKSTORE_DB = 'sqlite' (implicit) sau 'postgres'
+BOOKSTORE_DB = os.environ.get('BOOKSTORE_DB', 'sqlite')
+
+if BOOKSTORE_DB == 'postgres':
+    def postgres_database(host):
+        database = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'bookstore'),
+            'USER': os.environ.get('POSTGRES_USER', 'bookstore'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': host,
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'OPTIONS': {},
+        }
+        if os.environ.get('POSTGRES_POOL', '1') == '1':
+            # Pool psycopg (pip install "psycopg[pool]"); nu se combină cu CONN_MAX_AGE > 0
+            database['OPTIONS']['pool'] = {
+                'min_size': int(os.environ.get('POSTGRES_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('POSTGRES_POOL_MAX', 10)),
+                'timeout': 10,
+            }
+        else:
+            # Fără pool: conexiuni persistente, verificate înainte de refolosire
+            database['CONN_MAX_AGE'] = int(os.environ.get('POSTGRES_CONN_MAX_AGE', 600))
+            database['CONN_HEALTH_CHECKS'] = True
+        return database
+
+    DATABASES = {'default': postgres_database(os.environ.get('POSTGRES_HOST', 'localhost'))}
+    if os.environ.get('POSTGRES_REPLICA_HOST'):
+        # Citirile de catalog merg pe replică (vezi aplicatie/routers.py); în teste replica e chiar 'default'
+        DATABASES['replica'] = postgres_database(os.environ['POSTGRES_REPLICA_HOST'])
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+else:
+    # Instalare pe un singur nod: WAL (cititorii nu mai blochează scriitorul), sincronizare NORMAL,
+    # așteptare la lock în loc de "database is locked" și tranzacții IMMEDIATE pentru scrieri.
+    # init_command rulează la fiecare conexiune nouă (echivalentul unui hook connection_created).
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),  # ex. o bază separată pentru benchmark
+            'OPTIONS': {
+                'timeout': 20,  # secunde (busy_timeout)
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=134217728;'  # 128 MB
+                    'PRAGMA cache_size=-20000;'  # ~20 MB
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
     }
-}
+
+DATABASE_ROUTERS = ['aplicatie.routers.CatalogReplicaRouter']
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -103,6 +155,19 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",  # Păstrăm pentru a include logo.png
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# 'simple': fișierele copiate ca atare (implicit Django); 'compressed': nume cu hash + manifest,
+# PNG/JPEG optimizate și variante .br/.gz la collectstatic (aplicatie/static_storage.py)
+STATIC_ASSETS = os.environ.get('STATIC_ASSETS', 'simple')
+if STATIC_ASSETS == 'compressed':
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'aplicatie.static_storage.CompressedManifestStorage'},
+    }
+# Servirea STATIC_ROOT din aplicație (middleware.StaticAssetMiddleware), cu cache și compresie
+STATIC_SERVE = os.environ.get('STATIC_SERVE', '1' if STATIC_ASSETS == 'compressed' else '0') == '1'
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600  # fișierele cu hash în nume
+STATIC_MAX_AGE = 60  # celelalte (revalidate prin ETag)
+STATIC_JPEG_QUALITY = 85
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -113,6 +178,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'aplicatie.CustomUser'
 
 # Configurație Logging
+# Fișierele pe niveluri: fiecare primește înregistrările de la nivelul lui în sus
+LOG_DIR = BASE_DIR / 'logs'
+LOG_FILES = {
+    'DEBUG': LOG_DIR / 'debug.log',
+    'INFO': LOG_DIR / 'info.log',
+    'WARNING': LOG_DIR / 'warning.log',
+    'ERROR': LOG_DIR / 'error.log',
+    'CRITICAL': LOG_DIR / 'critical.log',
+}
+JSON_LOG_FILE = LOG_DIR / 'app.jsonl'
+# 'external' (implicit): fiecare proces doar adaugă, rotirea o face logrotate, deci merge cu oricâți
+# workeri; 'size' (10 MB) sau 'time' (la miezul nopții) rotesc în proces, doar cu un singur proces
+LOG_ROTATION = os.environ.get('LOG_ROTATION', 'external')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -127,6 +206,21 @@ LOGGING = {
             'format': '{levelname}: {message}',
             'style': '{'
         },
+        'json': {
+            '()': 'aplicatie.jurnalizare.JsonFormatter',
+        },
+    },
+    'filters': {
+        # Cel mult 5 rânduri DEBUG/INFO pe secundă din același loc din cod
+        'esantionare': {
+            '()': 'aplicatie.jurnalizare.SamplingFilter',
+            'burst': 5,
+            'interval': 1.0,
+        },
+        # request_id, view, user_id etc. din cererea curentă
+        'context_cerere': {
+            '()': 'aplicatie.jurnalizare.RequestContextFilter',
+        },
     },
     'handlers': {
         'console': {
@@ -134,42 +228,41 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple'
         },
-        'debug_file': {
-            'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/debug.log',
-            'formatter': 'verbose'
+        # Un singur handler pe firul cererii: pune înregistrarea în coadă; un fir separat
+        # scrie în LOG_FILES (vezi aplicatie/jurnalizare.py)
+        'fisiere': {
+            '()': 'aplicatie.jurnalizare.QueueLogHandler',
+            'files': LOG_FILES,
+            'rotation': LOG_ROTATION,
+            'max_bytes': 10 * 1024 * 1024,
+            'backup_count': 5,
+            'compress': True,
+            'formatter': 'verbose',
         },
-        'info_file': {
+        # Jurnal structurat (JSON lines): rândurile de acces + rândurile aplicației de la INFO în sus
+        'jsonl': {
+            '()': 'aplicatie.jurnalizare.QueueLogHandler',
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/info.log',
-            'formatter': 'verbose'
-        },
-        'warning_file': {
-            'level': 'WARNING',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/warning.log',
-            'formatter': 'verbose'
-        },
-        'error_file': {
-            'level': 'ERROR',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/error.log',
-            'formatter': 'verbose'
-        },
-        'critical_file': {
-            'level': 'CRITICAL',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/critical.log',
-            'formatter': 'verbose'
+            'files': {'INFO': JSON_LOG_FILE},
+            'rotation': LOG_ROTATION,
+            'max_bytes': 50 * 1024 * 1024,
+            'backup_count': 10,
+            'compress': True,
+            'formatter': 'json',
+            'filters': ['context_cerere'],
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'debug_file', 'info_file', 'warning_file', 'error_file', 'critical_file'],
+            'handlers': ['console', 'fisiere', 'jsonl'],
             'level': 'DEBUG',
             'propagate': True,
+            'filters': ['esantionare'],  # doar rândurile scrise direct pe 'django' (view-urile aplicației)
+        },
+        'aplicatie.acces': {
+            'handlers': ['jsonl'],
+            'level': 'INFO',
+            'propagate': False,
         },
     },
 }
@@ -180,6 +273,18 @@ EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'  # Fictiv, pentru
 # EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@bookstore.example.com'  # Adresa fictivă, conform cerinței tale
 
+# Câte cărți "văzute recent" păstrăm pentru fiecare utilizator (sloturi în Vizualizari)
+VIZUALIZARI_MAX = 5
+# Vizualizările se scriu în loturi din buffer: 'thread' (fir de flush), 'manual' sau 'sync'
+VIZUALIZARI_BUFFER = os.environ.get('VIZUALIZARI_BUFFER', 'thread')
+VIZUALIZARI_FLUSH_INTERVAL = 2.0  # secunde între două scrieri ale bufferului
+VIZUALIZARI_FLUSH_SIZE = 500  # flush imediat peste atâtea evenimente (și dimensiunea unui lot)
+VIZUALIZARI_BUFFER_MAX = 50000  # peste această adâncime renunțăm la cele mai vechi evenimente
+
+# Trimiterea e-mailurilor de promoție: 'thread' (worker în proces), 'db' (comanda process_promotions), 'sync'
+PROMOTII_DISPATCH = os.environ.get('PROMOTII_DISPATCH', 'thread')
+PROMOTII_BATCH_SIZE = 100  # e-mailuri trimise pe aceeași conexiune într-un lot
+
 # Creează folderul 'logs' dacă nu există
 if not os.path.exists(BASE_DIR / 'logs'):
     os.makedirs(BASE_DIR / 'logs')
@@ -190,13 +295,136 @@ HANDLER403 = 'aplicatie.views.custom_permission_denied'
 # Configurare pentru pagina de login implicită
 LOGIN_URL = '/login/'  # Specifică ruta ta personalizată pentru login
 
-# Configurație pentru django-crontab
-CRONJOBS = [
-    ('*/60 * * * *', 'aplicatie.crontab.clean_unconfirmed_users'),  # La fiecare 60 de minute
-    ('0 18 * * 4', 'aplicatie.crontab.send_newsletter'),  # Joi la 18:00
-    ('*/10 * * * *', 'django.core.management.call_command', ['clearsessions']),  # La fiecare 10 minute
-    ('59 23 * * 0', 'aplicatie.crontab.generate_activity_report'),  # Duminică la 23:59
-]    #minute | ore | ziua lunii | luna | ziua săptămânii
+# Job-uri programate, rulate de un singur proces de lungă durată: python manage.py run_scheduler
+# (înlocuiește django-crontab; vezi aplicatie/scheduler.py). Timeout-ul e în secunde.
+SCHEDULED_JOBS = {
+    'clean_unconfirmed_users': {  # La fiecare 60 de minute
+        'schedule': '*/60 * * * *', 'callable': 'aplicatie.crontab.clean_unconfirmed_users', 'timeout': 15 * 60,
+    },
+    'send_newsletter': {  # Joi la 18:00
+        'schedule': '0 18 * * 4', 'callable': 'aplicatie.crontab.send_newsletter', 'timeout': 60 * 60,
+    },
+    'clear_sessions': {  # La fiecare 60 de minute (nimic de făcut cu SESSION_BACKEND='signed_cookies')
+        'schedule': '0 * * * *', 'callable': 'aplicatie.crontab.clear_sessions', 'timeout': 5 * 60,
+    },
+    'generate_activity_report': {  # Duminică la 23:59
+        'schedule': '59 23 * * 0', 'callable': 'aplicatie.crontab.generate_activity_report', 'timeout': 30 * 60,
+    },
+    'release_expired_orders': {  # În fiecare minut
+        'schedule': '* * * * *', 'callable': 'aplicatie.crontab.release_expired_orders', 'timeout': 5 * 60,
+    },
+}    #minute | ore | ziua lunii | luna | ziua săptămânii
+SCHEDULER_DEFAULT_TIMEOUT = 10 * 60  # pentru job-urile fără 'timeout'
+SCHEDULER_LOCK_GRACE = 60  # secunde peste timeout până când blocarea unui proces oprit brusc expiră
+SCHEDULER_POLL_INTERVAL = 30  # cât doarme cel mult bucla între verificări
+
+# Paginarea listei de cărți: 'cursor' (keyset, fără COUNT/OFFSET) sau 'offset' (Paginator clasic)
+BOOK_LIST_PAGINATION = os.environ.get('BOOK_LIST_PAGINATION', 'cursor')
+BOOK_LIST_PAGE_SIZE = 10
+BOOK_LIST_COUNT_TIMEOUT = 60  # secunde pentru totalul din cache
+SEARCH_MAX_RESULTS = 1000  # câte rezultate (după relevanță) întoarce căutarea full-text
+
+# Ștergerea utilizatorilor neconfirmați (aplicatie/purge.py)
+UNCONFIRMED_USER_MAX_AGE = timedelta(minutes=2)  # doar 2 minute pentru testare
+PURGE_BATCH_SIZE = 500  # utilizatori pe lot (o tranzacție scurtă pe lot)
+PURGE_SLEEP = 0.05  # secunde între loturi
+
+# Newsletter (aplicatie/newsletter.py)
+NEWSLETTER_MIN_ACCOUNT_AGE = timedelta(minutes=2)  # doar 2 minute pentru testare
+NEWSLETTER_CHUNK_SIZE = 2000  # rânduri citite deodată din baza de date
+NEWSLETTER_BATCH_SIZE = 100  # e-mailuri trimise pe aceeași conexiune într-un lot
+NEWSLETTER_RETRIES = 3  # încercări pe mesaj
+NEWSLETTER_MAX_CONSECUTIVE_FAILURES = 5  # mesaje eșuate la rând după care rularea se oprește (FAILED)
+NEWSLETTER_BACKOFF = 2.0  # secunde înaintea primei reîncercări; se dublează la fiecare încercare
+NEWSLETTER_RECOMMENDATIONS = 3  # cărți recomandate din genul preferat
+NEWSLETTER_SITE_URL = 'http://127.0.0.1:8000'
+
+# Profilarea cererilor (aplicatie/profiling.py)
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '1') == '1'
+PROFILING_N_PLUS_ONE = 5  # aceeași interogare de mai mult de atâtea ori într-o cerere => posibil N+1
+PROFILING_FLUSH_INTERVAL = 30  # secunde între publicările în cache ale fiecărui proces
+PROFILING_MAX_PROCESSES = 64  # câte procese pot apărea deodată în pagina de profilare
+
+# Metrici Prometheus la /metrics (aplicatie/metrics.py): 'process' (fiecare worker pe cont propriu)
+# sau 'file' (workerii își scriu totalurile în METRICS_DIR și oricare răspunde cu suma lor)
+METRICS_MODE = os.environ.get('METRICS_MODE', 'process')
+METRICS_DIR = os.environ.get('METRICS_DIR', BASE_DIR / 'metrics')
+METRICS_FLUSH_INTERVAL = 5  # secunde între scrierile fișierului procesului (modul 'file')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Cache-ul aplicației: 'locmem' (implicit, per proces; versiunile catalogului tot partajate, vezi mai jos),
+# 'file' (partajat între procesele de pe aceeași mașină) sau 'redis' (partajat între mașini, REDIS_URL)
+BOOKSTORE_CACHE = os.environ.get('BOOKSTORE_CACHE', 'locmem')
+if BOOKSTORE_CACHE == 'redis':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }}
+elif BOOKSTORE_CACHE == 'file':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Sesiuni: 'cached_db' (citirile din cache, scrierile și în baza de date), 'signed_cookies'
+# (datele în cookie semnat, fără tabel) sau 'db' (implicitul Django)
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cached_db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_BACKEND}'
+# Cache separat pentru sesiuni (cache.clear() pe catalog nu le afectează); local doar cu 'locmem',
+# altfel partajat între procese, ca o sesiune modificată într-un worker să nu fie citită veche în altul
+CACHES['sessions'] = {**CACHES['default'], 'KEY_PREFIX': 'sesiuni'}
+if BOOKSTORE_CACHE == 'locmem':
+    CACHES['sessions']['LOCATION'] = 'sesiuni'
+SESSION_CACHE_ALIAS = 'sessions'
+# Versiunile fragmentelor de catalog (aplicatie/catalog_cache.py) trebuie să fie aceleași în toți
+# workerii: un semnal incrementează versiunea doar în procesul care a făcut scrierea. Cu 'locmem'
+# fragmentele rămân în memoria procesului, dar versiunile stau pe disc, partajate de procesele de pe
+# aceeași mașină (pentru mai multe mașini: BOOKSTORE_CACHE='redis')
+CACHES['versions'] = {**CACHES['default'], 'KEY_PREFIX': 'versiuni'}
+if BOOKSTORE_CACHE == 'locmem':
+    CACHES['versions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'versiuni',
+    }
+CATALOG_VERSION_CACHE_ALIAS = 'versions'
+# Instantaneele de profilare (aplicatie/profiling.py) ale tuturor workerilor, din același motiv
+CACHES['profiling'] = {**CACHES['default'], 'KEY_PREFIX': 'profilare'}
+if BOOKSTORE_CACHE == 'locmem':
+    CACHES['profiling'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'profilare',
+    }
+PROFILING_CACHE_ALIAS = 'profiling'
+# Mesajele flash stau doar în cookie: nu marchează sesiunea ca modificată
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+CONTACT_THROTTLE_WINDOW = 60 * 60  # secunde în care se numără trimiterile formularului de contact (pe IP)
+# Mesajele de contact (aplicatie/contact_store.py): jurnal append-only + index SQLite
+CONTACT_STORE_DIR = BASE_DIR / 'mesaje'
+CONTACT_STORE_FSYNC_EVERY = 20  # fsync după atâtea mesaje...
+CONTACT_STORE_FSYNC_INTERVAL = 1.0  # ...sau după atâtea secunde de la primul mesaj nesincronizat
+
+# Fragmentele de catalog (listă, detalii) sunt invalidate prin versiuni; timeout-ul doar curăță
+CATALOG_CACHE_TIMEOUT = 300
+# Lista arată stocul, dar comenzile invalidează doar cardul cărții (altfel fiecare comandă ar goli
+# toate paginile listei): stocul din listă poate fi vechi cel mult atâtea secunde
+CATALOG_LIST_CACHE_TIMEOUT = 30
+# View-urile de catalog async (aplicatie/async_views.py): activate de asgi.py; sub WSGI rămân cele
+# sincrone, fiindcă acolo un view async ar porni câte o buclă de evenimente la fiecare cerere
+CATALOG_ASYNC_VIEWS = os.environ.get('CATALOG_ASYNC_VIEWS', '0') == '1'
+# Interogările independente ale listei de cărți (pagina, fațetele) rulează în paralel, pe fire și
+# conexiuni separate (doar în view-urile async); altfel una după alta pe firul cererii
+CATALOG_PARALLEL_QUERIES = os.environ.get('CATALOG_PARALLEL_QUERIES', '1') == '1'
+# Importul/exportul în masă al catalogului (aplicatie/catalog_io.py)
+CATALOG_IMPORT_CHUNK_SIZE = 5000  # rânduri scrise într-o tranzacție
+CATALOG_EXPORT_CHUNK_SIZE = 5000  # cărți citite deodată
+# Comenzile (aplicatie/orders.py): cât ține stocul rezervat o comandă neconfirmată (PENDING)
+ORDER_RESERVATION_TTL = timedelta(minutes=15)
+ORDER_SWEEP_BATCH_SIZE = 500  # linii eliberate într-o tranzacție de release_expired_orders
+# Benchmark-ul aplicației (aplicatie/benchmark.py, comanda run_benchmark): rezultatele, câte un
+# fișier JSON pe rulare, și pragul peste care o creștere a p95 față de rularea de referință e regresie
+BENCHMARK_DIR = os.environ.get('BENCHMARK_DIR', BASE_DIR / 'benchmarks')
+BENCHMARK_REGRESSION_THRESHOLD = 0.20
 
 # Director pentru fișierele de raport
 REPORTS_DIR = BASE_DIR / 'reports'